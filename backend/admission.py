@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+ADMISSION_CONCURRENCY = 32
+ADMISSION_QUEUE_SIZE = 128
+ADMISSION_DEADLINE_SECONDS = 0.25
+WAIT_SAMPLES = 1024
+
+# Queue priorities; lower is served first.
+PRIORITY_PLAUSIBLE = 0
+PRIORITY_UNKNOWN = 1
+# Never queued: shed as not_in_topN as soon as the budget is exhausted.
+PRIORITY_LOW = 2
+
+SHED_LOW_SCORE = "low_score"
+SHED_QUEUE_FULL = "queue_full"
+SHED_DISPLACED = "displaced"
+SHED_DEADLINE = "deadline"
+SHED_REASONS = (SHED_LOW_SCORE, SHED_QUEUE_FULL, SHED_DISPLACED, SHED_DEADLINE)
+
+CLIENT_SCORE_HEADER = "x-client-score"
+_CLIENT_SCORE_RE = re.compile(rb'"clientScore"\s*:\s*(\d{1,15})\b')
+_SEED_RE = re.compile(rb'"seed"\s*:\s*(\d{1,10})\b')
+
+
+def peek_client_score(header: Optional[str], body: bytes) -> Optional[int]:
+    # A hint for ordering work, never trusted for scoring: the header when the client sent
+    # one, else the first clientScore in the raw body. Lying low only sheds your own run.
+    if header is not None:
+        return int(header) if header.isdigit() else None
+    match = _CLIENT_SCORE_RE.search(body)
+    return int(match.group(1)) if match else None
+
+
+def peek_seed(body: bytes) -> Optional[int]:
+    match = _SEED_RE.search(body)
+    return int(match.group(1)) if match else None
+
+
+class Shed(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(eq=False)
+class _Waiter:
+    priority: int
+    deadline: float
+    # Resolves to None when handed a slot, or to the reason it was shed while queued.
+    future: asyncio.Future
+
+
+class AdmissionController:
+    # Bounds concurrent submits. Past the budget, runs that would be not_in_topN anyway are
+    # shed outright, the rest wait FIFO per priority with a deadline; a full queue makes room
+    # for a plausible top-N run by displacing the newest unknown-score waiter. All state is
+    # touched only from the event loop.
+    def __init__(
+        self,
+        concurrency: int = ADMISSION_CONCURRENCY,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        deadline_seconds: float = ADMISSION_DEADLINE_SECONDS,
+        time_fn: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.deadline_seconds = deadline_seconds
+        self.time_fn = time_fn
+        self.in_flight = 0
+        self.waiting = 0
+        self._queues: tuple[deque, deque] = (deque(), deque())
+        self.admitted_total = 0
+        self.shed = {reason: 0 for reason in SHED_REASONS}
+        self.waits_total = 0
+        self.wait_seconds_total = 0.0
+        self._recent_waits: deque = deque(maxlen=WAIT_SAMPLES)
+        # Lowest score on the full global top N as last seen by the cheap gate. Runs are never
+        # removed, so the real value only rises and a stale one sheds less, never wrongly.
+        self.threshold: Optional[int] = None
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.concurrency or self.waiting > 0
+
+    def observe_threshold(self, min_score: Optional[int]) -> None:
+        if min_score is not None and (self.threshold is None or min_score > self.threshold):
+            self.threshold = min_score
+
+    async def acquire(self, priority: int) -> None:
+        # Returns once a slot is held (release() must follow) or raises Shed.
+        if not self.saturated:
+            self.in_flight += 1
+            self.admitted_total += 1
+            return
+        if priority == PRIORITY_LOW:
+            self._shed(SHED_LOW_SCORE)
+        if self.waiting >= self.queue_size and not self._displace(priority):
+            self._shed(SHED_QUEUE_FULL)
+        start = self.time_fn()
+        waiter = _Waiter(priority, start + self.deadline_seconds, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+        self.waiting += 1
+        try:
+            await asyncio.wait((waiter.future,), timeout=self.deadline_seconds)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self._record_wait(self.time_fn() - start)
+        if not waiter.future.done():
+            waiter.future.cancel()
+            self.waiting -= 1
+            self._shed(SHED_DEADLINE)
+        reason = waiter.future.result()
+        if reason is not None:
+            self._shed(reason)
+        self.admitted_total += 1
+
+    def release(self) -> None:
+        # Hands the slot straight to the best live waiter, or frees it. A waiter past its
+        # deadline is shed here rather than handed a slot its client has likely given up on:
+        # under heavy load the loop may resume it well after the timer fired.
+        now = self.time_fn()
+        for queue in self._queues:
+            while queue:
+                waiter = queue.popleft()
+                if waiter.future.done():
+                    continue
+                self.waiting -= 1
+                if waiter.deadline < now:
+                    waiter.future.set_result(SHED_DEADLINE)
+                    continue
+                waiter.future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _displace(self, priority: int) -> bool:
+        if priority != PRIORITY_PLAUSIBLE:
+            return False
+        queue = self._queues[PRIORITY_UNKNOWN]
+        while queue:
+            waiter = queue.pop()
+            if not waiter.future.done():
+                waiter.future.set_result(SHED_DISPLACED)
+                self.waiting -= 1
+                return True
+        return False
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        # The request went away while queued. A slot already handed over is passed on.
+        if waiter.future.done() and waiter.future.result() is None:
+            self.release()
+        elif not waiter.future.done():
+            waiter.future.cancel()
+            self.waiting -= 1
+
+    def _shed(self, reason: str) -> None:
+        self.shed[reason] += 1
+        raise Shed(reason)
+
+    def _record_wait(self, seconds: float) -> None:
+        self.waits_total += 1
+        self.wait_seconds_total += seconds
+        self._recent_waits.append(seconds)
+
+    def stats(self) -> dict:
+        recent = sorted(self._recent_waits)
+
+        def percentile_ms(q: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 3)
+
+        return {
+            "admission_in_flight": self.in_flight,
+            "admission_queue_depth": self.waiting,
+            "admission_admitted_total": self.admitted_total,
+            **{f"admission_shed_{reason}_total": count for reason, count in self.shed.items()},
+            "admission_queue_waits_total": self.waits_total,
+            "admission_queue_wait_seconds_total": round(self.wait_seconds_total, 6),
+            "admission_queue_wait_p50_ms": percentile_ms(0.5),
+            "admission_queue_wait_p99_ms": percentile_ms(0.99),
+        }
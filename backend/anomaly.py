@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+
+SKETCH_K = 200
+CHECKPOINT_FORMAT = 1
+CHECKPOINT_EVERY = 500
+MIN_SAMPLES = 50
+TOP_OUTLIERS = 100
+METRICS = ("kills", "drops", "drift")
+
+
+class KLLSketch:
+    # KLL quantile sketch: level h holds items of weight 2**h, level capacities shrink
+    # geometrically below the top, so memory is O(k) regardless of how many values were
+    # added. Two sketches merge by concatenating levels and compacting.
+    __slots__ = ("k", "n", "levels", "_rng", "_cdf", "_cdf_n", "_size", "_limit")
+
+    def __init__(self, k: int = SKETCH_K, seed: int = 0) -> None:
+        self.k = k
+        self.n = 0
+        self.levels: list[list[int]] = [[]]
+        self._rng = random.Random(seed)
+        self._cdf: Optional[tuple[list[int], list[int]]] = None
+        self._cdf_n = 0
+        self._size = 0
+        self._limit = self._max_stored()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _max_stored(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _reset_counts(self) -> None:
+        self._size = sum(len(items) for items in self.levels)
+        self._limit = self._max_stored()
+
+    def update(self, value: int) -> None:
+        # Hot path: O(1) unless the sketch is full.
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._limit:
+            self._compress()
+
+    def _compress(self) -> None:
+        for level, items in enumerate(self.levels):
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                # Odd leftovers stay behind; every other item moves up with double weight.
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.randint(0, 1)
+                self.levels[level + 1].extend(items[offset::2])
+                self.levels[level] = keep
+                self._reset_counts()
+                return
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self._cdf = None
+        self._reset_counts()
+        while self._size >= self._limit:
+            self._compress()
+
+    def _view(self) -> tuple[list[int], list[int]]:
+        # Sorted values with cumulative weights, rebuilt only after ~6% more data (at least
+        # 64 values), so scoring a run is a few bisects rather than a sort per feature and the
+        # rebuild cost fades as history grows.
+        if self._cdf is None or self.n - self._cdf_n > max(64, self.n >> 4):
+            values: list[int] = []
+            cumulative: list[int] = []
+            total = 0
+            for value, weight in sorted(
+                (value, 1 << level) for level, items in enumerate(self.levels) for value in items
+            ):
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._cdf = (values, cumulative)
+            self._cdf_n = self.n
+        return self._cdf
+
+    def ranks(self, value: int) -> tuple[float, float]:
+        # Estimated fraction of values < value and <= value.
+        values, cumulative = self._view()
+        if not values:
+            return 0.0, 0.0
+        total = cumulative[-1]
+        lo = bisect_left(values, value)
+        hi = bisect_right(values, value)
+        below = cumulative[lo - 1] if lo else 0
+        at_or_below = cumulative[hi - 1] if hi else 0
+        return below / total, at_or_below / total
+
+    def quantile(self, q: float) -> Optional[int]:
+        values, cumulative = self._view()
+        if not values:
+            return None
+        index = bisect_left(cumulative, q * cumulative[-1])
+        return values[min(index, len(values) - 1)]
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "levels": [list(items) for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: dict, seed: int = 0) -> "KLLSketch":
+        sketch = cls(k=int(data["k"]), seed=seed)
+        sketch.n = int(data["n"])
+        sketch.levels = [[int(value) for value in items] for items in data["levels"]] or [[]]
+        sketch._reset_counts()
+        return sketch
+
+
+@dataclass(order=True)
+class Outlier:
+    score: float
+    run_id: str = field(compare=False)
+    feature: str = field(compare=False)
+    value: int = field(compare=False)
+    median: Optional[int] = field(compare=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "runId": self.run_id,
+            "score": round(self.score, 3),
+            "feature": self.feature,
+            "value": self.value,
+            "median": self.median,
+        }
+
+
+def tail_score(sketch: KLLSketch, value: int) -> float:
+    # Two-sided surprise in decimal digits: 1.0 means one run in ten is at least this far
+    # out, 3.0 one in a thousand. Capped by the sample size so small sketches stay modest.
+    below, at_or_below = sketch.ranks(value)
+    tail = min(at_or_below, 1.0 - below)
+    return -math.log10(max(tail, 1.0 / (sketch.n + 1)))
+
+
+class AnomalyScorer:
+    def __init__(
+        self,
+        k: int = SKETCH_K,
+        min_samples: int = MIN_SAMPLES,
+        top_outliers: int = TOP_OUTLIERS,
+    ) -> None:
+        self.k = k
+        self.min_samples = min_samples
+        self.top_outliers = top_outliers
+        self.sketches: dict[str, KLLSketch] = {}
+        self.outliers: list[Outlier] = []
+        self.runs = 0
+
+    def _sketch(self, key: str) -> KLLSketch:
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = KLLSketch(self.k, seed=len(self.sketches))
+        return sketch
+
+    @staticmethod
+    def features(progress: int, wave_kills: Iterable[int], wave_drops: Iterable[int], gold_drift: int) -> list:
+        # Only completed waves are compared: a partial defeat wave is not like a full one.
+        kills = list(wave_kills)[:progress]
+        drops = list(wave_drops)[:progress]
+        observed = [(f"kills:{i + 1}", value) for i, value in enumerate(kills)]
+        observed += [(f"drops:{i + 1}", value) for i, value in enumerate(drops)]
+        observed.append((f"drift:{progress}", gold_drift))
+        return observed
+
+    def observe(self, run_id: str, observed: list[tuple[str, int]]) -> float:
+        # Scores against history first, then adds the run, so a run never explains itself.
+        worst: Optional[Outlier] = None
+        for key, value in observed:
+            sketch = self._sketch(key)
+            if sketch.n >= self.min_samples:
+                score = tail_score(sketch, value)
+                if worst is None or score > worst.score:
+                    worst = Outlier(score, run_id, key, value, sketch.quantile(0.5))
+            sketch.update(value)
+        self.runs += 1
+        if worst is None or worst.score <= 0:
+            return 0.0
+        if len(self.outliers) < self.top_outliers:
+            heapq.heappush(self.outliers, worst)
+        elif worst.score > self.outliers[0].score:
+            heapq.heapreplace(self.outliers, worst)
+        return worst.score
+
+    def top(self, limit: int) -> list[dict]:
+        return [outlier.to_dict() for outlier in heapq.nlargest(limit, self.outliers)]
+
+    def summary(self) -> dict:
+        return {
+            key: {
+                "n": sketch.n,
+                "p50": sketch.quantile(0.5),
+                "p99": sketch.quantile(0.99),
+            }
+            for key, sketch in sorted(self.sketches.items())
+        }
+
+    def merge(self, other: "AnomalyScorer") -> None:
+        for key, sketch in other.sketches.items():
+            self._sketch(key).merge(sketch)
+        for outlier in other.outliers:
+            if len(self.outliers) < self.top_outliers:
+                heapq.heappush(self.outliers, outlier)
+            elif outlier.score > self.outliers[0].score:
+                heapq.heapreplace(self.outliers, outlier)
+        self.runs += other.runs
+
+    def to_dict(self) -> dict:
+        return {
+            "format": CHECKPOINT_FORMAT,
+            "runs": self.runs,
+            "sketches": {key: sketch.to_dict() for key, sketch in self.sketches.items()},
+            "outliers": [
+                [o.score, o.run_id, o.feature, o.value, o.median] for o in self.outliers
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs: Any) -> "AnomalyScorer":
+        scorer = cls(**kwargs)
+        if data.get("format") != CHECKPOINT_FORMAT:
+            return scorer
+        scorer.runs = int(data.get("runs", 0))
+        for index, (key, sketch) in enumerate(data.get("sketches", {}).items()):
+            scorer.sketches[key] = KLLSketch.from_dict(sketch, seed=index)
+        outliers = [Outlier(*row) for row in data.get("outliers", [])]
+        scorer.outliers = heapq.nlargest(scorer.top_outliers, outliers)
+        heapq.heapify(scorer.outliers)
+        return scorer
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Path, **kwargs: Any) -> AnomalyScorer:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return AnomalyScorer(**kwargs)
+    return AnomalyScorer.from_dict(data, **kwargs)
@@ -1,30 +1,101 @@
 from __future__ import annotations
 
+import asyncio
+import hmac
 import json
 import logging
 import os
 import sqlite3
 import time
-from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.background import BackgroundTask
 
-from backend.guards.authority import AuthorityRules, validate_precheck
-from backend.guards import build_authority_rules, is_replay, should_skip_authority, validate_authority
+from backend.admission import (
+    CLIENT_SCORE_HEADER,
+    PRIORITY_LOW,
+    PRIORITY_PLAUSIBLE,
+    PRIORITY_UNKNOWN,
+    SHED_LOW_SCORE,
+    AdmissionController,
+    Shed,
+    peek_client_score,
+    peek_seed,
+)
+from backend.anomaly import CHECKPOINT_EVERY, AnomalyScorer, load_checkpoint, save_checkpoint
+from backend.guards.authority import AuthorityRules, compute_server_score, validate_precheck
+from backend.board_hub import BoardHub, HubFull
+from backend.db import (
+    BOARD_VERSION,
+    PARTITION_VERSION,
+    SCORES_EPOCH,
+    DB_QUEUE_SIZE,
+    DatabaseBusy,
+    DatabaseExecutor,
+    bump_meta,
+    fetch_meta,
+    init_meta,
+)
+from backend.guards import (
+    AuthorityResult,
+    CheapGateResult,
+    fetch_top_scores,
+    gate_for_min_score,
+    is_replay,
+    should_skip_authority,
+    validate_authority,
+)
+from backend.export import MEDIA_TYPES, ExportFilter, stream_export
+from backend.heavy_hitters import HEAVY_HITTERS_K, SubmitterTracker
+from backend.idempotency import ResponseCache, body_digest
+from backend.log_pipeline import install_log_pipeline, log_event
+from backend.partitions import (
+    BoardKey,
+    PartitionCache,
+    PartitionEntry,
+    compute_partition_rank,
+    fetch_partition,
+    init_partitions,
+)
+from backend.payload_compiler import compile_validator
+from backend.player_stats import (
+    TOP_PLAYERS_LIMIT,
+    TOP_PLAYERS_MAX,
+    fetch_player,
+    fetch_top_players,
+    init_player_stats,
+    record_run,
+    row_to_player,
+)
+from backend.ruleset_snapshot import RULESET_VERSION, load_rules
+from backend.snapshots import SNAPSHOT_INTERVAL_SECONDS, SnapshotScheduler
+from backend.telemetry import encode_run, init_telemetry, mob_types, store_telemetry
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib encoder produces the same bytes layout
+    orjson = None
 
 
 LEADERBOARD_LIMIT = 3
 CHEAP_GATE_LIMIT = 3
 CHEAP_GATE_MARGIN = 0.02
+# How often a worker reads the shared counters; matches the board's max-age below.
+META_CHECK_SECONDS = 1.0
 MAX_BODY_BYTES = 64 * 1024
+# Short enough that a top-N change is visible within a second, long enough for nginx to
+# collapse bursts of polls into one upstream request.
+LEADERBOARD_CACHE_CONTROL = "public, max-age=1, stale-while-revalidate=2"
 LOGGER = logging.getLogger("leaderboard")
 DEV_CORS_ORIGINS = (
     "http://localhost:30000",
@@ -81,6 +152,30 @@ class SubmitPayload(BaseModel):
     economy: EconomyPayload
     waves: list[WavePayload]
     rulesetVersion: str = Field(..., min_length=1)
+    # The uint32 from hashSeed; seeded runs also rank on their (rulesetVersion, seed) board.
+    seed: Optional[int] = Field(default=None, ge=0, le=0xFFFFFFFF)
+
+
+# Builds __slots__ views in one pass; returns None for anything the model must coerce or reject.
+validate_submit_payload = compile_validator(SubmitPayload)
+
+
+def parse_submit_payload(body: bytes) -> Any:
+    # orjson differs from json at the edges (big integers become floats, NaN is refused), so
+    # its result is never handed to the model: only what the compiled pass accepts is kept.
+    if orjson is not None:
+        try:
+            payload = validate_submit_payload(orjson.loads(body))
+        except orjson.JSONDecodeError:
+            payload = None
+        if payload is not None:
+            return payload
+    data = json.loads(body)
+    if orjson is None:
+        payload = validate_submit_payload(data)
+        if payload is not None:
+            return payload
+    return SubmitPayload.model_validate(data)
 
 
 class SubmitResponse(BaseModel):
@@ -90,6 +185,8 @@ class SubmitResponse(BaseModel):
     serverScore: Optional[int] = None
     earnedGold: Optional[int] = None
     totalKills: Optional[int] = None
+    rank: Optional[int] = None
+    seedRank: Optional[int] = None
 
 
 class LeaderboardItem(BaseModel):
@@ -103,6 +200,29 @@ class LeaderboardResponse(BaseModel):
     items: list[LeaderboardItem]
 
 
+class PlayerStats(BaseModel):
+    playerName: str
+    runs: int
+    bestScore: int
+    bestAt: str
+    avgProgress: float
+    lastPlayedAt: str
+
+
+class PlayersResponse(BaseModel):
+    items: list[PlayerStats]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 def load_ruleset(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as handle:
         payload = json.load(handle)
@@ -111,6 +231,15 @@ def load_ruleset(path: Path) -> dict:
 
 def init_db(db_path: Path) -> None:
     conn = sqlite3.connect(db_path)
+    try:
+        init_schema(conn)
+    finally:
+        conn.close()
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    # WAL lets readers (exports, backups) proceed while the DB executor writes.
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS score_runs (
@@ -127,34 +256,199 @@ def init_db(db_path: Path) -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_score_runs_score ON score_runs(server_score DESC, created_at ASC)"
     )
+    init_meta(conn)
+    init_partitions(conn)
+    init_player_stats(conn)
+    init_telemetry(conn)
     conn.commit()
-    conn.close()
+
+
+def check_submission(
+    conn: sqlite3.Connection,
+    run_id: str,
+    client_score: int,
+    board: Optional[BoardKey] = None,
+    gate: Optional[CheapGateResult] = None,
+) -> tuple[bool, Optional[CheapGateResult]]:
+    # Replay check and cheap gate share one trip through the DB queue. A seeded run is
+    # skipped only when its partition already holds a full top N and the run is below it:
+    # those N runs are on the global board too, so it is below the global top N as well. A
+    # partition gate already decided from the cache skips that query. On a sparse partition
+    # the run would rank on its seed board whatever the global board says, so it is never
+    # skipped; the global gate is still read for its threshold.
+    if is_replay(conn, run_id):
+        return True, None
+    if board is not None:
+        if gate is None:
+            gate = should_skip_authority(conn, client_score, CHEAP_GATE_LIMIT, CHEAP_GATE_MARGIN, board)
+        if gate.full and gate.skip:
+            return False, gate
+    global_gate = should_skip_authority(conn, client_score, CHEAP_GATE_LIMIT, CHEAP_GATE_MARGIN)
+    if board is not None:
+        global_gate = replace(global_gate, skip=False)
+    return False, global_gate
+
+
+def compute_rank(conn: sqlite3.Connection, score: int, created_at: str) -> int:
+    row = conn.execute(
+        """
+        SELECT COUNT(*) as ahead
+        FROM score_runs
+        WHERE server_score > ? OR (server_score = ? AND created_at < ?)
+        """,
+        (score, score, created_at),
+    ).fetchone()
+    ahead = row["ahead"] if row else 0
+    return int(ahead) + 1
+
+
+@dataclass(frozen=True)
+class InsertedRun:
+    rank: int
+    seed_rank: Optional[int] = None
+    # The partition's fresh top N, read in the insert's job when the run made it.
+    board_rows: Optional[list] = None
+    # The new board version, set only when the run entered the global top N.
+    board_version: Optional[int] = None
+    # The new partition version, set along with board_rows.
+    partition_version: Optional[int] = None
+    # Global top-N scores, read in the same job when the run entered the global top N.
+    top_scores: Optional[list[int]] = None
+
+
+def insert_run(
+    conn: sqlite3.Connection, row: tuple, telemetry: Optional[tuple[str, bytes]] = None
+) -> Optional[InsertedRun]:
+    # row: (run_id, player_name, client_score, server_score, progress, created_at, ip,
+    #       seed, ruleset_version)
+    try:
+        conn.execute(
+            """
+            INSERT INTO score_runs (
+                run_id, player_name, client_score, server_score, progress, created_at, ip,
+                seed, ruleset_version
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            row,
+        )
+    except sqlite3.IntegrityError:
+        # A concurrent submit of the same runId won the race after our replay check.
+        conn.rollback()
+        return None
+    record_run(conn, player_name=row[1], score=row[3], progress=row[4], created_at=row[5])
+    if telemetry is not None:
+        store_telemetry(conn, row[0], *telemetry)
+    # Ranked before the commit so the version bumps share the insert's transaction.
+    rank = compute_rank(conn, row[3], row[5])
+    version = bump_meta(conn, BOARD_VERSION) if rank <= LEADERBOARD_LIMIT else None
+    top_scores = fetch_top_scores(conn, CHEAP_GATE_LIMIT) if rank <= CHEAP_GATE_LIMIT else None
+    if row[7] is None:
+        conn.commit()
+        return InsertedRun(rank, board_version=version, top_scores=top_scores)
+    board = (row[8], row[7])
+    seed_rank = compute_partition_rank(conn, board, row[3], row[5])
+    if seed_rank > LEADERBOARD_LIMIT:
+        conn.commit()
+        return InsertedRun(rank, seed_rank, board_version=version, top_scores=top_scores)
+    partition_version = bump_meta(conn, PARTITION_VERSION)
+    rows = fetch_partition(conn, board, LEADERBOARD_LIMIT)
+    conn.commit()
+    return InsertedRun(rank, seed_rank, rows, version, partition_version, top_scores)
+
+
+def fetch_leaderboard(conn: sqlite3.Connection, limit: int) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT player_name, server_score, progress, created_at
+        FROM score_runs
+        ORDER BY server_score DESC, created_at ASC
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def fetch_board(conn: sqlite3.Connection, limit: int) -> tuple[int, list[sqlite3.Row]]:
+    # One read transaction, so the version always names exactly these rows.
+    conn.execute("BEGIN")
+    try:
+        return fetch_meta(conn).get(BOARD_VERSION, 0), fetch_leaderboard(conn, limit)
+    finally:
+        conn.commit()
+
+
+def fetch_partition_board(
+    conn: sqlite3.Connection, board: BoardKey, limit: int
+) -> tuple[int, list[sqlite3.Row]]:
+    conn.execute("BEGIN")
+    try:
+        return fetch_meta(conn).get(PARTITION_VERSION, 0), fetch_partition(conn, board, limit)
+    finally:
+        conn.commit()
+
+
+def encode_json(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def row_to_item(row: sqlite3.Row) -> dict:
+    return {
+        "playerName": row["player_name"],
+        "score": row["server_score"],
+        "progress": row["progress"],
+        "createdAt": row["created_at"],
+    }
 
 
 def create_app(
     db_path: str | Path | None = None,
     ruleset_dir: str | Path = Path("shared") / "ruleset",
     rate_limiter: Optional[RateLimiter] = None,
+    response_cache: Optional[ResponseCache] = None,
+    admission: Optional[AdmissionController] = None,
+    heavy_hitters: Optional[SubmitterTracker] = None,
     max_body_bytes: int = MAX_BODY_BYTES,
+    db_queue_size: int = DB_QUEUE_SIZE,
+    admin_token: Optional[str] = None,
+    anomaly_path: str | Path | None = None,
+    snapshot_dir: str | Path | None = None,
+    snapshot_interval: Optional[float] = None,
 ) -> FastAPI:
-    if not logging.getLogger().handlers:
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(levelname)s:%(name)s:%(filename)s:%(lineno)d:%(message)s",
-        )
     db_path = Path(
         db_path
         or os.getenv("LEADERBOARD_DB_PATH")
         or Path("backend") / "leaderboard.db"
     )
     ruleset_dir = Path(ruleset_dir)
-    scoring = load_ruleset(ruleset_dir / "scoring.v1.json")
-    economy = load_ruleset(ruleset_dir / "economy.v1.json")
-    mobs = load_ruleset(ruleset_dir / "mobs.v1.json")
-    caps = load_ruleset(ruleset_dir / "caps.v1.json")
-    init_db(db_path)
+    # Admin endpoints are disabled (404) unless a token is configured.
+    admin_token = admin_token or os.getenv("LEADERBOARD_ADMIN_TOKEN") or None
+    anomaly_path = Path(
+        anomaly_path
+        or os.getenv("LEADERBOARD_ANOMALY_PATH")
+        or db_path.with_suffix(".anomaly.json")
+    )
+    # Scheduled online snapshots are off unless a directory is configured.
+    snapshot_dir = snapshot_dir or os.getenv("LEADERBOARD_SNAPSHOT_DIR") or None
+    snapshot_interval = float(
+        snapshot_interval or os.getenv("LEADERBOARD_SNAPSHOT_INTERVAL") or SNAPSHOT_INTERVAL_SECONDS
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        if app.state.board_watch is not None:
+            app.state.board_watch.cancel()
+        if app.state.snapshots is not None:
+            app.state.snapshots.stop()
+        app.state.db.close()
+        anomaly: Optional[AnomalyScorer] = app.state.anomaly
+        if anomaly is not None and anomaly.runs != app.state.anomaly_checkpoint_runs:
+            save_checkpoint(app.state.anomaly_path, anomaly.to_dict())
 
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=list(DEV_CORS_ORIGINS),
@@ -166,7 +460,10 @@ def create_app(
 
     @app.middleware("http")
     async def limit_request_body(request: Request, call_next):
+        await ensure_ready()
+        await check_meta()
         if request.method == "POST" and request.url.path == "/api/score/submit":
+            app.state.heavy_hitters.submit(get_client_ip(request))
             content_length = request.headers.get("content-length")
             if content_length:
                 try:
@@ -175,7 +472,7 @@ def create_app(
                     length = None
                 if length is not None and length > app.state.max_body_bytes:
                     app.state.metrics["submit_rejected_invalid_payload_total"] += 1
-                    log_rejection(None, "INVALID_PAYLOAD", detail="payload_too_large")
+                    log_rejection(request, None, "INVALID_PAYLOAD", detail="payload_too_large")
                     return JSONResponse(
                         status_code=400,
                         content={"ok": False, "status": "rejected", "reason": "INVALID_PAYLOAD"},
@@ -183,46 +480,173 @@ def create_app(
             body = await request.body()
             if len(body) > app.state.max_body_bytes:
                 app.state.metrics["submit_rejected_invalid_payload_total"] += 1
-                log_rejection(None, "INVALID_PAYLOAD", detail="payload_too_large")
+                log_rejection(request, None, "INVALID_PAYLOAD", detail="payload_too_large")
                 return JSONResponse(
                     status_code=400,
                     content={"ok": False, "status": "rejected", "reason": "INVALID_PAYLOAD"},
                 )
+            digest = body_digest(body)
+            cached = app.state.response_cache.lookup(digest)
+            if cached is not None:
+                return replay_cached(cached)
+            request.state.body_digest = digest
+            controller: AdmissionController = app.state.admission
+            try:
+                await controller.acquire(submit_priority(request, body))
+            except Shed as shed:
+                return shed_response(request, shed.reason)
+            try:
+                return await call_next(request)
+            finally:
+                controller.release()
         return await call_next(request)
 
-    @app.exception_handler(RequestValidationError)
-    def validation_exception_handler(_request: Request, exc: RequestValidationError):
-        LOGGER.info("invalid payload: %s", exc.errors())
+    def invalid_payload_response(request: Request, errors: Any) -> JSONResponse:
+        log_event(LOGGER, logging.INFO, "invalid_payload", errors=errors)
+        track_rejection(request, "INVALID_PAYLOAD")
         metrics: Dict[str, int] = app.state.metrics
         metrics["submit_rejected_invalid_payload_total"] += 1
         return JSONResponse(
             status_code=400,
             content={"ok": False, "status": "rejected", "reason": "INVALID_PAYLOAD"},
         )
+
+    @app.exception_handler(RequestValidationError)
+    async def validation_exception_handler(request: Request, exc: RequestValidationError):
+        return invalid_payload_response(request, exc.errors())
+
+    @app.exception_handler(DatabaseBusy)
+    async def database_busy_handler(request: Request, exc: DatabaseBusy):
+        log_event(LOGGER, logging.WARNING, "db_overloaded", depth=app.state.db.depth)
+        if request.url.path == "/api/score/submit":
+            track_rejection(request, "overloaded")
+        app.state.metrics["rejected_overloaded_total"] += 1
+        return JSONResponse(
+            status_code=503,
+            content={"ok": False, "status": "rejected", "reason": "overloaded"},
+            headers={"Retry-After": "1"},
+        )
+
     app.state.db_path = db_path
-    app.state.ruleset = {
-        "scoring": scoring,
-        "economy": economy,
-        "mobs": mobs,
-        "caps": caps,
-    }
-    app.state.authority_rules = build_authority_rules(app.state.ruleset)
+    app.state.db = DatabaseExecutor(db_path, max_queue=db_queue_size)
+    app.state.ruleset_dir = ruleset_dir
+    app.state.log_pipeline = None
+    app.state.ruleset = None
+    app.state.authority_rules = None
+    app.state.mob_types = ()
+    app.state.anomaly_path = anomaly_path
+    app.state.anomaly = None
+    app.state.anomaly_checkpoint_runs = 0
+    app.state.anomaly_checkpoint = None
+    app.state.snapshots = (
+        SnapshotScheduler(db_path, Path(snapshot_dir), snapshot_interval, stats_fn=app.state.db.stats)
+        if snapshot_dir
+        else None
+    )
+    app.state.ready = False
+    ready_lock = asyncio.Lock()
+
+    def initialize() -> None:
+        app.state.log_pipeline = install_log_pipeline(LOGGER.name)
+        app.state.ruleset, app.state.authority_rules = load_rules(app.state.ruleset_dir)
+        app.state.mob_types = mob_types(app.state.ruleset)
+        app.state.anomaly = load_checkpoint(app.state.anomaly_path)
+        app.state.anomaly_checkpoint_runs = app.state.anomaly.runs
+        if app.state.snapshots is not None:
+            app.state.snapshots.start()
+        app.state.db.call(init_schema)
+        app.state.scores_epoch = app.state.db.call(fetch_meta).get(SCORES_EPOCH, 0)
+
+    async def ensure_ready() -> None:
+        # Logging, rules and schema are set up on first use instead of in create_app, so
+        # importing the module or booting a worker does no file, thread or DB work. The
+        # loading runs in a thread: requests arriving meanwhile wait on the lock, but the
+        # event loop keeps serving connections that are already past it.
+        if app.state.ready:
+            return
+        async with ready_lock:
+            if app.state.ready:
+                return
+            await asyncio.to_thread(initialize)
+            app.state.ready = True
+
+    app.state.ensure_ready = ensure_ready
     app.state.rate_limiter = rate_limiter or RateLimiter()
+    app.state.response_cache = response_cache or ResponseCache()
+    app.state.admission = admission or AdmissionController()
+    app.state.heavy_hitters = heavy_hitters or SubmitterTracker()
     app.state.metrics = {
         "submit_total": 0,
         "submit_accepted_total": 0,
         "submit_rejected_rate_limited_total": 0,
         "submit_rejected_already_submitted_total": 0,
         "submit_rejected_invalid_payload_total": 0,
+        "rejected_overloaded_total": 0,
+        "leaderboard_requests_total": 0,
+        "leaderboard_not_modified_total": 0,
+        "leaderboard_cache_hits_total": 0,
+        "submit_idempotent_replays_total": 0,
+        "scores_epoch_reloads_total": 0,
     }
+    # The latest board version this worker has seen. The version lives in the database and
+    # is bumped by whichever worker commits a top-N insert, so every worker tags the same
+    # rows with the same ETag; the others catch up within META_CHECK_SECONDS.
+    app.state.board_version = 0
+    app.state.meta_checked = float("-inf")
+    app.state.meta_check_interval = META_CHECK_SECONDS
+    app.state.board_hub = BoardHub()
+    app.state.board_watch = None
+    # limit -> (etag, encoded body); an entry is only served while its etag is current.
+    app.state.leaderboard_cache = {}
+    # Seed partitions: (rulesetVersion, seed) -> top N, threshold and encoded bodies. DB jobs
+    # resolve on the loop in queue order and nothing awaits between a read and its put, so
+    # the last put for a partition always holds its latest rows.
+    app.state.partition_cache = PartitionCache()
+    # The partition version the cached entries are current at.
+    app.state.partition_version = 0
+    app.state.scores_epoch = 0
+
+    def leaderboard_etag(limit: int, version: Optional[int] = None) -> str:
+        return f'"{app.state.board_version if version is None else version}-{limit}"'
+
+    def observe_board_version(version: int) -> None:
+        if version > app.state.board_version:
+            app.state.board_version = version
 
-    def get_db():
-        conn = sqlite3.connect(app.state.db_path)
-        conn.row_factory = sqlite3.Row
+    async def check_meta() -> None:
+        # At most one DB trip per interval; a busy queue just defers it.
+        now = time.monotonic()
+        if now - app.state.meta_checked < app.state.meta_check_interval:
+            return
+        app.state.meta_checked = now
         try:
-            yield conn
-        finally:
-            conn.close()
+            meta = await app.state.db.run(fetch_meta)
+        except DatabaseBusy:
+            return
+        epoch = meta.get(SCORES_EPOCH, 0)
+        if epoch != app.state.scores_epoch:
+            # Scores were rewritten in place. The rewrite bumped both versions too, which
+            # expires the cached boards below; the threshold has to be relearned.
+            app.state.scores_epoch = epoch
+            log_event(LOGGER, logging.WARNING, "scores_rewritten", epoch=epoch)
+            app.state.metrics["scores_epoch_reloads_total"] += 1
+            app.state.admission.threshold = None
+        observe_partition_version(meta.get(PARTITION_VERSION, 0))
+        version = meta.get(BOARD_VERSION, 0)
+        if version > app.state.board_version:
+            # Another worker changed the top N.
+            observe_board_version(version)
+            await publish_board()
+
+    async def watch_board() -> None:
+        # A stream is one long request, so a worker whose only clients are SSE subscribers
+        # would never reach check_meta; poll on their behalf until the last one leaves.
+        hub: BoardHub = app.state.board_hub
+        while True:
+            await asyncio.sleep(max(app.state.meta_check_interval, hub.coalesce_seconds))
+            if not hub.subscriber_count:
+                return
+            await check_meta()
 
     def get_client_ip(request: Request) -> str:
         forwarded = request.headers.get("x-forwarded-for")
@@ -232,33 +656,148 @@ def create_app(
             return request.client.host
         return "unknown"
 
-    def compute_rank(conn: sqlite3.Connection, score: int, created_at: str) -> int:
-        row = conn.execute(
-            """
-            SELECT COUNT(*) as ahead
-            FROM score_runs
-            WHERE server_score > ? OR (server_score = ? AND created_at < ?)
-            """,
-            (score, score, created_at),
-        ).fetchone()
-        ahead = row["ahead"] if row else 0
-        return int(ahead) + 1
+    async def publish_board() -> None:
+        hub: BoardHub = app.state.board_hub
+        if not hub.subscriber_count:
+            hub.invalidate()
+            return
+        version, rows = await app.state.db.run(fetch_board, LEADERBOARD_LIMIT)
+        observe_board_version(version)
+        items = [row_to_item(row) for row in rows]
+        app.state.leaderboard_cache[LEADERBOARD_LIMIT] = (
+            leaderboard_etag(LEADERBOARD_LIMIT, version),
+            encode_json({"items": items}),
+        )
+        hub.publish(version, items)
+
+    def observe_partition_version(version: int, bumped: bool = False) -> bool:
+        # Returns whether rows read at `version` may be cached. A jump past our own bump
+        # means another worker changed some partition; the counter does not say which, so
+        # every cached entry goes.
+        current = app.state.partition_version
+        if version < current:
+            return False
+        if version > current + (1 if bumped else 0):
+            app.state.partition_cache.clear()
+        app.state.partition_version = version
+        return True
+
+    def put_partition(board: BoardKey, version: int, rows: list, bumped: bool = False) -> PartitionEntry:
+        entry = PartitionEntry(version, [row_to_item(row) for row in rows])
+        if observe_partition_version(version, bumped):
+            app.state.partition_cache.put(board, entry)
+        return entry
+
+    def submit_priority(request: Request, body: bytes) -> int:
+        # Mirrors the cheap gate from a peek at the raw body. A seeded run can rank on its
+        # partition whatever the global board says, so only a full cached partition judges it.
+        controller: AdmissionController = app.state.admission
+        if not controller.saturated:
+            return PRIORITY_UNKNOWN
+        score = peek_client_score(request.headers.get(CLIENT_SCORE_HEADER), body)
+        if score is None:
+            return PRIORITY_UNKNOWN
+        seed = peek_seed(body)
+        if seed is None:
+            min_score = controller.threshold
+        else:
+            entry = app.state.partition_cache.peek((RULESET_VERSION, seed))
+            full = entry is not None and entry.full(CHEAP_GATE_LIMIT)
+            min_score = entry.min_score(CHEAP_GATE_LIMIT) if full else None
+        if min_score is None:
+            return PRIORITY_UNKNOWN
+        gate = gate_for_min_score(score, min_score, CHEAP_GATE_MARGIN)
+        return PRIORITY_LOW if gate.skip else PRIORITY_PLAUSIBLE
+
+    def shed_response(request: Request, reason: str) -> JSONResponse:
+        log_event(LOGGER, logging.INFO, "submit_shed", reason=reason)
+        if reason == SHED_LOW_SCORE:
+            # The same answer the cheap gate would have given, minus the parse and DB trip.
+            return JSONResponse(content={"ok": True, "status": "not_in_topN", "reason": "NONE"})
+        app.state.metrics["rejected_overloaded_total"] += 1
+        track_rejection(request, "overloaded")
+        return JSONResponse(
+            status_code=503,
+            content={"ok": False, "status": "rejected", "reason": "overloaded"},
+            headers={"Retry-After": "1"},
+        )
 
-    def log_rejection(run_id: str | None, reason: str, **detail: Any) -> None:
-        payload = {"run": run_id, "reason": reason}
-        if detail:
-            payload.update(detail)
-        LOGGER.info("submission rejected: %s", payload)
+    def replay_cached(cached) -> Response:
+        app.state.metrics["submit_idempotent_replays_total"] += 1
+        log_event(LOGGER, logging.INFO, "idempotent_replay", run=cached.run_id)
+        return Response(
+            content=cached.body,
+            status_code=cached.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    def reject_replay(request: Request, run_id: str, digest: Optional[bytes]) -> Response:
+        # The same body may have been answered while this request waited on the DB queue.
+        cached = app.state.response_cache.lookup(digest) if digest is not None else None
+        if cached is not None and cached.run_id == run_id:
+            return replay_cached(cached)
+        log_rejection(request, run_id, "already_submitted")
+        app.state.metrics["submit_rejected_already_submitted_total"] += 1
+        return JSONResponse(
+            status_code=409,
+            content={"ok": False, "status": "rejected", "reason": "already_submitted"},
+        )
+
+    def admin_denied(request: Request) -> Optional[JSONResponse]:
+        # Admin endpoints are invisible without a configured token.
+        if admin_token is None:
+            return JSONResponse(status_code=404, content={"detail": "Not Found"})
+        supplied = request.headers.get("x-admin-token", "")
+        if not hmac.compare_digest(supplied.encode(), admin_token.encode()):
+            return JSONResponse(status_code=401, content={"ok": False, "reason": "unauthorized"})
+        return None
+
+    def score_anomaly(run_id: str, progress: int, result: AuthorityResult) -> float:
+        scorer: AnomalyScorer = app.state.anomaly
+        score = scorer.observe(
+            run_id,
+            AnomalyScorer.features(progress, result.wave_kills, result.wave_drops, result.gold_drift),
+        )
+        # The state is copied on the loop and written from a worker thread; a checkpoint
+        # still in flight just defers the next one.
+        pending = app.state.anomaly_checkpoint
+        if scorer.runs - app.state.anomaly_checkpoint_runs >= CHECKPOINT_EVERY and (
+            pending is None or pending.done()
+        ):
+            app.state.anomaly_checkpoint_runs = scorer.runs
+            app.state.anomaly_checkpoint = asyncio.get_running_loop().run_in_executor(
+                None, save_checkpoint, app.state.anomaly_path, scorer.to_dict()
+            )
+        return score
+
+    def track_rejection(request: Request, reason: str) -> None:
+        # The player name is known once the body has parsed.
+        player = getattr(request.state, "player", None)
+        app.state.heavy_hitters.rejection(reason, get_client_ip(request), player)
+
+    def log_rejection(request: Request, run_id: str | None, reason: str, **detail: Any) -> None:
+        log_event(LOGGER, logging.INFO, "submission_rejected", run=run_id, reason=reason, **detail)
+        track_rejection(request, reason)
 
     @app.post("/api/score/submit", response_model=SubmitResponse)
-    def submit(payload: SubmitPayload, request: Request, conn: sqlite3.Connection = Depends(get_db)):
+    async def submit(request: Request):
+        try:
+            payload = parse_submit_payload(await request.body())
+        except ValidationError as exc:
+            return invalid_payload_response(request, exc.errors(include_url=False))
+        except ValueError as exc:
+            return invalid_payload_response(request, [{"type": "json_invalid", "msg": str(exc)}])
         ip = get_client_ip(request)
+        request.state.player = payload.playerName or "anonymous"
+        app.state.heavy_hitters.player(request.state.player)
         metrics: Dict[str, int] = app.state.metrics
         metrics["submit_total"] += 1
         limiter: RateLimiter = app.state.rate_limiter
         if not limiter.allow(ip):
-            LOGGER.warning("rate limited submission ip=%s run=%s", ip, payload.runId)
+            log_event(LOGGER, logging.WARNING, "rate_limited", ip=ip, run=payload.runId)
             metrics["submit_rejected_rate_limited_total"] += 1
+            track_rejection(request, "rate_limited")
             return JSONResponse(
                 status_code=429,
                 content={"ok": False, "status": "rejected", "reason": "rate_limited"},
@@ -269,38 +808,54 @@ def create_app(
         try:
             UUID(payload.runId, version=4)
         except ValueError:
-            log_rejection(payload.runId, "INVALID_PAYLOAD", detail="invalid_run_id")
+            log_rejection(request, payload.runId, "INVALID_PAYLOAD", detail="invalid_run_id")
             metrics["submit_rejected_invalid_payload_total"] += 1
             return JSONResponse(
                 status_code=400,
                 content={"ok": False, "status": "rejected", "reason": "INVALID_PAYLOAD"},
             )
 
+        # Validation is CPU-bound and short; it runs inline on the event loop, only SQLite
+        # work is handed to the DB executor.
         precheck = validate_precheck(payload, rules)
         if precheck:
-            log_rejection(payload.runId, precheck.reason, **(precheck.detail or {}))
+            log_rejection(request, payload.runId, precheck.reason, **(precheck.detail or {}))
             metrics["submit_rejected_invalid_payload_total"] += 1
             return JSONResponse(
                 status_code=precheck.http_status,
                 content={"ok": False, "status": "rejected", "reason": precheck.reason},
             )
 
-        if is_replay(conn, payload.runId):
-            log_rejection(payload.runId, "already_submitted")
-            metrics["submit_rejected_already_submitted_total"] += 1
-            return JSONResponse(
-                status_code=409,
-                content={"ok": False, "status": "rejected", "reason": "already_submitted"},
-            )
+        db: DatabaseExecutor = app.state.db
+        board: Optional[BoardKey] = None
+        known_gate: Optional[CheapGateResult] = None
+        if payload.seed is not None:
+            board = (payload.rulesetVersion, payload.seed)
+            entry = app.state.partition_cache.get(board)
+            # A sparse partition's minimum says nothing about the global board.
+            if entry is not None and entry.full(CHEAP_GATE_LIMIT):
+                known_gate = gate_for_min_score(
+                    payload.clientScore, entry.min_score(CHEAP_GATE_LIMIT), CHEAP_GATE_MARGIN, full=True
+                )
+        replay, gate = await db.run(
+            check_submission, payload.runId, payload.clientScore, board, known_gate
+        )
+        digest: Optional[bytes] = getattr(request.state, "body_digest", None)
+        if replay:
+            return reject_replay(request, payload.runId, digest)
+        # A skipped seeded run carries its partition gate; every other gate is the global one.
+        if gate.full and (board is None or not gate.skip):
+            app.state.admission.observe_threshold(gate.min_score)
 
-        gate = should_skip_authority(conn, payload.clientScore, CHEAP_GATE_LIMIT, CHEAP_GATE_MARGIN)
         if gate.skip:
-            LOGGER.info(
-                "cheap gate skip: run=%s clientScore=%s minScore=%s threshold=%s",
-                payload.runId,
-                payload.clientScore,
-                gate.min_score,
-                gate.threshold,
+            log_event(
+                LOGGER,
+                logging.INFO,
+                "cheap_gate_skip",
+                run=payload.runId,
+                clientScore=payload.clientScore,
+                minScore=gate.min_score,
+                threshold=gate.threshold,
             )
             return SubmitResponse(
                 ok=True,
@@ -310,7 +865,7 @@ def create_app(
 
         authority_result = validate_authority(payload, rules)
         if not authority_result.ok:
-            log_rejection(payload.runId, authority_result.reason, **(authority_result.detail or {}))
+            log_rejection(request, payload.runId, authority_result.reason, **(authority_result.detail or {}))
             return SubmitResponse(
                 ok=False,
                 status="rejected",
@@ -321,17 +876,11 @@ def create_app(
         earned_drops = authority_result.earned_drops
         earned_total = authority_result.earned_total
 
-        hp_score = int(payload.hpLeft * int(scoring["HP_MAX"]) / payload.hpMax)
-        server_score = (
-            payload.progress * int(scoring["STRIDE"]) + total_kills * int(scoring["KILL_UNIT"]) + hp_score
-        )
+        server_score = compute_server_score(payload, scoring, total_kills)
 
         created_at = datetime.now(timezone.utc).isoformat()
-        conn.execute(
-            """
-            INSERT INTO score_runs (run_id, player_name, client_score, server_score, progress, created_at, ip)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+        inserted = await db.run(
+            insert_run,
             (
                 payload.runId,
                 payload.playerName or "anonymous",
@@ -340,56 +889,242 @@ def create_app(
                 payload.progress,
                 created_at,
                 ip,
+                payload.seed,
+                payload.rulesetVersion,
             ),
+            # Validated waves are kept compactly for audits and offline re-analysis.
+            (payload.rulesetVersion, encode_run(payload, app.state.mob_types)),
         )
-        conn.commit()
-        rank = compute_rank(conn, server_score, created_at)
-        LOGGER.info(
-            "accepted run=%s ip=%s progress=%s clientScore=%s serverScore=%s rank=%s kills=%s earned=%s",
-            payload.runId,
-            ip,
-            payload.progress,
-            payload.clientScore,
-            server_score,
-            rank,
-            total_kills,
-            earned_total,
+        if inserted is None:
+            return reject_replay(request, payload.runId, digest)
+        rank = inserted.rank
+        if inserted.board_rows is not None:
+            put_partition(board, inserted.partition_version, inserted.board_rows, bumped=True)
+        if inserted.top_scores is not None and len(inserted.top_scores) >= CHEAP_GATE_LIMIT:
+            app.state.admission.observe_threshold(inserted.top_scores[-1])
+        if inserted.board_version is not None:
+            observe_board_version(inserted.board_version)
+            await publish_board()
+        anomaly_score = score_anomaly(payload.runId, payload.progress, authority_result)
+        log_event(
+            LOGGER,
+            logging.INFO,
+            "run_accepted",
+            run=payload.runId,
+            ip=ip,
+            progress=payload.progress,
+            clientScore=payload.clientScore,
+            serverScore=server_score,
+            rank=rank,
+            seed=payload.seed,
+            seedRank=inserted.seed_rank,
+            kills=total_kills,
+            earned=earned_total,
+            anomaly=round(anomaly_score, 3),
         )
         metrics["submit_accepted_total"] += 1
-        return SubmitResponse(
-            ok=True,
-            status="accepted",
-            reason="NONE",
-            serverScore=server_score,
-            earnedGold=earned_drops,
-            totalKills=total_kills,
+        body = encode_json(
+            SubmitResponse(
+                ok=True,
+                status="accepted",
+                reason="NONE",
+                serverScore=server_score,
+                earnedGold=earned_drops,
+                totalKills=total_kills,
+                rank=rank,
+                seedRank=inserted.seed_rank,
+            ).model_dump()
         )
+        if digest is not None:
+            app.state.response_cache.store(payload.runId, digest, 200, body)
+        return Response(content=body, media_type="application/json")
 
     @app.get("/api/leaderboard", response_model=LeaderboardResponse)
-    def leaderboard(limit: int = LEADERBOARD_LIMIT, conn: sqlite3.Connection = Depends(get_db)):
+    async def leaderboard(
+        request: Request,
+        limit: int = LEADERBOARD_LIMIT,
+        seed: Optional[int] = None,
+        ruleset: Optional[str] = None,
+    ):
         limit = max(1, min(limit, LEADERBOARD_LIMIT))
-        LOGGER.info("leaderboard request limit=%s", limit)
-        rows = conn.execute(
-            """
-            SELECT player_name, server_score, progress, created_at
-            FROM score_runs
-            ORDER BY server_score DESC, created_at ASC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-        items = [
-            LeaderboardItem(
-                playerName=row["player_name"],
-                score=row["server_score"],
-                progress=row["progress"],
-                createdAt=row["created_at"],
+        metrics: Dict[str, int] = app.state.metrics
+        metrics["leaderboard_requests_total"] += 1
+        if seed is not None:
+            return await partition_leaderboard(request, (ruleset or RULESET_VERSION, seed), limit)
+        etag = leaderboard_etag(limit)
+        headers = {"ETag": etag, "Cache-Control": LEADERBOARD_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            metrics["leaderboard_not_modified_total"] += 1
+            return Response(status_code=304, headers=headers)
+        log_event(LOGGER, logging.INFO, "leaderboard_request", limit=limit)
+        cache: Dict[int, tuple[str, bytes]] = app.state.leaderboard_cache
+        cached = cache.get(limit)
+        if cached is not None and cached[0] == etag:
+            metrics["leaderboard_cache_hits_total"] += 1
+            return Response(content=cached[1], media_type="application/json", headers=headers)
+        version, rows = await app.state.db.run(fetch_board, limit)
+        observe_board_version(version)
+        # The tag comes from the same read as the rows, never from a version seen earlier.
+        headers["ETag"] = leaderboard_etag(limit, version)
+        # Rows are already the response shape; encoding them directly skips building and then
+        # re-validating LeaderboardItem/LeaderboardResponse models for response_model.
+        body = encode_json({"items": [row_to_item(row) for row in rows]})
+        cache[limit] = (headers["ETag"], body)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def partition_leaderboard(request: Request, board: BoardKey, limit: int) -> Response:
+        metrics: Dict[str, int] = app.state.metrics
+        entry = app.state.partition_cache.get(board)
+        if entry is None:
+            version, rows = await app.state.db.run(fetch_partition_board, board, LEADERBOARD_LIMIT)
+            entry = put_partition(board, version, rows)
+        else:
+            metrics["leaderboard_cache_hits_total"] += 1
+        etag = f'"s{entry.version}-{limit}"'
+        headers = {"ETag": etag, "Cache-Control": LEADERBOARD_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            metrics["leaderboard_not_modified_total"] += 1
+            return Response(status_code=304, headers=headers)
+        body = entry.bodies.get(limit)
+        if body is None:
+            body = entry.bodies[limit] = encode_json({"items": entry.items[:limit]})
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.get("/api/leaderboard/stream")
+    async def leaderboard_stream():
+        hub: BoardHub = app.state.board_hub
+        # The subscription itself is taken by the stream once the response starts.
+        try:
+            hub.ensure_capacity()
+        except HubFull:
+            return JSONResponse(
+                status_code=503,
+                content={"ok": False, "status": "rejected", "reason": "overloaded"},
+                headers={"Retry-After": "5"},
+            )
+        if not hub.primed:
+            version, rows = await app.state.db.run(fetch_board, LEADERBOARD_LIMIT)
+            if not hub.primed:
+                hub.prime(version, [row_to_item(row) for row in rows])
+        watch: Optional[asyncio.Task] = app.state.board_watch
+        if watch is None or watch.done():
+            app.state.board_watch = asyncio.create_task(watch_board())
+        return StreamingResponse(
+            hub.stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/api/players", response_model=PlayersResponse)
+    async def top_players(limit: int = TOP_PLAYERS_LIMIT):
+        limit = max(1, min(limit, TOP_PLAYERS_MAX))
+        rows = await app.state.db.run(fetch_top_players, limit)
+        return Response(
+            content=encode_json({"items": [row_to_player(row) for row in rows]}),
+            media_type="application/json",
+        )
+
+    @app.get("/api/players/{name}", response_model=PlayerStats)
+    async def player_stats(name: str):
+        row = await app.state.db.run(fetch_player, name)
+        if row is None:
+            return JSONResponse(status_code=404, content={"ok": False, "reason": "player_not_found"})
+        return Response(content=encode_json(row_to_player(row)), media_type="application/json")
+
+    @app.get("/api/admin/export")
+    async def export_runs(
+        request: Request,
+        format: str = "ndjson",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        minScore: Optional[int] = None,
+    ):
+        denied = admin_denied(request)
+        if denied is not None:
+            return denied
+        try:
+            stream = stream_export(app.state.db_path, format, ExportFilter(since, until, minScore))
+        except ValueError as exc:
+            return JSONResponse(status_code=400, content={"ok": False, "reason": "invalid_export", "detail": str(exc)})
+        log_event(LOGGER, logging.INFO, "export_started", format=format, since=since, until=until, minScore=minScore)
+        # A sync generator: Starlette pulls each chunk in the threadpool, off the event loop
+        # and off the DB executor, on the export's own read connection. Starlette does not
+        # close it when the client disconnects; the background task does, so the snapshot
+        # never outlives the response.
+        return StreamingResponse(
+            stream,
+            media_type=MEDIA_TYPES[format],
+            headers={
+                "Cache-Control": "no-store",
+                "Content-Disposition": f'attachment; filename="score_runs.{format}"',
+            },
+            background=BackgroundTask(stream.close),
+        )
+
+    @app.get("/api/admin/anomalies")
+    async def anomalies(request: Request, limit: int = 20):
+        denied = admin_denied(request)
+        if denied is not None:
+            return denied
+        scorer: AnomalyScorer = app.state.anomaly
+        return {
+            "runs": scorer.runs,
+            "items": scorer.top(max(1, min(limit, scorer.top_outliers))),
+            "sketches": scorer.summary(),
+        }
+
+    @app.get("/api/admin/heavy-hitters")
+    async def heavy_hitters_top(request: Request, limit: int = 20):
+        denied = admin_denied(request)
+        if denied is not None:
+            return denied
+        tracker: SubmitterTracker = app.state.heavy_hitters
+        return {
+            "windowSeconds": tracker.window_seconds,
+            **tracker.top(max(1, min(limit, HEAVY_HITTERS_K))),
+        }
+
+    @app.post("/api/admin/snapshots")
+    async def snapshot_now(request: Request):
+        denied = admin_denied(request)
+        if denied is not None:
+            return denied
+        scheduler: Optional[SnapshotScheduler] = app.state.snapshots
+        if scheduler is None:
+            return JSONResponse(status_code=404, content={"ok": False, "reason": "snapshots_disabled"})
+        try:
+            report = await asyncio.to_thread(scheduler.run_once)
+        except (OSError, sqlite3.Error) as exc:
+            # run_once has already logged and counted the failure.
+            return JSONResponse(
+                status_code=500, content={"ok": False, "reason": "snapshot_failed", "detail": str(exc)}
             )
-            for row in rows
-        ]
-        return LeaderboardResponse(items=items)
+        return {"ok": True, **asdict(report)}
+
+    @app.get("/api/metrics")
+    async def metrics_snapshot():
+        db: DatabaseExecutor = app.state.db
+        return {
+            **app.state.metrics,
+            **db.stats(),
+            **app.state.board_hub.stats(),
+            "idempotency_cache_entries": len(app.state.response_cache),
+            **app.state.partition_cache.stats(),
+            **app.state.admission.stats(),
+            **app.state.heavy_hitters.stats(),
+            "log_records_dropped_total": app.state.log_pipeline.dropped,
+            "log_queue_depth": app.state.log_pipeline.queue_depth,
+            **(app.state.snapshots.stats() if app.state.snapshots is not None else {}),
+        }
 
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Any:
+    # `backend.app:app` is built on first access, so importing this module from tests, CLIs
+    # and benchmarks does not construct (or create the database for) the default app.
+    if name == "app":
+        value = create_app()
+        globals()["app"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import logging
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+from backend.benchmarks.cases import DEFAULT_ROW_COUNTS, build_cases
+from backend.benchmarks.runner import (
+    DEFAULT_THRESHOLD,
+    compare_results,
+    format_result,
+    load_baseline,
+    run_cases,
+    save_baseline,
+)
+
+
+def parse_rows(value: str) -> list[int]:
+    return [int(float(part)) for part in value.split(",") if part.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.benchmarks",
+        description="Benchmark the submit/leaderboard hot paths.",
+    )
+    parser.add_argument("--rows", type=parse_rows, default=list(DEFAULT_ROW_COUNTS),
+                        help="comma separated preloaded row counts (default: 1e3,1e5,1e6)")
+    parser.add_argument("--iterations", type=int, default=2000, help="timed iterations for micro cases")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--filter", default="*", help="glob over case names")
+    parser.add_argument("--save", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown before flagging a regression (0.15 = 15%%)")
+    parser.add_argument("--with-logs", action="store_true", help="keep service INFO logs enabled")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.with_logs:
+        logging.getLogger("leaderboard").setLevel(logging.WARNING)
+
+    with ExitStack() as stack:
+        cases = [case for case in build_cases(stack, args.rows) if fnmatch.fnmatch(case.name, args.filter)]
+        results = run_cases(cases, args.iterations, args.warmup, report=lambda r: print(format_result(r)))
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"saved baseline to {args.save}")
+    if args.compare:
+        regressions = compare_results(load_baseline(args.compare), results, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.name}: {regression.baseline_us:.1f}us -> "
+                f"{regression.current_us:.1f}us (x{regression.ratio:.2f})"
+            )
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import itertools
+import json
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+
+from backend.anomaly import AnomalyScorer
+from backend.app import (
+    LEADERBOARD_LIMIT,
+    LeaderboardItem,
+    LeaderboardResponse,
+    RateLimiter,
+    SubmitPayload,
+    create_app,
+    parse_submit_payload,
+    encode_json,
+    init_db,
+    load_ruleset,
+    row_to_item,
+)
+from backend.benchmarks.runner import BenchCase
+from backend.guards.authority import build_authority_rules, validate_authority, validate_precheck
+from backend.ruleset_snapshot import RULESET_PARTS, load_rules, load_sources, write_snapshot
+from backend.telemetry import decode_run, encode_run, mob_types
+from backend.tests.factories import build_seeded_payload
+
+
+ROOT = Path(__file__).resolve().parents[2]
+RULESET_DIR = ROOT / "shared" / "ruleset"
+DEFAULT_ROW_COUNTS = (1_000, 100_000, 1_000_000)
+E2E_ITERATIONS = 200
+STARTUP_ITERATIONS = 50
+COLD_IMPORT_ITERATIONS = 10
+PRELOAD_BATCH = 50_000
+# Seed partitions spread over the preloaded rows; well above the partition cache size, so
+# the partition leaderboard case mostly measures the indexed read.
+PRELOAD_PARTITIONS = 20_000
+RUN_ID_PLACEHOLDER = "00000000-0000-4000-8000-000000000000"
+
+
+def load_shared_ruleset(ruleset_dir: Path = RULESET_DIR) -> dict:
+    return {
+        "scoring": load_ruleset(ruleset_dir / "scoring.v1.json"),
+        "economy": load_ruleset(ruleset_dir / "economy.v1.json"),
+        "mobs": load_ruleset(ruleset_dir / "mobs.v1.json"),
+        "caps": load_ruleset(ruleset_dir / "caps.v1.json"),
+    }
+
+
+def build_max_payload(ruleset: dict, seed: int = 1, **overrides) -> dict:
+    rules = build_authority_rules(ruleset)
+    # Every wave at its mob cap; only the two weakest mob types, so full-hp kills stay within
+    # the per-wave damage budget and the payload is accepted.
+    weakest = sorted(rules.mob_defs, key=lambda name: rules.mob_defs[name]["hp"])[:2]
+    payload, _ = build_seeded_payload(
+        ruleset, seed=seed, progress=rules.wave_count, full_waves=True, mob_types=weakest
+    )
+    payload.update(overrides)
+    return payload
+
+
+def preload_rows(db_path: Path, count: int, max_score: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    conn = sqlite3.connect(db_path)
+    try:
+        for start in range(0, count, PRELOAD_BATCH):
+            stop = min(count, start + PRELOAD_BATCH)
+            rows = []
+            for index in range(start, stop):
+                score = rng.randint(0, max_score)
+                rows.append(
+                    (
+                        f"preload-{index:08d}",
+                        f"player-{index % 5000}",
+                        score,
+                        score,
+                        rng.randint(0, 30),
+                        (base + timedelta(seconds=index)).isoformat(),
+                        f"10.{index % 256}.{(index // 256) % 256}.1",
+                        index % PRELOAD_PARTITIONS,
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO score_runs (run_id, player_name, client_score, server_score, progress, created_at, ip, seed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+
+class BoardFixture:
+    def __init__(self, stack: ExitStack, rows: int, ruleset: dict) -> None:
+        self.stack = stack
+        self.rows = rows
+        self.ruleset = ruleset
+        self.client: TestClient | None = None
+
+    def ensure(self) -> TestClient:
+        if self.client is None:
+            workdir = Path(self.stack.enter_context(tempfile.TemporaryDirectory(prefix="td-bench-")))
+            db_path = workdir / "leaderboard.db"
+            app = create_app(
+                db_path=db_path,
+                ruleset_dir=RULESET_DIR,
+                rate_limiter=RateLimiter(max_requests=10**9),
+            )
+            init_db(db_path)
+            # Preloaded runs sit below a full clear so benchmark submissions reach the insert path.
+            preload_rows(db_path, self.rows, max_score=int(self.ruleset["scoring"]["STRIDE"]) * 25)
+            self.client = self.stack.enter_context(TestClient(app))
+        return self.client
+
+
+def micro_cases(ruleset: dict) -> list[BenchCase]:
+    def precheck():
+        rules = build_authority_rules(ruleset)
+        payload = SubmitPayload(**build_max_payload(ruleset))
+        return lambda: validate_precheck(payload, rules)
+
+    def authority():
+        rules = build_authority_rules(ruleset)
+        payload = SubmitPayload(**build_max_payload(ruleset))
+        return lambda: validate_authority(payload, rules)
+
+    def rules_build():
+        return lambda: build_authority_rules(ruleset)
+
+    def parse_pydantic():
+        body = json.dumps(build_max_payload(ruleset)).encode("utf-8")
+        return lambda: SubmitPayload.model_validate(json.loads(body))
+
+    def parse_compiled():
+        body = json.dumps(build_max_payload(ruleset)).encode("utf-8")
+        return lambda: parse_submit_payload(body)
+
+    def telemetry_encode():
+        payload = SubmitPayload(**build_max_payload(ruleset))
+        types = mob_types(ruleset)
+        return lambda: encode_run(payload, types)
+
+    def telemetry_decode():
+        types = mob_types(ruleset)
+        blob = encode_run(SubmitPayload(**build_max_payload(ruleset)), types)
+        return lambda: decode_run(blob, types)
+
+    def anomaly_observe():
+        rules = build_authority_rules(ruleset)
+        payload = SubmitPayload(**build_max_payload(ruleset))
+        result = validate_authority(payload, rules)
+        features = AnomalyScorer.features(payload.progress, result.wave_kills, result.wave_drops, result.gold_drift)
+        scorer = AnomalyScorer()
+        # Warm history so scoring (not just sketch inserts) is measured.
+        for index in range(scorer.min_samples * 4):
+            scorer.observe(f"warm-{index}", features)
+        return lambda: scorer.observe("bench", features)
+
+    return [
+        BenchCase("validate_precheck[max_payload]", precheck),
+        BenchCase("validate_authority[max_payload]", authority),
+        BenchCase("build_authority_rules", rules_build),
+        BenchCase("parse_payload[pydantic]", parse_pydantic),
+        BenchCase("parse_payload[compiled]", parse_compiled),
+        BenchCase("telemetry_encode[max_payload]", telemetry_encode),
+        BenchCase("telemetry_decode[max_payload]", telemetry_decode),
+        BenchCase("anomaly_observe[max_payload]", anomaly_observe),
+    ]
+
+
+def leaderboard_rows(limit: int = LEADERBOARD_LIMIT) -> list[sqlite3.Row]:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE score_runs (player_name TEXT, server_score INTEGER, progress INTEGER, created_at TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO score_runs VALUES (?, ?, ?, ?)",
+        [(f"player-{i}", 30_000_000 - i, 30, f"2024-01-01T00:00:0{i}+00:00") for i in range(limit)],
+    )
+    rows = conn.execute("SELECT * FROM score_runs ORDER BY server_score DESC").fetchall()
+    conn.close()
+    return rows
+
+
+def serialization_cases() -> list[BenchCase]:
+    # Per-request cost of turning top-N rows into response bytes, before and after the
+    # pre-encoded path.
+    def response_model():
+        rows = leaderboard_rows()
+        field = create_model_field(name="Response_leaderboard", type_=LeaderboardResponse, mode="serialization")
+
+        def run():
+            content = LeaderboardResponse(
+                items=[
+                    LeaderboardItem(
+                        playerName=row["player_name"],
+                        score=row["server_score"],
+                        progress=row["progress"],
+                        createdAt=row["created_at"],
+                    )
+                    for row in rows
+                ]
+            )
+            value, _ = field.validate(content, {}, loc=("response",))
+            return JSONResponse(field.serialize(value, by_alias=True)).body
+
+        return run
+
+    def encoded():
+        rows = leaderboard_rows()
+        return lambda: encode_json({"items": [row_to_item(row) for row in rows]})
+
+    def cached():
+        body = encode_json({"items": [row_to_item(row) for row in leaderboard_rows()]})
+        cache = {LEADERBOARD_LIMIT: ('"etag"', body)}
+
+        def run():
+            entry = cache.get(LEADERBOARD_LIMIT)
+            return entry[1] if entry and entry[0] == '"etag"' else None
+
+        return run
+
+    return [
+        BenchCase("leaderboard_serialize[response_model]", response_model),
+        BenchCase("leaderboard_serialize[encoded]", encoded),
+        BenchCase("leaderboard_serialize[cached]", cached),
+    ]
+
+
+def startup_cases(stack: ExitStack) -> list[BenchCase]:
+    workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="td-bench-start-")))
+    ruleset_dir = workdir / "ruleset"
+    ruleset_dir.mkdir()
+    for part in RULESET_PARTS:
+        shutil.copy(RULESET_DIR / f"{part}.v1.json", ruleset_dir)
+    write_snapshot(ruleset_dir)
+
+    def rules_from_json():
+        def run():
+            ruleset = load_sources(RULESET_DIR)
+            return build_authority_rules(ruleset)
+
+        return run
+
+    def rules_from_snapshot():
+        return lambda: load_rules(ruleset_dir)
+
+    def construct():
+        return lambda: create_app(db_path=workdir / "startup.db", ruleset_dir=ruleset_dir)
+
+    def first_request():
+        def run():
+            app = create_app(db_path=workdir / "startup.db", ruleset_dir=ruleset_dir)
+            return TestClient(app).get("/api/leaderboard")
+
+        return run
+
+    def cold_import():
+        command = [sys.executable, "-c", "import backend.app as m; m.app"]
+        return lambda: subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+
+    return [
+        BenchCase("load_rules[json]", rules_from_json),
+        BenchCase("load_rules[snapshot]", rules_from_snapshot),
+        BenchCase("create_app", construct, iterations=STARTUP_ITERATIONS),
+        BenchCase("create_app+first_request", first_request, iterations=STARTUP_ITERATIONS),
+        BenchCase("cold_import[subprocess]", cold_import, iterations=COLD_IMPORT_ITERATIONS),
+    ]
+
+
+def e2e_cases(fixture: BoardFixture) -> list[BenchCase]:
+    ruleset = fixture.ruleset
+    headers = {"content-type": "application/json"}
+
+    def submit():
+        client = fixture.ensure()
+        template = json.dumps(build_max_payload(ruleset, runId=RUN_ID_PLACEHOLDER))
+        return lambda: client.post(
+            "/api/score/submit",
+            content=template.replace(RUN_ID_PLACEHOLDER, str(uuid4())),
+            headers=headers,
+        )
+
+    def cheap_gate():
+        client = fixture.ensure()
+        template = json.dumps(build_max_payload(ruleset, runId=RUN_ID_PLACEHOLDER, clientScore=1))
+        return lambda: client.post(
+            "/api/score/submit",
+            content=template.replace(RUN_ID_PLACEHOLDER, str(uuid4())),
+            headers=headers,
+        )
+
+    def leaderboard():
+        client = fixture.ensure()
+        return lambda: client.get("/api/leaderboard")
+
+    def leaderboard_partition():
+        client = fixture.ensure()
+        seeds = itertools.cycle(range(0, PRELOAD_PARTITIONS, 7))
+        return lambda: client.get(f"/api/leaderboard?seed={next(seeds)}")
+
+    suffix = f"[rows={fixture.rows}]"
+    return [
+        BenchCase(f"submit_accepted{suffix}", submit, iterations=E2E_ITERATIONS),
+        BenchCase(f"submit_cheap_gate{suffix}", cheap_gate, iterations=E2E_ITERATIONS),
+        BenchCase(f"leaderboard{suffix}", leaderboard, iterations=E2E_ITERATIONS),
+        BenchCase(f"leaderboard_partition{suffix}", leaderboard_partition, iterations=E2E_ITERATIONS),
+    ]
+
+
+def build_cases(stack: ExitStack, row_counts: Iterable[int] = DEFAULT_ROW_COUNTS) -> list[BenchCase]:
+    ruleset = load_shared_ruleset()
+    cases = micro_cases(ruleset) + serialization_cases() + startup_cases(stack)
+    for rows in row_counts:
+        cases.extend(e2e_cases(BoardFixture(stack, rows, ruleset)))
+    return cases
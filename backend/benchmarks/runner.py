@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+DEFAULT_THRESHOLD = 0.15
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    # setup() runs untimed and returns the callable that is timed once per iteration.
+    setup: Callable[[], Callable[[], object]]
+    iterations: Optional[int] = None
+    teardown: Optional[Callable[[], None]] = None
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    iterations: int
+    mean_us: float
+    median_us: float
+    p95_us: float
+    min_us: float
+
+    def as_dict(self) -> dict:
+        return {
+            "iterations": self.iterations,
+            "mean_us": round(self.mean_us, 3),
+            "median_us": round(self.median_us, 3),
+            "p95_us": round(self.p95_us, 3),
+            "min_us": round(self.min_us, 3),
+        }
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline_us: float
+    current_us: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_us / self.baseline_us if self.baseline_us else float("inf")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def run_case(case: BenchCase, iterations: int, warmup: int) -> BenchResult:
+    fn = case.setup()
+    count = case.iterations or iterations
+    try:
+        for _ in range(warmup):
+            fn()
+        samples: list[float] = []
+        perf_counter = time.perf_counter
+        for _ in range(count):
+            start = perf_counter()
+            fn()
+            samples.append((perf_counter() - start) * 1e6)
+    finally:
+        if case.teardown:
+            case.teardown()
+    samples.sort()
+    return BenchResult(
+        name=case.name,
+        iterations=count,
+        mean_us=statistics.fmean(samples),
+        median_us=statistics.median(samples),
+        p95_us=percentile(samples, 0.95),
+        min_us=samples[0],
+    )
+
+
+def run_cases(
+    cases: Iterable[BenchCase],
+    iterations: int,
+    warmup: int,
+    report: Optional[Callable[[BenchResult], None]] = None,
+) -> list[BenchResult]:
+    results = []
+    for case in cases:
+        result = run_case(case, iterations, warmup)
+        if report:
+            report(result)
+        results.append(result)
+    return results
+
+
+def build_baseline(results: Iterable[BenchResult]) -> dict:
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {result.name: result.as_dict() for result in results},
+    }
+
+
+def save_baseline(path: Path, results: Iterable[BenchResult]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(build_baseline(results), indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare_results(
+    baseline: dict,
+    results: Iterable[BenchResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    # Medians are compared so a single scheduler hiccup does not flag a regression.
+    previous = baseline.get("results", {})
+    regressions = []
+    for result in results:
+        entry = previous.get(result.name)
+        if not entry:
+            continue
+        baseline_us = float(entry["median_us"])
+        if result.median_us > baseline_us * (1 + threshold):
+            regressions.append(Regression(result.name, baseline_us, result.median_us))
+    return regressions
+
+
+def format_result(result: BenchResult) -> str:
+    return (
+        f"{result.name:<48} n={result.iterations:<6} median={result.median_us:>10.1f}us "
+        f"p95={result.p95_us:>10.1f}us mean={result.mean_us:>10.1f}us"
+    )
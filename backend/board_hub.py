@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+
+COALESCE_SECONDS = 0.05
+HEARTBEAT_SECONDS = 15.0
+MAX_SUBSCRIBERS = 10_000
+HEARTBEAT = b": ping\n\n"
+
+
+class HubFull(RuntimeError):
+    pass
+
+
+def format_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+def diff_items(previous: list[dict], current: list[dict]) -> list[dict]:
+    changes = []
+    for index, item in enumerate(current):
+        if index >= len(previous) or previous[index] != item:
+            changes.append({"rank": index + 1, "item": item})
+    return changes
+
+
+class Subscriber:
+    # At most one undelivered message per client: a client that falls behind gets the
+    # latest full snapshot instead of an ever-growing backlog of diffs.
+    __slots__ = ("wakeup", "pending", "skipped")
+
+    def __init__(self) -> None:
+        self.wakeup = asyncio.Event()
+        self.pending: Optional[bytes] = None
+        self.skipped = 0
+
+    def offer(self, message: bytes, snapshot: bytes) -> bool:
+        replaced = self.pending is not None
+        if replaced:
+            self.skipped += 1
+        self.pending = snapshot if replaced else message
+        self.wakeup.set()
+        return replaced
+
+    def take(self) -> Optional[bytes]:
+        message = self.pending
+        self.pending = None
+        self.wakeup.clear()
+        return message
+
+
+class BoardHub:
+    def __init__(
+        self,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+        max_subscribers: int = MAX_SUBSCRIBERS,
+    ) -> None:
+        self.coalesce_seconds = coalesce_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+        self.primed = False
+        self.version = 0
+        self.items: list[dict] = []
+        self._snapshot: Optional[bytes] = None
+        self._pending: Optional[tuple[int, list[dict]]] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.connections_total = 0
+        self.rejected_total = 0
+        self.publishes_total = 0
+        self.coalesced_total = 0
+        self.broadcasts_total = 0
+        self.messages_total = 0
+        self.snapshot_fallbacks_total = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self.subscribers)
+
+    def prime(self, version: int, items: list[dict]) -> None:
+        self.version = version
+        self.items = items
+        self._snapshot = None
+        self.primed = True
+
+    def invalidate(self) -> None:
+        # With nobody listening there is no point tracking the board; the next subscriber
+        # re-primes from the database.
+        self.primed = False
+        self._pending = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def snapshot(self) -> bytes:
+        if self._snapshot is None:
+            self._snapshot = format_event("snapshot", {"version": self.version, "items": self.items})
+        return self._snapshot
+
+    def ensure_capacity(self) -> None:
+        if len(self.subscribers) >= self.max_subscribers:
+            self.rejected_total += 1
+            raise HubFull(f"subscriber limit reached ({self.max_subscribers})")
+
+    def subscribe(self) -> Subscriber:
+        self.ensure_capacity()
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        self.connections_total += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, version: int, items: list[dict]) -> None:
+        self.publishes_total += 1
+        if self._pending is not None:
+            self.coalesced_total += 1
+        self._pending = (version, items)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.coalesce_seconds, self.flush)
+
+    def flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        version, items = pending
+        changes = diff_items(self.items, items)
+        removed = len(items) < len(self.items)
+        self.prime(version, items)
+        if not changes and not removed:
+            return
+        # One encoded message is shared by every subscriber.
+        message = format_event("diff", {"version": version, "size": len(items), "changes": changes})
+        snapshot = self.snapshot()
+        self.broadcasts_total += 1
+        for subscriber in self.subscribers:
+            if subscriber.offer(message, snapshot):
+                self.snapshot_fallbacks_total += 1
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        # Subscribes on the first step, not before: a generator that is never started (the
+        # client left before the body, or sending the headers failed) never runs its finally,
+        # so it must not hold a subscription. Losing a race for the last slot ends the stream
+        # at once; EventSource reconnects on its own.
+        try:
+            subscriber = self.subscribe()
+        except HubFull:
+            return
+        try:
+            yield self.snapshot()
+            self.messages_total += 1
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                message = subscriber.take()
+                if message is not None:
+                    self.messages_total += 1
+                    yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "stream_connections_current": len(self.subscribers),
+            "stream_connections_total": self.connections_total,
+            "stream_connections_rejected_total": self.rejected_total,
+            "stream_publishes_total": self.publishes_total,
+            "stream_publishes_coalesced_total": self.coalesced_total,
+            "stream_broadcasts_total": self.broadcasts_total,
+            "stream_messages_total": self.messages_total,
+            "stream_snapshot_fallbacks_total": self.snapshot_fallbacks_total,
+        }
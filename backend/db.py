@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+
+DB_QUEUE_SIZE = 1024
+T = TypeVar("T")
+_STOP = object()
+
+
+class DatabaseBusy(RuntimeError):
+    pass
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Owns the only SQLite connection used by request handlers. Jobs are fn(conn, *args)
+# callables run one at a time on a dedicated thread; a full queue raises DatabaseBusy
+# instead of blocking, so request concurrency is bounded by the queue, not the threadpool.
+class DatabaseExecutor:
+    def __init__(self, db_path: Path, max_queue: int = DB_QUEUE_SIZE, name: str = "leaderboard-db") -> None:
+        self.db_path = Path(db_path)
+        self.max_queue = max_queue
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.jobs_total = 0
+        self.rejected_total = 0
+        self.busy_seconds = 0.0
+        self.max_job_seconds = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def close(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((fn, args, future))
+        except queue.Full:
+            self.rejected_total += 1
+            raise DatabaseBusy(f"database queue full ({self.max_queue})") from None
+        return future
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def call(self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        return self.submit(fn, *args).result(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "db_queue_depth": self.depth,
+            "db_queue_capacity": self.max_queue,
+            "db_jobs_total": self.jobs_total,
+            "db_rejected_total": self.rejected_total,
+            "db_busy_seconds_total": round(self.busy_seconds, 6),
+            "db_max_job_seconds": round(self.max_job_seconds, 6),
+        }
+
+    def _worker(self) -> None:
+        conn = connect(self.db_path)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                fn, args, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                start = time.perf_counter()
+                try:
+                    result = fn(conn, *args)
+                except BaseException as exc:  # noqa: BLE001 - surfaced to the awaiting caller
+                    if conn.in_transaction:
+                        conn.rollback()
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+                elapsed = time.perf_counter() - start
+                self.jobs_total += 1
+                self.busy_seconds += elapsed
+                if elapsed > self.max_job_seconds:
+                    self.max_job_seconds = elapsed
+        finally:
+            conn.close()
+
+
+# Counters shared by every process that opens the database. Writers bump them in the same
+# transaction as the rows they describe, so a reader that sees a value also sees its rows;
+# each worker polls them to notice writes made by the others.
+BOARD_VERSION = "board_version"
+# One counter for all seed partitions: bumped whenever any partition's top N changes.
+PARTITION_VERSION = "partition_version"
+# Bumped by writers that rewrite existing scores (backend.revalidate --apply). The server
+# otherwise assumes scores only arrive through inserts, so its admission threshold only
+# ever rises; a new epoch resets it.
+SCORES_EPOCH = "scores_epoch"
+
+
+def init_meta(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leaderboard_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+    )
+
+
+def fetch_meta(conn: sqlite3.Connection) -> dict[str, int]:
+    return {key: int(value) for key, value in conn.execute("SELECT key, value FROM leaderboard_meta")}
+
+
+def bump_meta(conn: sqlite3.Connection, key: str) -> int:
+    # Must run inside the caller's write transaction; returns the new value.
+    conn.execute(
+        """
+        INSERT INTO leaderboard_meta (key, value) VALUES (?, 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1
+        """,
+        (key,),
+    )
+    return int(conn.execute("SELECT value FROM leaderboard_meta WHERE key = ?", (key,)).fetchone()[0])
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Generator, Optional
+
+
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_COLUMNS = (
+    "run_id",
+    "player_name",
+    "client_score",
+    "server_score",
+    "progress",
+    "created_at",
+    "ip",
+    "seed",
+    "ruleset_version",
+)
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    since: Optional[str] = None
+    until: Optional[str] = None
+    min_score: Optional[int] = None
+
+
+def normalize_timestamp(value: str) -> str:
+    # Stored created_at values are UTC isoformat strings, so normalized bounds compare
+    # correctly as text. Naive input is taken as UTC.
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def build_query(filters: ExportFilter) -> tuple[str, list]:
+    clauses, params = [], []
+    if filters.since is not None:
+        clauses.append("created_at >= ?")
+        params.append(normalize_timestamp(filters.since))
+    if filters.until is not None:
+        clauses.append("created_at < ?")
+        params.append(normalize_timestamp(filters.until))
+    if filters.min_score is not None:
+        clauses.append("server_score >= ?")
+        params.append(filters.min_score)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    # rowid order is insertion order: no sort step, so memory does not grow with the result.
+    return f"SELECT {', '.join(EXPORT_COLUMNS)} FROM score_runs {where} ORDER BY rowid", params
+
+
+def connect_readonly(db_path: Path) -> sqlite3.Connection:
+    uri = f"file:{Path(db_path).resolve().as_posix()}?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+
+
+Chunks = Generator[list[tuple], None, None]
+
+
+def iter_chunks(db_path: Path, sql: str, params: list, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Chunks:
+    # A dedicated read-only connection holding one read transaction: under WAL it sees a
+    # fixed snapshot for the whole export while the DB executor keeps committing. The
+    # snapshot also holds back WAL checkpoints, so a consumer that stops early must close
+    # the generator; GeneratorExit then releases the cursor and the connection here.
+    conn = connect_readonly(db_path)
+    cursor = None
+    try:
+        conn.execute("BEGIN")
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+        conn.execute("COMMIT")
+    finally:
+        if cursor is not None:
+            cursor.close()
+        conn.close()
+
+
+# The encoders close their source when they are closed themselves, rather than leaving
+# it to the garbage collector while something else may still reference it.
+def encode_ndjson(chunks: Chunks) -> Generator[bytes, None, None]:
+    try:
+        for rows in chunks:
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(",", ":")) + "\n"
+                for row in rows
+            ).encode("utf-8")
+    finally:
+        chunks.close()
+
+
+def encode_csv(chunks: Chunks) -> Generator[bytes, None, None]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    try:
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    finally:
+        chunks.close()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_export(
+    db_path: Path,
+    fmt: str = "ndjson",
+    filters: ExportFilter = ExportFilter(),
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Generator[bytes, None, None]:
+    # Argument errors surface here rather than half-way through a streamed response.
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+    sql, params = build_query(filters)
+    chunks = iter_chunks(db_path, sql, params, chunk_rows)
+    return encode_ndjson(chunks) if fmt == "ndjson" else encode_csv(chunks)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.export",
+        description="Stream score_runs as NDJSON or CSV from a consistent snapshot.",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(os.getenv("LEADERBOARD_DB_PATH") or Path("backend") / "leaderboard.db"),
+    )
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--since", help="inclusive lower bound on created_at (ISO 8601)")
+    parser.add_argument("--until", help="exclusive upper bound on created_at (ISO 8601)")
+    parser.add_argument("--min-score", type=int, help="only runs with server_score >= this")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    parser.add_argument("--out", type=Path, help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+    filters = ExportFilter(since=args.since, until=args.until, min_score=args.min_score)
+    try:
+        stream = stream_export(args.db, args.format, filters, args.chunk_rows)
+        if args.out is None:
+            for data in stream:
+                sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        else:
+            with args.out.open("wb") as handle:
+                for data in stream:
+                    handle.write(data)
+    except (ValueError, sqlite3.Error) as exc:
+        print(f"export failed: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
-from .authority import AuthorityResult, AuthorityRules, build_authority_rules, validate_authority
-from .leaderboard import CheapGateResult, should_skip_authority
+from .authority import (
+    AuthorityResult,
+    AuthorityRules,
+    build_authority_rules,
+    compute_server_score,
+    validate_authority,
+)
+from .leaderboard import CheapGateResult, fetch_top_scores, gate_for_min_score, should_skip_authority
 from .replay import is_replay
 
 __all__ = [
@@ -7,6 +13,9 @@ __all__ = [
     "AuthorityRules",
     "CheapGateResult",
     "build_authority_rules",
+    "compute_server_score",
+    "fetch_top_scores",
+    "gate_for_min_score",
     "is_replay",
     "should_skip_authority",
     "validate_authority",
@@ -33,6 +33,11 @@ class AuthorityResult:
     total_kills: int = 0
     earned_drops: int = 0
     earned_total: int = 0
+    # Per-wave breakdown (index 0 = wave 1, including a partial defeat wave) and the
+    # signed goldEnd - expected_end drift, for anomaly scoring.
+    wave_kills: tuple[int, ...] = ()
+    wave_drops: tuple[int, ...] = ()
+    gold_drift: int = 0
 
 
 def build_authority_rules(ruleset: dict) -> AuthorityRules:
@@ -88,6 +93,8 @@ def require_int(source: dict, key: str) -> int:
     return value
 
 
+# `payload` is anything with the SubmitPayload attributes: the compiled __slots__ view on the
+# submit path, the model after a coercing fallback, or a decoded telemetry view.
 def validate_precheck(payload: Any, rules: AuthorityRules) -> AuthorityResult | None:
     if payload.rulesetVersion != "v1":
         return _failure("INVALID_PAYLOAD", http_status=400, ruleset=payload.rulesetVersion)
@@ -142,6 +149,9 @@ def validate_precheck(payload: Any, rules: AuthorityRules) -> AuthorityResult |
 def validate_authority(payload: Any, rules: AuthorityRules) -> AuthorityResult:
     total_kills = 0
     earned_drops = 0
+    previous_damage = 0
+    wave_kills: list[int] = []
+    wave_drops: list[int] = []
     # On defeat we accept one extra (partial) wave payload; precheck guarantees hpLeft == 0 in that case.
     waves_to_process = len(payload.waves)
     for index in range(waves_to_process):
@@ -165,6 +175,9 @@ def validate_authority(payload: Any, rules: AuthorityRules) -> AuthorityResult:
 
         # Allow small numeric drift by letting damageTaken exceed hp by a fixed overflow window.
         wave_multiplier = 1 + index * rules.wave_hp_step
+        wave_damage = 0
+        kills_before = total_kills
+        drops_before = earned_drops
         for mob in mobs_list:
             mob_rule = rules.mob_defs.get(mob.type)
             if not mob_rule:
@@ -187,6 +200,32 @@ def validate_authority(payload: Any, rules: AuthorityRules) -> AuthorityResult:
             if mob.damageTaken >= hp:
                 total_kills += 1
                 earned_drops += int(drop_gold)
+            wave_damage += mob.damageTaken
+
+        # Wave totals are summed in the mob loop above, so the budget and spike checks cost two
+        # comparisons per wave. damage_overflow_max is the per-wave drift window, as mob_overflow_max
+        # is for counts; it also keeps the spike check quiet on small early waves.
+        damage_budget = rules.max_damage_per_wave[index] + rules.damage_overflow_max
+        if wave_damage > damage_budget:
+            return _failure(
+                "DAMAGE_INVALID",
+                wave=expected_wave,
+                damage=wave_damage,
+                cap=damage_budget,
+            )
+        if index > 0 and rules.max_spike_ratio > 0:
+            spike_cap = previous_damage * rules.max_spike_ratio + rules.damage_overflow_max
+            if wave_damage > spike_cap:
+                return _failure(
+                    "DAMAGE_INVALID",
+                    wave=expected_wave,
+                    damage=wave_damage,
+                    previous=previous_damage,
+                    spikeCap=spike_cap,
+                )
+        previous_damage = wave_damage
+        wave_kills.append(total_kills - kills_before)
+        wave_drops.append(earned_drops - drops_before)
 
     # Wave rewards only count for fully completed waves (progress), keeping defeat rewards conservative.
     earned_wave = sum(rules.wave_rewards[: payload.progress])
@@ -208,4 +247,12 @@ def validate_authority(payload: Any, rules: AuthorityRules) -> AuthorityResult:
         total_kills=total_kills,
         earned_drops=earned_drops,
         earned_total=earned_total,
+        wave_kills=tuple(wave_kills),
+        wave_drops=tuple(wave_drops),
+        gold_drift=payload.economy.goldEnd - expected_end,
     )
+
+
+def compute_server_score(payload: Any, scoring: dict, total_kills: int) -> int:
+    hp_score = int(payload.hpLeft * int(scoring["HP_MAX"]) / payload.hpMax)
+    return payload.progress * int(scoring["STRIDE"]) + total_kills * int(scoring["KILL_UNIT"]) + hp_score
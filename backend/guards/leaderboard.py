@@ -10,30 +10,55 @@ class CheapGateResult:
     skip: bool
     min_score: Optional[int] = None
     threshold: Optional[int] = None
+    # The board already holds `limit` runs, so its minimum can only rise from here.
+    full: bool = False
 
 
-def fetch_min_score(conn: sqlite3.Connection, limit: int) -> Optional[int]:
+def fetch_top_scores(
+    conn: sqlite3.Connection, limit: int, board: Optional[tuple[str, int]] = None
+) -> list[int]:
+    # Scores on the top-`limit` board (global, or one seed partition): an index walk of at
+    # most `limit` rows, never a count of the table.
     if limit <= 0:
-        return None
-    count_row = conn.execute("SELECT COUNT(*) as total FROM score_runs").fetchone()
-    total = int(count_row["total"]) if count_row else 0
-    if total == 0:
-        return None
-    if total < limit:
-        row = conn.execute("SELECT MIN(server_score) as min_score FROM score_runs").fetchone()
-        return int(row["min_score"]) if row and row["min_score"] is not None else None
-    row = conn.execute(
-        """
-        SELECT server_score
-        FROM score_runs
-        ORDER BY server_score DESC, created_at ASC
-        LIMIT 1 OFFSET ?
-        """,
-        (limit - 1,),
-    ).fetchone()
-    if not row:
-        return None
-    return int(row["server_score"])
+        return []
+    if board is None:
+        rows = conn.execute(
+            """
+            SELECT server_score
+            FROM score_runs
+            ORDER BY server_score DESC, created_at ASC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            """
+            SELECT server_score
+            FROM score_runs
+            WHERE ruleset_version = ? AND seed = ?
+            ORDER BY server_score DESC, created_at ASC
+            LIMIT ?
+            """,
+            (board[0], board[1], limit),
+        ).fetchall()
+    return [int(row["server_score"]) for row in rows]
+
+
+def fetch_min_score(
+    conn: sqlite3.Connection, limit: int, board: Optional[tuple[str, int]] = None
+) -> Optional[int]:
+    scores = fetch_top_scores(conn, limit, board)
+    return scores[-1] if scores else None
+
+
+def gate_for_min_score(
+    client_score: int, min_score: Optional[int], margin: float, full: bool = False
+) -> CheapGateResult:
+    if min_score is None:
+        return CheapGateResult(skip=False)
+    threshold = int(min_score * (1 - margin))
+    return CheapGateResult(skip=client_score < threshold, min_score=min_score, threshold=threshold, full=full)
 
 
 def should_skip_authority(
@@ -41,9 +66,7 @@ def should_skip_authority(
     client_score: int,
     limit: int,
     margin: float,
+    board: Optional[tuple[str, int]] = None,
 ) -> CheapGateResult:
-    min_score = fetch_min_score(conn, limit)
-    if min_score is None:
-        return CheapGateResult(skip=False)
-    threshold = int(min_score * (1 - margin))
-    return CheapGateResult(skip=client_score < threshold, min_score=min_score, threshold=threshold)
+    scores = fetch_top_scores(conn, limit, board)
+    return gate_for_min_score(client_score, scores[-1] if scores else None, margin, full=len(scores) >= limit)
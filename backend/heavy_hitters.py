@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import heapq
+import operator
+import time
+from array import array
+from typing import Callable, Optional
+
+
+SKETCH_WIDTH = 1024
+SKETCH_DEPTH = 4
+HEAVY_HITTERS_K = 50
+HEAVY_HITTERS_WINDOW_SECONDS = 600.0
+HEAVY_HITTERS_SLICES = 10
+_HASH_MASK = (1 << 64) - 1
+# What is counted: every submit by client IP, parsed submits by player name, rejections by
+# reason, and rejections by IP and player name.
+DIMENSIONS = ("ip", "player", "reason", "rejected_ip", "rejected_player")
+
+
+class WindowedCountMin:
+    # Count-min sketch over a sliding window: `slices` ring sketches of window/slices seconds
+    # each, plus their running sum. An add touches `depth` cells in the current slice and the
+    # sum; expiring a slice subtracts it from the sum once. Memory is depth * width counters
+    # per slice whatever the number of distinct keys, and estimates only ever overcount.
+    def __init__(
+        self,
+        width: int = SKETCH_WIDTH,
+        depth: int = SKETCH_DEPTH,
+        window_seconds: float = HEAVY_HITTERS_WINDOW_SECONDS,
+        slices: int = HEAVY_HITTERS_SLICES,
+    ) -> None:
+        if width < 2 or width & (width - 1):
+            raise ValueError("sketch width must be a power of two")
+        self.width = width
+        self.depth = depth
+        self._bits = width.bit_length() - 1
+        self._mask = width - 1
+        self.slice_seconds = window_seconds / slices
+        self._slices = [array("q", bytes(8 * width * depth)) for _ in range(slices)]
+        self._total = array("q", bytes(8 * width * depth))
+        self._current = 0
+        self._epoch: Optional[int] = None
+
+    def _cells(self, key: str) -> list[int]:
+        # Each row takes its own bits of the key's 64-bit hash, so two keys share every row
+        # only if all those bits match; deriving rows from two hashes (h1 + row * h2) would
+        # leave just width**2 distinct cell sets, and a light key would regularly shadow a
+        # heavy one. Salted rehashes supply more bits when depth * log2(width) exceeds 64.
+        # str hashes are salted per process, which is fine for state that never leaves it.
+        cells = []
+        value = hash(key) & _HASH_MASK
+        left = 64
+        for row in range(self.depth):
+            if left < self._bits:
+                value = hash((key, row)) & _HASH_MASK
+                left = 64
+            cells.append(row * self.width + (value & self._mask))
+            value >>= self._bits
+            left -= self._bits
+        return cells
+
+    def advance(self, now: float) -> bool:
+        # Moves the ring to the slice containing `now`; True when anything expired.
+        epoch = int(now // self.slice_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+            return False
+        steps = epoch - self._epoch
+        if steps <= 0:
+            return False
+        self._epoch = epoch
+        if steps >= len(self._slices):
+            zero = bytes(8 * self.width * self.depth)
+            self._slices = [array("q", zero) for _ in self._slices]
+            self._total = array("q", zero)
+            return True
+        for _ in range(steps):
+            self._current = (self._current + 1) % len(self._slices)
+            expired = self._slices[self._current]
+            self._total = array("q", map(operator.sub, self._total, expired))
+            self._slices[self._current] = array("q", bytes(8 * self.width * self.depth))
+        return True
+
+    def add(self, key: str, count: int = 1) -> int:
+        # Returns the key's new windowed estimate.
+        current = self._slices[self._current]
+        total = self._total
+        cells = self._cells(key)
+        for cell in cells:
+            current[cell] += count
+            total[cell] += count
+        return min(total[cell] for cell in cells)
+
+    def estimate(self, key: str) -> int:
+        total = self._total
+        return min(total[cell] for cell in self._cells(key))
+
+
+class HeavyHitters:
+    # A windowed count-min sketch plus the k keys with the highest estimates. The heap holds
+    # one (estimate, key) entry per tracked key; entries go stale as counts move and are
+    # repaired only when they reach the top, so an update is O(depth + log k).
+    def __init__(
+        self,
+        k: int = HEAVY_HITTERS_K,
+        window_seconds: float = HEAVY_HITTERS_WINDOW_SECONDS,
+        slices: int = HEAVY_HITTERS_SLICES,
+        width: int = SKETCH_WIDTH,
+        depth: int = SKETCH_DEPTH,
+    ) -> None:
+        self.k = k
+        self.sketch = WindowedCountMin(width, depth, window_seconds, slices)
+        self._top: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+        self.updates = 0
+
+    def add(self, key: str, now: float) -> None:
+        if self.sketch.advance(now):
+            self._refresh()
+        self.updates += 1
+        estimate = self.sketch.add(key)
+        if key in self._top:
+            self._top[key] = estimate
+            return
+        if len(self._top) < self.k:
+            self._top[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+            return
+        floor, floor_key = self._floor()
+        if estimate > floor:
+            heapq.heapreplace(self._heap, (estimate, key))
+            del self._top[floor_key]
+            self._top[key] = estimate
+
+    def _floor(self) -> tuple[int, str]:
+        # The tracked key with the lowest current estimate, repairing stale heap entries.
+        while True:
+            recorded, key = self._heap[0]
+            current = self._top[key]
+            if current == recorded:
+                return recorded, key
+            heapq.heapreplace(self._heap, (current, key))
+
+    def _refresh(self) -> None:
+        # Expired slices lower every count: re-read the tracked keys and drop the gone ones.
+        estimates = {key: self.sketch.estimate(key) for key in self._top}
+        self._top = {key: value for key, value in estimates.items() if value > 0}
+        self._heap = [(value, key) for key, value in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, limit: int, now: float) -> list[dict]:
+        if self.sketch.advance(now):
+            self._refresh()
+        ranked = sorted(self._top.items(), key=lambda item: (-item[1], item[0]))
+        return [{"key": key, "count": count} for key, count in ranked[:limit]]
+
+
+class SubmitterTracker:
+    # One HeavyHitters per dimension. All updates come from the event loop.
+    def __init__(
+        self,
+        k: int = HEAVY_HITTERS_K,
+        window_seconds: float = HEAVY_HITTERS_WINDOW_SECONDS,
+        slices: int = HEAVY_HITTERS_SLICES,
+        time_fn: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.time_fn = time_fn
+        self.dimensions = {name: HeavyHitters(k, window_seconds, slices) for name in DIMENSIONS}
+
+    def submit(self, ip: str) -> None:
+        self.dimensions["ip"].add(ip, self.time_fn())
+
+    def player(self, name: str) -> None:
+        self.dimensions["player"].add(name, self.time_fn())
+
+    def rejection(self, reason: str, ip: str, player: Optional[str] = None) -> None:
+        now = self.time_fn()
+        self.dimensions["reason"].add(reason, now)
+        self.dimensions["rejected_ip"].add(ip, now)
+        if player is not None:
+            self.dimensions["rejected_player"].add(player, now)
+
+    def top(self, limit: int) -> dict:
+        now = self.time_fn()
+        return {name: tracker.top(limit, now) for name, tracker in self.dimensions.items()}
+
+    def stats(self) -> dict:
+        return {
+            "heavy_hitter_updates_total": sum(tracker.updates for tracker in self.dimensions.values()),
+        }
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+IDEMPOTENCY_MAX_ENTRIES = 10_000
+IDEMPOTENCY_TTL_SECONDS = 15 * 60
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    run_id: str
+    digest: bytes
+    status_code: int
+    body: bytes
+    expires_at: float
+
+
+def body_digest(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ResponseCache:
+    # Bounded LRU with TTL of final submit responses, keyed by runId and indexed by body
+    # digest so a retry can be answered before the body is even parsed.
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        time_fn: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.time_fn = time_fn
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._by_digest: Dict[bytes, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, digest: bytes) -> Optional[CachedResponse]:
+        run_id = self._by_digest.get(digest)
+        entry = self._entries.get(run_id) if run_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self.time_fn():
+            self._remove(run_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(run_id)
+        self.hits += 1
+        return entry
+
+    def store(self, run_id: str, digest: bytes, status_code: int, body: bytes) -> None:
+        if run_id in self._entries:
+            self._remove(run_id)
+        self._entries[run_id] = CachedResponse(
+            run_id=run_id,
+            digest=digest,
+            status_code=status_code,
+            body=body,
+            expires_at=self.time_fn() + self.ttl_seconds,
+        )
+        self._by_digest[digest] = run_id
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, run_id: str) -> None:
+        entry = self._entries.pop(run_id, None)
+        if entry is not None and self._by_digest.get(entry.digest) == run_id:
+            del self._by_digest[entry.digest]
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+
+from backend.guards.authority import build_authority_rules
+from backend.tests.factories import build_seeded_payload
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_RULESET_DIR = ROOT / "shared" / "ruleset"
+DEFAULT_MIX = {
+    "fresh": 0.30,
+    "replay": 0.10,
+    "loser": 0.20,
+    "invalid": 0.05,
+    "leaderboard": 0.35,
+}
+TEMPLATE_POOL_SIZE = 64
+IP_POOL_SIZE = 4096
+REQUEST_TIMEOUT = 10.0
+RUN_ID_PLACEHOLDER = "00000000-0000-4000-8000-000000000000"
+
+
+@dataclass
+class LoadReport:
+    target: str
+    rps: float
+    duration: float
+    sent: int = 0
+    completed: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    outcomes: Counter = field(default_factory=Counter)
+    reasons: Counter = field(default_factory=Counter)
+
+    def record(self, kind: str, latency: float, outcome: str, reason: Optional[str]) -> None:
+        self.completed += 1
+        self.latencies[kind].append(latency)
+        self.outcomes[outcome] += 1
+        if reason and reason != "NONE":
+            self.reasons[reason] += 1
+
+    def as_dict(self) -> dict:
+        every = sorted(value for values in self.latencies.values() for value in values)
+        return {
+            "target": self.target,
+            "targetRps": self.rps,
+            "duration": self.duration,
+            "sent": self.sent,
+            "completed": self.completed,
+            "errors": self.errors,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.completed / self.elapsed, 2) if self.elapsed else 0.0,
+            "latencyMs": summarize(every),
+            "latencyMsByKind": {kind: summarize(sorted(values)) for kind, values in sorted(self.latencies.items())},
+            "outcomes": dict(self.outcomes.most_common()),
+            "rejectionReasons": dict(self.reasons.most_common()),
+        }
+
+
+def quantile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(sorted_values: List[float]) -> dict:
+    return {
+        "count": len(sorted_values),
+        "p50": round(quantile(sorted_values, 0.50) * 1000, 3),
+        "p95": round(quantile(sorted_values, 0.95) * 1000, 3),
+        "p99": round(quantile(sorted_values, 0.99) * 1000, 3),
+        "max": round(sorted_values[-1] * 1000, 3) if sorted_values else 0.0,
+    }
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown traffic kind: {name}")
+        mix[name] = float(weight)
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix weights must sum to > 0")
+    return mix
+
+
+def load_ruleset_dir(ruleset_dir: Path) -> dict:
+    names = ("scoring", "economy", "mobs", "caps")
+    return {name: json.loads((ruleset_dir / f"{name}.v1.json").read_text(encoding="utf-8")) for name in names}
+
+
+class TrafficMix:
+    def __init__(self, ruleset: dict, mix: Dict[str, float], seed: int) -> None:
+        self.rng = random.Random(seed)
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        rules = build_authority_rules(ruleset)
+        self.fresh_templates: List[str] = []
+        self.loser_templates: List[str] = []
+        # Built like benchmarks.cases.build_max_payload: random mob counts and types trip the
+        # per-wave damage budget and spike ratio, so fresh runs would mostly be rejected.
+        weakest = sorted(rules.mob_defs, key=lambda name: rules.mob_defs[name]["hp"])[:2]
+        for index in range(TEMPLATE_POOL_SIZE):
+            progress = self.rng.randint(max(1, rules.wave_count // 2), rules.wave_count)
+            payload, _ = build_seeded_payload(
+                ruleset, seed=seed * 1000 + index, progress=progress, run_id=RUN_ID_PLACEHOLDER,
+                player_name=f"load-{index}", full_waves=True, mob_types=weakest,
+            )
+            self.fresh_templates.append(json.dumps(payload))
+            loser, _ = build_seeded_payload(
+                ruleset, seed=seed * 1000 + index, progress=1, run_id=RUN_ID_PLACEHOLDER,
+                player_name=f"loser-{index}", hp_left=1, mob_types=weakest,
+            )
+            self.loser_templates.append(json.dumps(loser))
+        self.sent_bodies: List[str] = []
+        self.ips = [f"10.{i // 256 % 256}.{i % 256}.{self.rng.randint(1, 254)}" for i in range(IP_POOL_SIZE)]
+
+    def next_kind(self) -> str:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "replay" and not self.sent_bodies:
+            return "fresh"
+        return kind
+
+    def fresh_body(self) -> str:
+        body = self.rng.choice(self.fresh_templates).replace(RUN_ID_PLACEHOLDER, str(uuid4()))
+        if len(self.sent_bodies) < 10_000:
+            self.sent_bodies.append(body)
+        else:
+            self.sent_bodies[self.rng.randrange(len(self.sent_bodies))] = body
+        return body
+
+    def invalid_body(self) -> str:
+        payload = json.loads(self.rng.choice(self.fresh_templates).replace(RUN_ID_PLACEHOLDER, str(uuid4())))
+        variant = self.rng.randrange(4)
+        if variant == 0:
+            payload["runId"] = "not-a-uuid"
+        elif variant == 1:
+            payload["economy"]["goldEnd"] += 10_000
+        elif variant == 2:
+            payload["waves"][0]["mobs"][0]["damageTaken"] = 10**9
+        else:
+            del payload["economy"]
+        return json.dumps(payload)
+
+    def build_request(self, kind: str) -> tuple[str, str, Optional[str]]:
+        if kind == "leaderboard":
+            return "GET", "/api/leaderboard", None
+        if kind == "replay":
+            return "POST", "/api/score/submit", self.rng.choice(self.sent_bodies)
+        if kind == "loser":
+            body = self.rng.choice(self.loser_templates).replace(RUN_ID_PLACEHOLDER, str(uuid4()))
+            return "POST", "/api/score/submit", body
+        if kind == "invalid":
+            return "POST", "/api/score/submit", self.invalid_body()
+        return "POST", "/api/score/submit", self.fresh_body()
+
+    def client_ip(self) -> str:
+        return self.rng.choice(self.ips)
+
+
+def classify(response: httpx.Response) -> tuple[str, Optional[str]]:
+    try:
+        body = response.json()
+    except ValueError:
+        return f"{response.status_code} non_json", None
+    if "items" in body:
+        return f"{response.status_code} leaderboard", None
+    status = body.get("status", "?")
+    reason = body.get("reason")
+    return f"{response.status_code} {status}/{reason}", reason
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: TrafficMix,
+    rps: float,
+    duration: float,
+    report: LoadReport,
+    poisson: bool = False,
+) -> LoadReport:
+    loop = asyncio.get_running_loop()
+    pending: set[asyncio.Task] = set()
+
+    async def fire(kind: str, method: str, path: str, body: Optional[str], ip: str, scheduled: float) -> None:
+        headers = {"x-forwarded-for": ip}
+        if body is not None:
+            headers["content-type"] = "application/json"
+        try:
+            response = await client.request(method, path, content=body, headers=headers)
+        except Exception as exc:  # noqa: BLE001 - every failure is counted, not raised
+            report.errors += 1
+            report.outcomes[f"error {type(exc).__name__}"] += 1
+            return
+        # Latency is measured from the scheduled send time so queueing delay is not hidden.
+        outcome, reason = classify(response)
+        report.record(kind, loop.time() - scheduled, outcome, reason)
+
+    start = loop.time()
+    deadline = start + duration
+    next_at = start
+    while next_at < deadline:
+        delay = next_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = mix.next_kind()
+        method, path, body = mix.build_request(kind)
+        task = asyncio.create_task(fire(kind, method, path, body, mix.client_ip(), next_at))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        report.sent += 1
+        next_at += mix.rng.expovariate(rps) if poisson else 1.0 / rps
+    if pending:
+        await asyncio.wait(pending, timeout=REQUEST_TIMEOUT)
+    report.elapsed = loop.time() - start
+    return report
+
+
+def build_in_process_client(ruleset_dir: Path, db_path: Path) -> httpx.AsyncClient:
+    from backend.app import RateLimiter, create_app
+
+    app = create_app(db_path=db_path, ruleset_dir=ruleset_dir, rate_limiter=RateLimiter(max_requests=10**9))
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=REQUEST_TIMEOUT)
+
+
+async def main_async(args: argparse.Namespace) -> LoadReport:
+    ruleset = load_ruleset_dir(args.ruleset_dir)
+    mix = TrafficMix(ruleset, args.mix, args.seed)
+    with tempfile.TemporaryDirectory(prefix="td-loadgen-") as workdir:
+        if args.url:
+            client = httpx.AsyncClient(
+                base_url=args.url.rstrip("/"),
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(max_connections=args.max_connections),
+            )
+            target = args.url
+        else:
+            db_path = args.db or Path(workdir) / "leaderboard.db"
+            client = build_in_process_client(args.ruleset_dir, db_path)
+            target = "asgi://backend.app"
+        report = LoadReport(target=target, rps=args.rps, duration=args.duration)
+        async with client:
+            return await run_load(client, mix, args.rps, args.duration, report, poisson=args.poisson)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.loadgen",
+        description="Open-loop synthetic submission traffic against the leaderboard service.",
+    )
+    parser.add_argument("--url", help="service base URL; omit to drive the ASGI app in-process")
+    parser.add_argument("--rps", type=float, default=100.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic to schedule")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="weights, e.g. fresh=0.3,replay=0.1,loser=0.2,invalid=0.05,leaderboard=0.35")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--ruleset-dir", type=Path, default=DEFAULT_RULESET_DIR)
+    parser.add_argument("--db", type=Path, help="SQLite path for in-process mode (default: temp file)")
+    parser.add_argument("--max-connections", type=int, default=512)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def print_report(report: dict) -> None:
+    print(f"target={report['target']} sent={report['sent']} completed={report['completed']} "
+          f"errors={report['errors']} elapsed={report['elapsed']}s throughput={report['throughput']}/s")
+    latency = report["latencyMs"]
+    print(f"latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    for kind, stats in report["latencyMsByKind"].items():
+        print(f"  {kind:<12} n={stats['count']:<7} p50={stats['p50']} p95={stats['p95']} p99={stats['p99']}")
+    print("outcomes:")
+    for outcome, count in report["outcomes"].items():
+        print(f"  {outcome:<40} {count}")
+    print("rejection reasons:")
+    for reason, count in report["rejectionReasons"].items():
+        print(f"  {reason:<40} {count}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.rps <= 0 or args.duration <= 0:
+        print("--rps and --duration must be > 0", file=sys.stderr)
+        return 2
+    report = asyncio.run(main_async(args)).as_dict()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
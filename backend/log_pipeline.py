@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+
+LOG_QUEUE_SIZE = 10_000
+# Keep 1 in N records for high-volume events; everything else is always emitted.
+DEFAULT_SAMPLE_RATES = {
+    "leaderboard_request": 100,
+    "cheap_gate_skip": 10,
+    "submit_shed": 10,
+}
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, sample_rates: Dict[str, int]) -> None:
+        super().__init__()
+        self.sample_rates = {event: max(1, int(rate)) for event, rate in sample_rates.items()}
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = self.sample_rates.get(event) if event else None
+        if not rate or rate == 1:
+            return True
+        seen = self._seen.get(event, 0)
+        self._seen[event] = seen + 1
+        if seen % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; the request thread only enqueues.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        event = getattr(record, "event", None)
+        if event:
+            entry["event"] = event
+            fields = getattr(record, "fields", None)
+            if fields:
+                entry.update(fields)
+        else:
+            entry["msg"] = record.getMessage()
+        sample_rate = getattr(record, "sample_rate", None)
+        if sample_rate:
+            entry["sample"] = sample_rate
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class LogPipeline:
+    def __init__(self, handler: DroppingQueueHandler, listener: QueueListener) -> None:
+        self.handler = handler
+        self.listener = listener
+        self._running = False
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    @property
+    def queue_depth(self) -> int:
+        return self.handler.queue.qsize()
+
+    def start(self) -> None:
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+
+_PIPELINES: Dict[str, LogPipeline] = {}
+
+
+def build_log_pipeline(
+    stream: Optional[TextIO] = None,
+    queue_size: int = LOG_QUEUE_SIZE,
+    sample_rates: Optional[Dict[str, int]] = None,
+) -> LogPipeline:
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates))
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonLineFormatter())
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    return LogPipeline(handler, listener)
+
+
+def install_log_pipeline(logger_name: str, **options: Any) -> LogPipeline:
+    pipeline = _PIPELINES.get(logger_name)
+    if pipeline is not None:
+        return pipeline
+    pipeline = build_log_pipeline(**options)
+    logger = logging.getLogger(logger_name)
+    logger.addHandler(pipeline.handler)
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    logger.propagate = False
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    _PIPELINES[logger_name] = pipeline
+    return pipeline
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields: Any) -> None:
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"event": event, "fields": fields}, stacklevel=2)
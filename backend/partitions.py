@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+PARTITION_CACHE_SIZE = 4096
+
+# (rulesetVersion, seed): one leaderboard per seeded game on a given ruleset.
+BoardKey = tuple[str, int]
+
+
+# Seeded runs get a per-partition board. The partial index only covers rows with a seed,
+# and `seed = ?` implies `seed IS NOT NULL`, so SQLite uses it for every partition query:
+# a lookup is an index seek plus N rows whatever the number of partitions. Legacy unseeded
+# runs stay on the global board only.
+def init_partitions(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(score_runs)")}
+    if "seed" not in columns:
+        conn.execute("ALTER TABLE score_runs ADD COLUMN seed INTEGER")
+    if "ruleset_version" not in columns:
+        # Runs stored before partitioning were all played on v1.
+        conn.execute("ALTER TABLE score_runs ADD COLUMN ruleset_version TEXT NOT NULL DEFAULT 'v1'")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_score_runs_board
+        ON score_runs(ruleset_version, seed, server_score DESC, created_at ASC)
+        WHERE seed IS NOT NULL
+        """
+    )
+
+
+def fetch_partition(conn: sqlite3.Connection, key: BoardKey, limit: int) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT player_name, server_score, progress, created_at
+        FROM score_runs
+        WHERE ruleset_version = ? AND seed = ?
+        ORDER BY server_score DESC, created_at ASC
+        LIMIT ?
+        """,
+        (key[0], key[1], limit),
+    ).fetchall()
+
+
+def compute_partition_rank(conn: sqlite3.Connection, key: BoardKey, score: int, created_at: str) -> int:
+    row = conn.execute(
+        """
+        SELECT COUNT(*) as ahead
+        FROM score_runs
+        WHERE ruleset_version = ? AND seed = ?
+          AND (server_score > ? OR (server_score = ? AND created_at < ?))
+        """,
+        (key[0], key[1], score, score, created_at),
+    ).fetchone()
+    ahead = row["ahead"] if row else 0
+    return int(ahead) + 1
+
+
+@dataclass
+class PartitionEntry:
+    # `version` is the database partition version the rows were read at, so every worker
+    # tags the same rows alike; `bodies` holds the encoded response per requested limit.
+    version: int
+    items: list[dict]
+    bodies: dict[int, bytes] = field(default_factory=dict)
+
+    def full(self, limit: int) -> bool:
+        return len(self.items) >= limit
+
+    def min_score(self, limit: int) -> Optional[int]:
+        top = self.items[:limit]
+        return top[-1]["score"] if top else None
+
+
+class PartitionCache:
+    # LRU of partition top-N boards. Entries are replaced, never patched: an accepted run
+    # that reaches a partition's top N puts a freshly read entry, and a write by another
+    # worker clears the cache, so a hit is current up to the partition version check.
+    def __init__(self, max_entries: int = PARTITION_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[BoardKey, PartitionEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: BoardKey) -> Optional[PartitionEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: BoardKey) -> Optional[PartitionEntry]:
+        # No LRU bump or hit accounting: for load-shedding hints, not for serving.
+        return self._entries.get(key)
+
+    def put(self, key: BoardKey, entry: PartitionEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "partition_cache_entries": len(self._entries),
+            "partition_cache_hits_total": self.hits,
+            "partition_cache_misses_total": self.misses,
+            "partition_cache_evictions_total": self.evictions,
+        }
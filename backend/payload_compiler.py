@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import types
+import typing
+from typing import Any, Callable, Optional
+
+import annotated_types
+from pydantic import BaseModel
+
+
+# Compiles a pydantic model tree into one specialised function per model: straight-line
+# dict lookups, exact type checks and the field's ge/le/min_length/max_length bounds, ending
+# in a __slots__ view with the same attribute names. It only ever accepts input that is
+# already in canonical form (an exact int, str, bool, list or dict); anything that pydantic
+# might coerce or reject returns None, and the caller falls back to the model. A compiled
+# accept is therefore always a pydantic accept with the same values, and a reject is a
+# pydantic reject by construction.
+
+_SCALARS = {int: "int", str: "str", bool: "bool"}
+_BOUNDS = {
+    annotated_types.Ge: ("ge", "<"),
+    annotated_types.Gt: ("gt", "<="),
+    annotated_types.Le: ("le", ">"),
+    annotated_types.Lt: ("lt", ">="),
+}
+
+
+def _admits_none(annotation: Any) -> bool:
+    return typing.get_origin(annotation) in (typing.Union, types.UnionType) and types.NoneType in typing.get_args(annotation)
+
+
+def view_name(model: type[BaseModel]) -> str:
+    return f"{model.__name__}View"
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.namespace: dict[str, Any] = {"_MISSING": _MISSING}
+        self.active: set[type[BaseModel]] = set()
+
+    def model(self, model: type[BaseModel], source: str, target: str) -> list[str]:
+        # Nested models are inlined rather than called, so a list of mobs costs one loop and
+        # one view per mob, with no call frame per item.
+        if model in self.active:
+            raise TypeError(f"{model.__name__}: recursive models cannot be compiled")
+        if model.model_config.get("extra", "ignore") != "ignore":
+            raise TypeError(f"{model.__name__}: only extra='ignore' models can be compiled")
+        self.active.add(model)
+        fields = list(model.model_fields.items())
+        view = view_name(model)
+        self.namespace[view] = _view_class(view, [field_name for field_name, _ in fields])
+        lines = [f"if type({source}) is not dict:", "    return None"]
+        values = []
+        for field_name, info in fields:
+            value = f"{target}_{field_name}"
+            values.append(value)
+            key = info.alias or field_name
+            where = f"{model.__name__}.{field_name}"
+            if info.is_required() and not _admits_none(info.annotation):
+                # A missing field reads as None, which fails the type check below.
+                lines.append(f"{value} = {source}.get({key!r})")
+                lines += self.check(value, info.annotation, info.metadata, where)
+                continue
+            lines.append(f"{value} = {source}.get({key!r}, _MISSING)")
+            if info.is_required():
+                lines += [f"if {value} is _MISSING:", "    return None"]
+                lines += self.check(value, info.annotation, info.metadata, where)
+                continue
+            default = f"_default_{model.__name__}_{field_name}"
+            self.namespace[default] = info.get_default(call_default_factory=True)
+            lines.append(f"if {value} is _MISSING:")
+            lines += [f"    {value} = {default}", "else:"]
+            lines += ["    " + line for line in self.check(value, info.annotation, info.metadata, where)]
+        lines.append(f"{target} = {view}({', '.join(values)})")
+        self.active.discard(model)
+        return lines
+
+    def check(self, target: str, annotation: Any, metadata: list, where: str) -> list[str]:
+        origin = typing.get_origin(annotation)
+        args = typing.get_args(annotation)
+        if origin in (typing.Union, types.UnionType) and len(args) == 2 and types.NoneType in args:
+            inner = args[0] if args[1] is types.NoneType else args[1]
+            body = self.check(target, inner, metadata, where)
+            return [f"if {target} is not None:"] + ["    " + line for line in body]
+        if annotation in _SCALARS:
+            lines = [f"if type({target}) is not {_SCALARS[annotation]}:", "    return None"]
+            return lines + self.bounds(target, metadata, where)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if metadata:
+                raise TypeError(f"{where}: constraints on a nested model are not supported")
+            return self.model(annotation, target, target)
+        if origin is list and len(args) == 1:
+            item = f"{target}_item"
+            items = f"{target}_items"
+            lines = [f"if type({target}) is not list:", "    return None"]
+            lines += self.bounds(target, metadata, where)
+            lines += [f"{items} = []", f"for {item} in {target}:"]
+            lines += ["    " + line for line in self.check(item, args[0], [], where)]
+            lines += [f"    {items}.append({item})", f"{target} = {items}"]
+            return lines
+        raise TypeError(f"{where}: unsupported annotation {annotation!r}")
+
+    def bounds(self, target: str, metadata: list, where: str) -> list[str]:
+        lines = []
+        for constraint in metadata:
+            bound = _BOUNDS.get(type(constraint))
+            if bound is not None:
+                attr, failing = bound
+                lines += [f"if {target} {failing} {getattr(constraint, attr)!r}:", "    return None"]
+            elif isinstance(constraint, annotated_types.MinLen):
+                lines += [f"if len({target}) < {constraint.min_length}:", "    return None"]
+            elif isinstance(constraint, annotated_types.MaxLen):
+                lines += [f"if len({target}) > {constraint.max_length}:", "    return None"]
+            else:
+                raise TypeError(f"{where}: unsupported constraint {constraint!r}")
+        return lines
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def _view_class(name: str, field_names: list[str]) -> type:
+    params = ", ".join(field_names)
+    assigns = "".join(f"\n    self.{field_name} = {field_name}" for field_name in field_names) or "\n    pass"
+    namespace: dict[str, Any] = {}
+    exec(f"def __init__(self, {params}):{assigns}", namespace)
+    return type(name, (), {"__slots__": tuple(field_names), "__init__": namespace["__init__"]})
+
+
+def compile_validator(model: type[BaseModel]) -> Callable[[Any], Optional[Any]]:
+    # Raises TypeError at import time for a field shape the compiler does not understand,
+    # so a model change cannot silently drift from the compiled checks.
+    compiler = _Compiler()
+    body = compiler.model(model, "data", "view")
+    name = f"validate_{model.__name__}"
+    source = "\n".join([f"def {name}(data):"] + ["    " + line for line in body] + ["    return view"])
+    exec(compile(source, f"<compiled {model.__name__}>", "exec"), compiler.namespace)
+    validate = compiler.namespace[name]
+    validate.__source__ = source
+    return validate
+
+
+def dump_view(value: Any) -> Any:
+    # The view tree as plain data, shaped like model_dump(); for tests and debugging.
+    if isinstance(value, list):
+        return [dump_view(item) for item in value]
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    slots = getattr(type(value), "__slots__", None)
+    if slots is None:
+        return value
+    return {name: dump_view(getattr(value, name)) for name in slots}
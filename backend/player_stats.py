@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Optional
+
+
+TOP_PLAYERS_LIMIT = 10
+TOP_PLAYERS_MAX = 100
+
+
+# One row per player, maintained by the same transaction that inserts the run, so reads
+# are a primary-key or index lookup no matter how many runs score_runs holds.
+def init_player_stats(conn: sqlite3.Connection) -> None:
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_stats'"
+    ).fetchone() is None
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS player_stats (
+            player_name TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL,
+            best_score INTEGER NOT NULL,
+            best_created_at TEXT NOT NULL,
+            progress_sum INTEGER NOT NULL,
+            last_played_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_player_stats_best ON player_stats(best_score DESC, best_created_at ASC)"
+    )
+    if created:
+        backfill_player_stats(conn)
+
+
+def backfill_player_stats(conn: sqlite3.Connection) -> None:
+    # One-off GROUP BY for databases that predate the table. The best run's timestamp is the
+    # earliest among that player's top-scoring runs, matching the leaderboard tie-break.
+    conn.execute("DELETE FROM player_stats")
+    conn.execute(
+        """
+        INSERT INTO player_stats (player_name, runs, best_score, best_created_at, progress_sum, last_played_at)
+        SELECT
+            r.player_name,
+            COUNT(*),
+            MAX(r.server_score),
+            (
+                SELECT MIN(b.created_at) FROM score_runs b
+                WHERE b.player_name = r.player_name
+                  AND b.server_score = (SELECT MAX(server_score) FROM score_runs WHERE player_name = r.player_name)
+            ),
+            SUM(r.progress),
+            MAX(r.created_at)
+        FROM score_runs r
+        GROUP BY r.player_name
+        """
+    )
+
+
+def record_run(conn: sqlite3.Connection, player_name: str, score: int, progress: int, created_at: str) -> None:
+    # Must run inside the caller's insert transaction; the caller commits.
+    conn.execute(
+        """
+        INSERT INTO player_stats (player_name, runs, best_score, best_created_at, progress_sum, last_played_at)
+        VALUES (?, 1, ?, ?, ?, ?)
+        ON CONFLICT(player_name) DO UPDATE SET
+            runs = runs + 1,
+            best_created_at = CASE
+                WHEN excluded.best_score > best_score THEN excluded.best_created_at
+                ELSE best_created_at
+            END,
+            best_score = MAX(best_score, excluded.best_score),
+            progress_sum = progress_sum + excluded.progress_sum,
+            last_played_at = MAX(last_played_at, excluded.last_played_at)
+        """,
+        (player_name, score, created_at, progress, created_at),
+    )
+
+
+def fetch_player(conn: sqlite3.Connection, player_name: str) -> Optional[sqlite3.Row]:
+    return conn.execute("SELECT * FROM player_stats WHERE player_name = ?", (player_name,)).fetchone()
+
+
+def fetch_top_players(conn: sqlite3.Connection, limit: int) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT * FROM player_stats
+        ORDER BY best_score DESC, best_created_at ASC
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def row_to_player(row: sqlite3.Row) -> dict:
+    return {
+        "playerName": row["player_name"],
+        "runs": row["runs"],
+        "bestScore": row["best_score"],
+        "bestAt": row["best_created_at"],
+        "avgProgress": round(row["progress_sum"] / row["runs"], 2),
+        "lastPlayedAt": row["last_played_at"],
+    }
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator, Optional, Sequence
+
+from backend.db import BOARD_VERSION, PARTITION_VERSION, SCORES_EPOCH, bump_meta, init_meta
+from backend.export import iter_chunks
+from backend.guards.authority import compute_server_score, validate_authority, validate_precheck
+from backend.player_stats import backfill_player_stats
+from backend.ruleset_snapshot import RULESET_VERSION, load_rules
+from backend.telemetry import decode_run, mob_types
+
+
+REVALIDATE_CHUNK_ROWS = 2000
+APPLY_BATCH_ROWS = 5000
+STATUSES = ("unchanged", "rescored", "rejected", "error")
+# Stored telemetry joined with the row it belongs to, in insertion order.
+SOURCE_QUERY = """
+    SELECT t.run_id, t.ruleset_version, t.blob, s.player_name, s.server_score
+    FROM run_telemetry t JOIN score_runs s ON s.run_id = t.run_id
+    ORDER BY t.rowid
+"""
+# Runs stored before telemetry was recorded cannot be re-validated; they are only counted.
+NO_TELEMETRY_QUERY = """
+    SELECT COUNT(*) FROM score_runs s
+    WHERE NOT EXISTS (SELECT 1 FROM run_telemetry t WHERE t.run_id = s.run_id)
+"""
+
+# Per-process state set by init_worker: the target rules and the mob order each stored
+# ruleset version was encoded with.
+_WORKER: dict = {}
+
+
+@dataclass
+class RevalidationSummary:
+    runs: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    reasons: Counter = field(default_factory=Counter)
+    applied: int = 0
+    skipped_no_telemetry: int = 0
+    seconds: float = 0.0
+
+    def line(self) -> str:
+        rate = self.runs / self.seconds if self.seconds else 0.0
+        counts = " ".join(f"{status}={self.statuses[status]}" for status in STATUSES)
+        reasons = ",".join(f"{reason}:{count}" for reason, count in self.reasons.most_common())
+        return (
+            f"runs={self.runs} {counts} skipped_no_telemetry={self.skipped_no_telemetry} applied={self.applied} "
+            f"seconds={self.seconds:.3f} runs_per_second={rate:.0f} reasons={reasons or '-'}"
+        )
+
+
+def init_worker(target_dir: str, types_by_version: dict[str, Sequence[str]]) -> None:
+    _, rules = load_rules(Path(target_dir))
+    _WORKER["rules"] = rules
+    _WORKER["types"] = types_by_version
+
+
+# Stored runs passed the payload schema at submit time and the encoding only holds
+# non-negative integers, so only the game rules are re-checked. The validators need nothing
+# but attribute access; decoding straight into these skips a dict per mob.
+class StoredMob:
+    __slots__ = ("type", "isBoss", "damageTaken")
+
+    def __init__(self, mob_type: str, is_boss: bool, damage: int) -> None:
+        self.type = mob_type
+        self.isBoss = is_boss
+        self.damageTaken = damage
+
+
+class StoredWave:
+    __slots__ = ("wave", "mobs")
+
+    def __init__(self, number: int, mobs: list) -> None:
+        self.wave = number
+        self.mobs = mobs
+
+
+def payload_view(run: dict, run_id: str, player_name: str, version: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        runId=run_id,
+        playerName=player_name,
+        rulesetVersion=version,
+        economy=SimpleNamespace(**run.pop("economy")),
+        **run,
+    )
+
+
+def revalidate_rows(rows: list[tuple]) -> list[tuple]:
+    rules = _WORKER["rules"]
+    types_by_version = _WORKER["types"]
+    outcomes = []
+    for run_id, version, blob, player_name, old_score in rows:
+        try:
+            run = decode_run(blob, types_by_version[version], StoredMob, StoredWave)
+            payload = payload_view(run, run_id, player_name, version)
+        except (KeyError, IndexError, ValueError, zlib.error) as exc:
+            outcomes.append((run_id, player_name, "error", str(exc), old_score, None))
+            continue
+        result = validate_precheck(payload, rules) or validate_authority(payload, rules)
+        if not result.ok:
+            outcomes.append((run_id, player_name, "rejected", result.reason, old_score, None))
+            continue
+        new_score = compute_server_score(payload, rules.scoring, result.total_kills)
+        status = "unchanged" if new_score == old_score else "rescored"
+        outcomes.append((run_id, player_name, status, "NONE", old_score, new_score))
+    return outcomes
+
+
+def map_chunks(
+    chunks: Iterator[list[tuple]], workers: int, initargs: tuple
+) -> Iterator[list[tuple]]:
+    # Results come back in input order. At most two chunks per worker are in flight, so
+    # memory stays flat however large the table is.
+    if workers <= 1:
+        init_worker(*initargs)
+        for chunk in chunks:
+            yield revalidate_rows(chunk)
+        return
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(revalidate_rows, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def revalidate(
+    db_path: Path,
+    target_dir: Path,
+    report_path: Path,
+    source_dir: Path = Path("shared") / "ruleset",
+    workers: int = 1,
+    chunk_rows: int = REVALIDATE_CHUNK_ROWS,
+    apply: bool = False,
+    apply_batch_rows: int = APPLY_BATCH_ROWS,
+) -> RevalidationSummary:
+    source_ruleset, _ = load_rules(Path(source_dir))
+    initargs = (str(target_dir), {RULESET_VERSION: mob_types(source_ruleset)})
+    summary = RevalidationSummary()
+    start = time.perf_counter()
+    summary.skipped_no_telemetry = count_without_telemetry(Path(db_path))
+    # Reads come from one WAL snapshot; score updates commit on a separate connection in
+    # batches and never disturb it.
+    writer = sqlite3.connect(db_path) if apply else None
+    updates: list[tuple[int, str]] = []
+    try:
+        if writer is not None:
+            init_meta(writer)
+            writer.commit()
+        with Path(report_path).open("w", encoding="utf-8") as report:
+            chunks = iter_chunks(Path(db_path), SOURCE_QUERY, [], chunk_rows)
+            for outcomes in map_chunks(chunks, workers, initargs):
+                for run_id, player_name, status, reason, old_score, new_score in outcomes:
+                    summary.runs += 1
+                    summary.statuses[status] += 1
+                    if status == "unchanged":
+                        continue
+                    if status != "rescored":
+                        summary.reasons[reason] += 1
+                    elif writer is not None:
+                        updates.append((new_score, run_id))
+                    report.write(
+                        json.dumps(
+                            {
+                                "runId": run_id,
+                                "playerName": player_name,
+                                "status": status,
+                                "reason": reason,
+                                "oldScore": old_score,
+                                "newScore": new_score,
+                            },
+                            ensure_ascii=False,
+                            separators=(",", ":"),
+                        )
+                        + "\n"
+                    )
+                if writer is not None and len(updates) >= apply_batch_rows:
+                    summary.applied += apply_scores(writer, updates)
+                    updates = []
+        if writer is not None:
+            summary.applied += apply_scores(writer, updates)
+            # best_score is derived from server_score; one GROUP BY brings it back in line.
+            backfill_player_stats(writer)
+            writer.commit()
+    finally:
+        if writer is not None:
+            writer.close()
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def count_without_telemetry(db_path: Path) -> int:
+    conn = sqlite3.connect(f"file:{db_path.resolve().as_posix()}?mode=ro", uri=True)
+    try:
+        return int(conn.execute(NO_TELEMETRY_QUERY).fetchone()[0])
+    finally:
+        conn.close()
+
+
+def apply_scores(conn: sqlite3.Connection, updates: list[tuple[int, str]]) -> int:
+    # Each batch bumps the shared counters in its own transaction, so a running server
+    # drops its cached boards and admission threshold once it sees the rewritten rows.
+    if not updates:
+        return 0
+    with conn:
+        conn.executemany("UPDATE score_runs SET server_score = ? WHERE run_id = ?", updates)
+        for key in (SCORES_EPOCH, BOARD_VERSION, PARTITION_VERSION):
+            bump_meta(conn, key)
+    return len(updates)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.revalidate",
+        description="Re-run precheck and authority validation on stored runs against another ruleset.",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(os.getenv("LEADERBOARD_DB_PATH") or Path("backend") / "leaderboard.db"),
+    )
+    parser.add_argument("--ruleset-dir", type=Path, required=True, help="target ruleset to validate against")
+    parser.add_argument(
+        "--source-ruleset-dir",
+        type=Path,
+        default=Path("shared") / "ruleset",
+        help="ruleset the runs were stored under (mob order for decoding)",
+    )
+    parser.add_argument("--report", type=Path, required=True, help="NDJSON diff report of changed runs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=REVALIDATE_CHUNK_ROWS)
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help=(
+            "write rescored server_score values back; a running server picks the change up within a "
+            "few seconds and drops its cached boards, but stop it first if boards must never show "
+            "a half-applied rescore"
+        ),
+    )
+    args = parser.parse_args(argv)
+    try:
+        summary = revalidate(
+            args.db,
+            args.ruleset_dir,
+            args.report,
+            source_dir=args.source_ruleset_dir,
+            workers=args.workers,
+            chunk_rows=args.chunk_rows,
+            apply=args.apply,
+        )
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        print(f"revalidation failed: {exc}", file=sys.stderr)
+        return 1
+    print(summary.line())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from backend.guards.authority import AuthorityRules, build_authority_rules
+
+
+SNAPSHOT_FORMAT = 1
+# Fields of AuthorityRules that are plain copies of ruleset sections; they are not stored twice.
+SHARED_RULE_FIELDS = {"mob_defs": ("mobs", "mobs"), "scoring": ("scoring", None)}
+RULESET_VERSION = "v1"
+RULESET_PARTS = ("scoring", "economy", "mobs", "caps")
+
+
+def snapshot_path(ruleset_dir: Path) -> Path:
+    return Path(ruleset_dir) / f"ruleset.{RULESET_VERSION}.snapshot.json"
+
+
+def source_files(ruleset_dir: Path) -> dict[str, Path]:
+    return {part: Path(ruleset_dir) / f"{part}.{RULESET_VERSION}.json" for part in RULESET_PARTS}
+
+
+def source_digest(ruleset_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for part, path in source_files(ruleset_dir).items():
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def source_stats(ruleset_dir: Path) -> Optional[list[list[int]]]:
+    stats = []
+    for part in RULESET_PARTS:
+        try:
+            stat = os.stat(os.path.join(ruleset_dir, f"{part}.{RULESET_VERSION}.json"))
+        except FileNotFoundError:
+            return None
+        stats.append([stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def load_sources(ruleset_dir: Path) -> dict:
+    ruleset = {}
+    for part, path in source_files(ruleset_dir).items():
+        with path.open("r", encoding="utf-8") as handle:
+            ruleset[part] = json.load(handle)
+    return ruleset
+
+
+def compile_snapshot(ruleset_dir: Path) -> dict:
+    ruleset = load_sources(ruleset_dir)
+    # build_authority_rules is the validation step: a ruleset it rejects never gets a snapshot.
+    rules = dataclasses.asdict(build_authority_rules(ruleset))
+    for field in SHARED_RULE_FIELDS:
+        rules.pop(field)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "rulesetVersion": RULESET_VERSION,
+        "sourceDigest": source_digest(ruleset_dir),
+        "sourceStats": source_stats(ruleset_dir),
+        "ruleset": ruleset,
+        "rules": rules,
+    }
+
+
+def write_snapshot(ruleset_dir: Path, out_path: Optional[Path] = None) -> Path:
+    out_path = Path(out_path or snapshot_path(ruleset_dir))
+    snapshot = compile_snapshot(ruleset_dir)
+    tmp_path = out_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def read_snapshot(path: Path, ruleset_dir: Optional[Path] = None) -> Optional[tuple[dict, AuthorityRules]]:
+    try:
+        with open(path, "rb") as handle:
+            snapshot = json.loads(handle.read())
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("rulesetVersion") != RULESET_VERSION:
+        return None
+    # A snapshot older than the JSON it was compiled from is ignored rather than trusted.
+    # Matching size/mtime skips hashing; a copy that only changed mtimes falls back to the digest.
+    # Without the sources (a snapshot-only deploy) the snapshot is authoritative.
+    stats = source_stats(ruleset_dir) if ruleset_dir is not None else None
+    if stats is not None and snapshot.get("sourceStats") != stats:
+        if snapshot.get("sourceDigest") != source_digest(ruleset_dir):
+            return None
+    try:
+        ruleset = snapshot["ruleset"]
+        fields = dict(snapshot["rules"])
+        for field, (section, key) in SHARED_RULE_FIELDS.items():
+            fields[field] = ruleset[section].get(key, {}) if key else ruleset[section]
+        rules = AuthorityRules(**fields)
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return ruleset, rules
+
+
+def load_rules(ruleset_dir: Path) -> tuple[dict, AuthorityRules]:
+    ruleset_dir = Path(ruleset_dir)
+    loaded = read_snapshot(snapshot_path(ruleset_dir), ruleset_dir)
+    if loaded is not None:
+        return loaded
+    ruleset = load_sources(ruleset_dir)
+    return ruleset, build_authority_rules(ruleset)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.ruleset_snapshot",
+        description="Compile shared/ruleset into a validated snapshot loaded at startup.",
+    )
+    parser.add_argument("--ruleset-dir", type=Path, default=Path("shared") / "ruleset")
+    parser.add_argument("--out", type=Path, help="output path (default: <ruleset-dir>/ruleset.v1.snapshot.json)")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if the snapshot is missing or stale")
+    args = parser.parse_args(argv)
+    if args.check:
+        path = args.out or snapshot_path(args.ruleset_dir)
+        if read_snapshot(path, args.ruleset_dir) is None:
+            print(f"stale or missing snapshot: {path}", file=sys.stderr)
+            return 1
+        print(f"snapshot up to date: {path}")
+        return 0
+    try:
+        path = write_snapshot(args.ruleset_dir, args.out)
+    except ValueError as exc:
+        print(f"invalid ruleset: {exc}", file=sys.stderr)
+        return 1
+    print(f"wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from backend.log_pipeline import log_event
+
+
+SNAPSHOT_PAGES_PER_STEP = 256
+SNAPSHOT_STEP_SLEEP_SECONDS = 0.005
+SNAPSHOT_KEEP = 5
+SNAPSHOT_INTERVAL_SECONDS = 3600.0
+SNAPSHOT_PREFIX = "leaderboard-"
+SNAPSHOT_SUFFIX = ".db"
+
+
+@dataclass(frozen=True)
+class SnapshotReport:
+    path: str
+    bytes: int
+    pages: int
+    steps: int
+    duration_seconds: float
+    integrity: str
+    rotated: int
+    # DB executor jobs that ran while the snapshot was copied, and their mean duration
+    # against the executor's mean before it started: the write-latency impact.
+    db_jobs_during: Optional[int] = None
+    db_mean_job_ms_during: Optional[float] = None
+    db_mean_job_ms_before: Optional[float] = None
+
+
+def snapshot_name(now: datetime) -> str:
+    return f"{SNAPSHOT_PREFIX}{now.strftime('%Y%m%dT%H%M%S%fZ')}{SNAPSHOT_SUFFIX}"
+
+
+def list_snapshots(out_dir: Path) -> list[Path]:
+    # Names embed a sortable UTC timestamp, so lexical order is age order.
+    return sorted(Path(out_dir).glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"))
+
+
+def rotate_snapshots(out_dir: Path, keep: int) -> int:
+    stale = list_snapshots(out_dir)[:-keep] if keep > 0 else []
+    for path in stale:
+        path.unlink(missing_ok=True)
+    return len(stale)
+
+
+def integrity_check(path: Path) -> str:
+    conn = sqlite3.connect(f"file:{Path(path).resolve().as_posix()}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+    return "; ".join(str(row[0]) for row in rows)
+
+
+def mean_job_ms(jobs: int, busy_seconds: float) -> Optional[float]:
+    return round(busy_seconds / jobs * 1000, 3) if jobs else None
+
+
+def take_snapshot(
+    db_path: Path,
+    out_dir: Path,
+    keep: int = SNAPSHOT_KEEP,
+    pages_per_step: int = SNAPSHOT_PAGES_PER_STEP,
+    step_sleep: float = SNAPSHOT_STEP_SLEEP_SECONDS,
+    stats_fn: Optional[Callable[[], dict]] = None,
+) -> SnapshotReport:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    target = out_dir / snapshot_name(datetime.now(timezone.utc))
+    partial = target.with_suffix(".partial")
+    before = stats_fn() if stats_fn else None
+    steps = 0
+    total_pages = 0
+
+    def progress(_status: int, remaining: int, total: int) -> None:
+        nonlocal steps, total_pages
+        steps += 1
+        total_pages = total
+
+    start = time.perf_counter()
+    # A failed copy (disk full, I/O error, interrupt) must not leave a .partial behind:
+    # rotation only looks at finished snapshots, so nothing else would ever remove it.
+    try:
+        source = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            dest = sqlite3.connect(partial)
+            try:
+                # The open read transaction pins one WAL snapshot for every step. Without it,
+                # any commit from the DB executor restarts the copy, and a steady write load
+                # means the backup never finishes. A reader never blocks WAL writers, and the
+                # lock is released between steps.
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(dest, pages=pages_per_step, progress=progress, sleep=step_sleep)
+                source.execute("COMMIT")
+                # A self-contained single file: no -wal/-shm companions to copy around.
+                dest.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                dest.close()
+        finally:
+            source.close()
+        duration = time.perf_counter() - start
+        after = stats_fn() if stats_fn else None
+
+        integrity = integrity_check(partial)
+        if integrity != "ok":
+            raise sqlite3.DatabaseError(f"snapshot failed integrity check: {integrity}")
+        os.replace(partial, target)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    rotated = rotate_snapshots(out_dir, keep)
+
+    impact = {}
+    if before is not None and after is not None:
+        jobs = after["db_jobs_total"] - before["db_jobs_total"]
+        impact = {
+            "db_jobs_during": jobs,
+            "db_mean_job_ms_during": mean_job_ms(jobs, after["db_busy_seconds_total"] - before["db_busy_seconds_total"]),
+            "db_mean_job_ms_before": mean_job_ms(before["db_jobs_total"], before["db_busy_seconds_total"]),
+        }
+    return SnapshotReport(
+        path=str(target),
+        bytes=target.stat().st_size,
+        pages=total_pages,
+        steps=steps,
+        duration_seconds=round(duration, 6),
+        integrity=integrity,
+        rotated=rotated,
+        **impact,
+    )
+
+
+class SnapshotScheduler:
+    # One daemon thread taking a snapshot every `interval` seconds on its own connection;
+    # the DB executor is never involved, so request handling only sees WAL contention.
+    def __init__(
+        self,
+        db_path: Path,
+        out_dir: Path,
+        interval: float = SNAPSHOT_INTERVAL_SECONDS,
+        keep: int = SNAPSHOT_KEEP,
+        stats_fn: Optional[Callable[[], dict]] = None,
+        logger_name: str = "leaderboard",
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.out_dir = Path(out_dir)
+        self.interval = interval
+        self.keep = keep
+        self.stats_fn = stats_fn
+        self.logger_name = logger_name
+        self.last_report: Optional[SnapshotReport] = None
+        self.snapshots_total = 0
+        self.failures_total = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="leaderboard-snapshots", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> SnapshotReport:
+        logger = logging.getLogger(self.logger_name)
+        # Serializes the scheduled run with on-demand admin snapshots.
+        with self._lock:
+            try:
+                report = take_snapshot(self.db_path, self.out_dir, self.keep, stats_fn=self.stats_fn)
+            except (OSError, sqlite3.Error) as exc:
+                self.failures_total += 1
+                log_event(logger, logging.ERROR, "snapshot_failed", error=str(exc))
+                raise
+            self.snapshots_total += 1
+            self.last_report = report
+        log_event(logger, logging.INFO, "snapshot_completed", **asdict(report))
+        return report
+
+    def stats(self) -> dict:
+        report = self.last_report
+        return {
+            "snapshots_total": self.snapshots_total,
+            "snapshot_failures_total": self.failures_total,
+            "snapshot_last_duration_seconds": report.duration_seconds if report else None,
+            "snapshot_last_bytes": report.bytes if report else None,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except (OSError, sqlite3.Error):
+                continue
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.snapshots",
+        description="Take a consistent online snapshot of the leaderboard database.",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(os.getenv("LEADERBOARD_DB_PATH") or Path("backend") / "leaderboard.db"),
+    )
+    parser.add_argument("--out-dir", type=Path, required=True)
+    parser.add_argument("--keep", type=int, default=SNAPSHOT_KEEP, help="snapshots to retain (default: 5)")
+    parser.add_argument("--pages", type=int, default=SNAPSHOT_PAGES_PER_STEP, help="pages copied per step")
+    parser.add_argument("--sleep", type=float, default=SNAPSHOT_STEP_SLEEP_SECONDS, help="pause between steps")
+    args = parser.parse_args(argv)
+    try:
+        report = take_snapshot(args.db, args.out_dir, args.keep, args.pages, args.sleep)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"snapshot failed: {exc}", file=sys.stderr)
+        return 1
+    for key, value in asdict(report).items():
+        if value is not None:
+            print(f"{key}={value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
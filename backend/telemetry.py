@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+from backend.export import connect_readonly
+from backend.ruleset_snapshot import RULESET_VERSION, load_rules
+
+
+TELEMETRY_FORMAT = 2
+TELEMETRY_CHUNK_ROWS = 1000
+ZLIB_LEVEL = 6
+HEADER_FIELDS = ("progress", "clientScore", "hpLeft", "hpMax", "goldSpentTotal", "goldEnd")
+
+# Blob layout, zlib-compressed, every integer an unsigned LEB128 varint:
+#   format, types digest, progress, clientScore, hpLeft, hpMax, goldSpentTotal, goldEnd,
+#   wave_count
+#   per wave: wave, mob_count, mob type ids[mob_count], boss bitset (ceil(n/8) bytes),
+#             damageTaken[mob_count]
+# Mob type ids are indexes into the ruleset's mob order. The header carries a CRC of that
+# order and decoding refuses a table that does not match, so editing the mobs without
+# bumping rulesetVersion cannot silently relabel stored runs. Keeping each field in its
+# own run per wave lets zlib find the repetition in ids and damage values.
+
+
+def mob_types(ruleset: dict) -> tuple[str, ...]:
+    return tuple(ruleset["mobs"]["mobs"].keys())
+
+
+def types_digest(types: Sequence[str]) -> int:
+    return zlib.crc32("\n".join(types).encode("utf-8"))
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError(f"telemetry values must be non-negative: {value}")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_run(payload: Any, types: Sequence[str]) -> bytes:
+    type_ids = {name: index for index, name in enumerate(types)}
+    out = bytearray()
+    economy = payload.economy
+    for value in (
+        TELEMETRY_FORMAT,
+        types_digest(types),
+        payload.progress,
+        payload.clientScore,
+        payload.hpLeft,
+        payload.hpMax,
+        economy.goldSpentTotal,
+        economy.goldEnd,
+        len(payload.waves),
+    ):
+        write_varint(out, value)
+    for wave in payload.waves:
+        mobs = wave.mobs
+        write_varint(out, wave.wave)
+        write_varint(out, len(mobs))
+        for mob in mobs:
+            type_id = type_ids.get(mob.type)
+            if type_id is None:
+                raise ValueError(f"unknown mob type: {mob.type}")
+            write_varint(out, type_id)
+        bits = bytearray((len(mobs) + 7) // 8)
+        for index, mob in enumerate(mobs):
+            if mob.isBoss:
+                bits[index >> 3] |= 1 << (index & 7)
+        out += bits
+        for mob in mobs:
+            write_varint(out, mob.damageTaken)
+    return zlib.compress(bytes(out), ZLIB_LEVEL)
+
+
+def mob_dict(mob_type: str, is_boss: bool, damage: int) -> dict:
+    return {"type": mob_type, "isBoss": is_boss, "damageTaken": damage}
+
+
+def wave_dict(number: int, mobs: list) -> dict:
+    return {"wave": number, "mobs": mobs}
+
+
+def decode_run(
+    blob: bytes,
+    types: Sequence[str],
+    mob: Callable[[str, bool, int], Any] = mob_dict,
+    wave: Callable[[int, list], Any] = wave_dict,
+) -> dict:
+    # Returns the submit payload shape, minus runId/playerName/rulesetVersion which live
+    # in score_runs. `mob`/`wave` build each entry, so bulk readers can decode straight
+    # into their own objects instead of converting dicts afterwards.
+    data = zlib.decompress(blob)
+    fmt, pos = read_varint(data, 0)
+    if fmt != TELEMETRY_FORMAT:
+        raise ValueError(f"unsupported telemetry format: {fmt}")
+    digest, pos = read_varint(data, pos)
+    if digest != types_digest(types):
+        raise ValueError("telemetry was encoded against a different mob order")
+    header = {}
+    for field in HEADER_FIELDS:
+        header[field], pos = read_varint(data, pos)
+    wave_count, pos = read_varint(data, pos)
+    waves = []
+    for _ in range(wave_count):
+        number, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        ids = data[pos : pos + count]
+        if len(ids) == count and (not ids or max(ids) < 0x80):
+            # Fewer than 128 mob types: every id is a single varint byte.
+            pos += count
+        else:
+            ids = []
+            for _ in range(count):
+                type_id, pos = read_varint(data, pos)
+                ids.append(type_id)
+        bits = data[pos : pos + (count + 7) // 8]
+        pos += len(bits)
+        mobs = []
+        for index, type_id in enumerate(ids):
+            damage, pos = read_varint(data, pos)
+            mobs.append(mob(types[type_id], bool(bits[index >> 3] & (1 << (index & 7))), damage))
+        waves.append(wave(number, mobs))
+    return {
+        "progress": header["progress"],
+        "clientScore": header["clientScore"],
+        "hpLeft": header["hpLeft"],
+        "hpMax": header["hpMax"],
+        "economy": {"goldSpentTotal": header["goldSpentTotal"], "goldEnd": header["goldEnd"]},
+        "waves": waves,
+    }
+
+
+def init_telemetry(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_telemetry (
+            run_id TEXT PRIMARY KEY,
+            ruleset_version TEXT NOT NULL,
+            blob BLOB NOT NULL
+        )
+        """
+    )
+
+
+def store_telemetry(conn: sqlite3.Connection, run_id: str, ruleset_version: str, blob: bytes) -> None:
+    # Must run inside the caller's insert transaction; the caller commits.
+    conn.execute(
+        "INSERT INTO run_telemetry (run_id, ruleset_version, blob) VALUES (?, ?, ?)",
+        (run_id, ruleset_version, blob),
+    )
+
+
+def iter_telemetry(
+    db_path: Path,
+    types_by_version: dict[str, Sequence[str]],
+    chunk_rows: int = TELEMETRY_CHUNK_ROWS,
+) -> Iterator[tuple[str, dict]]:
+    # Streams (run_id, decoded run) over a read-only snapshot; memory stays at one chunk.
+    conn = connect_readonly(db_path)
+    try:
+        conn.execute("BEGIN")
+        cursor = conn.execute("SELECT run_id, ruleset_version, blob FROM run_telemetry ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            for run_id, version, blob in rows:
+                types = types_by_version.get(version)
+                if types is None:
+                    raise ValueError(f"no mob order for ruleset {version}")
+                yield run_id, decode_run(blob, types)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def stored_bytes(db_path: Path) -> int:
+    conn = connect_readonly(db_path)
+    try:
+        row = conn.execute("SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM run_telemetry").fetchone()
+    finally:
+        conn.close()
+    return int(row[0])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.telemetry",
+        description="Decode stored per-wave telemetry as NDJSON, or summarize its size.",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(os.getenv("LEADERBOARD_DB_PATH") or Path("backend") / "leaderboard.db"),
+    )
+    parser.add_argument("--ruleset-dir", type=Path, default=Path("shared") / "ruleset")
+    parser.add_argument("--summary", action="store_true", help="print run count and compressed vs JSON bytes")
+    parser.add_argument("--limit", type=int, help="stop after printing this many runs (ignored with --summary)")
+    args = parser.parse_args(argv)
+
+    ruleset, _ = load_rules(args.ruleset_dir)
+    types_by_version = {RULESET_VERSION: mob_types(ruleset)}
+    runs = 0
+    json_bytes = 0
+    out = sys.stdout
+    try:
+        for run_id, run in iter_telemetry(args.db, types_by_version):
+            line = json.dumps({"runId": run_id, **run}, separators=(",", ":"))
+            runs += 1
+            if args.summary:
+                json_bytes += len(line)
+            else:
+                out.write(line + "\n")
+            if not args.summary and args.limit is not None and runs >= args.limit:
+                break
+    except (ValueError, sqlite3.Error, zlib.error) as exc:
+        print(f"telemetry decode failed: {exc}", file=sys.stderr)
+        return 1
+    if args.summary:
+        stored = stored_bytes(args.db)
+        ratio = stored / json_bytes if json_bytes else 0.0
+        print(f"runs={runs} stored_bytes={stored} json_bytes={json_bytes} ratio={ratio:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,10 +23,12 @@ def build_seeded_payload(
     player_name: str = "Tester",
     hp_left: int = 10,
     hp_max: int = 10,
+    full_waves: bool = False,
+    mob_types: list[str] | None = None,
 ) -> tuple[dict, dict[str, Any]]:
     rules = build_authority_rules(ruleset)
     rng = random.Random(seed)
-    mob_keys = list(rules.mob_defs.keys())
+    mob_keys = list(mob_types or rules.mob_defs.keys())
     if not mob_keys:
         raise ValueError("ruleset mobs cannot be empty")
 
@@ -35,7 +37,7 @@ def build_seeded_payload(
     earned_drops = 0
     for wave_index in range(progress):
         max_mobs = rules.max_mobs_per_wave[wave_index]
-        mob_count = rng.randint(1, max(1, max_mobs))
+        mob_count = max(1, max_mobs) if full_waves else rng.randint(1, max(1, max_mobs))
         mobs = []
         for _ in range(mob_count):
             mob_type = rng.choice(mob_keys)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.admission import (
+    PRIORITY_LOW,
+    PRIORITY_PLAUSIBLE,
+    PRIORITY_UNKNOWN,
+    AdmissionController,
+    Shed,
+    peek_client_score,
+    peek_seed,
+)
+from backend.app import CHEAP_GATE_LIMIT, create_app
+from backend.partitions import PartitionEntry
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+def test_peeks_read_header_or_raw_body():
+    body = b'{"runId":"r","playerName":"\\"seed\\":9","clientScore": 1234,"seed":77}'
+    assert peek_client_score(None, body) == 1234
+    assert peek_client_score("55", body) == 55
+    assert peek_client_score("-1", body) is None
+    assert peek_seed(body) == 77
+    assert peek_seed(b'{"clientScore":1}') is None
+
+
+def test_overload_sheds_by_priority_and_hands_slots_over():
+    async def scenario():
+        controller = AdmissionController(concurrency=1, queue_size=1, deadline_seconds=1)
+        await controller.acquire(PRIORITY_UNKNOWN)
+        unknown = asyncio.ensure_future(controller.acquire(PRIORITY_UNKNOWN))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as low:
+            await controller.acquire(PRIORITY_LOW)
+        # A plausible top-N run takes the full queue's last place from the unknown one.
+        plausible = asyncio.ensure_future(controller.acquire(PRIORITY_PLAUSIBLE))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as displaced:
+            await unknown
+        controller.release()
+        await plausible
+        controller.release()
+        return controller, low.value.reason, displaced.value.reason
+
+    controller, low, displaced = asyncio.run(scenario())
+    assert (low, displaced) == ("low_score", "displaced")
+    stats = controller.stats()
+    assert stats["admission_in_flight"] == 0
+    assert stats["admission_queue_depth"] == 0
+    assert stats["admission_admitted_total"] == 2
+    assert stats["admission_queue_waits_total"] == 2
+
+
+def test_queued_runs_are_shed_at_their_deadline():
+    async def scenario():
+        controller = AdmissionController(concurrency=1, deadline_seconds=0.01)
+        await controller.acquire(PRIORITY_UNKNOWN)
+        with pytest.raises(Shed) as shed:
+            await controller.acquire(PRIORITY_PLAUSIBLE)
+        controller.release()
+        return controller, shed.value.reason
+
+    controller, reason = asyncio.run(scenario())
+    assert reason == "deadline"
+    assert controller.in_flight == 0
+    assert controller.stats()["admission_queue_wait_p99_ms"] >= 10
+
+
+def test_saturated_submit_is_answered_from_the_peek(tmp_path: Path):
+    admission = AdmissionController(concurrency=0, deadline_seconds=0.01)
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admission=admission,
+    )
+    client = TestClient(app)
+    payload, _ = build_seeded_payload(make_ruleset(), seed=71, progress=1)
+
+    # No known threshold: the run waits for a slot that never frees up.
+    response = client.post("/api/score/submit", json=payload)
+    assert response.status_code == 503
+    assert response.json()["reason"] == "overloaded"
+
+    admission.threshold = payload["clientScore"] * 10
+    response = client.post("/api/score/submit", json=payload)
+    assert response.status_code == 200
+    assert response.json()["status"] == "not_in_topN"
+    metrics = client.get("/api/metrics").json()
+    assert metrics["admission_shed_low_score_total"] == 1
+    assert metrics["admission_shed_deadline_total"] == 1
+
+
+def test_saturated_seeded_submit_ignores_a_sparse_partition(tmp_path: Path):
+    admission = AdmissionController(concurrency=0, deadline_seconds=0.01)
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admission=admission,
+    )
+    client = TestClient(app)
+    payload, _ = build_seeded_payload(make_ruleset(), seed=71, progress=1)
+    payload["seed"] = 7
+    high = payload["clientScore"] * 10
+    app.state.partition_cache.put(("v1", 7), PartitionEntry(1, [{"score": high}]))
+
+    # One cached run is not a top N, and the global threshold says nothing about a partition:
+    # the run is unknown and queued even though the global board would skip it.
+    assert client.post("/api/score/submit", json=payload).json()["reason"] == "overloaded"
+    admission.threshold = payload["clientScore"] * 2
+    assert client.post("/api/score/submit", json=payload).json()["reason"] == "overloaded"
+    assert admission.shed["low_score"] == 0
+
+    items = [{"score": high}] * CHEAP_GATE_LIMIT
+    app.state.partition_cache.put(("v1", 7), PartitionEntry(2, items))
+    assert client.post("/api/score/submit", json=payload).json()["status"] == "not_in_topN"
+    assert admission.shed["low_score"] == 1
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.anomaly import AnomalyScorer, KLLSketch, load_checkpoint, save_checkpoint
+from backend.app import create_app
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+def test_kll_quantiles_stay_bounded_and_merge():
+    rng = random.Random(3)
+    left, right = KLLSketch(k=100, seed=1), KLLSketch(k=100, seed=2)
+    for value in range(20_000):
+        (left if rng.random() < 0.5 else right).update(value)
+    left.merge(right)
+    assert left.n == 20_000
+    assert sum(len(items) for items in left.levels) < 400
+    assert abs(left.quantile(0.5) - 10_000) < 600
+    below, _ = left.ranks(18_000)
+    assert abs(below - 0.9) < 0.03
+
+
+def test_scorer_ranks_outliers_and_survives_checkpoint(tmp_path: Path):
+    rng = random.Random(5)
+    scorer = AnomalyScorer(min_samples=20, top_outliers=3)
+    for index in range(300):
+        features = AnomalyScorer.features(2, [rng.randint(8, 12), rng.randint(8, 12)], [20, 22], rng.randint(-2, 2))
+        scorer.observe(f"run-{index}", features)
+    score = scorer.observe("cheater", AnomalyScorer.features(2, [10, 10], [20, 22], 40))
+    assert score > 2
+    assert scorer.top(1)[0]["runId"] == "cheater"
+    assert scorer.top(1)[0]["feature"] == "drift:2"
+
+    path = tmp_path / "anomaly.json"
+    save_checkpoint(path, scorer.to_dict())
+    restored = load_checkpoint(path, min_samples=20, top_outliers=3)
+    assert restored.runs == scorer.runs
+    assert restored.top(1) == scorer.top(1)
+    assert [o["score"] for o in restored.top(3)] == [o["score"] for o in scorer.top(3)]
+    assert restored.sketches["drift:2"].quantile(0.5) == scorer.sketches["drift:2"].quantile(0.5)
+
+
+def test_accepted_runs_feed_checkpointed_scorer(tmp_path: Path):
+    anomaly_path = tmp_path / "anomaly.json"
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admin_token="secret",
+        anomaly_path=anomaly_path,
+    )
+    payload, _ = build_seeded_payload(make_ruleset(), seed=71, progress=2)
+    with TestClient(app) as client:
+        assert client.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+        report = client.get("/api/admin/anomalies", headers={"X-Admin-Token": "secret"}).json()
+        assert report["runs"] == 1
+        assert set(report["sketches"]) == {"kills:1", "kills:2", "drops:1", "drops:2", "drift:2"}
+    assert json.loads(anomaly_path.read_text())["runs"] == 1
@@ -169,11 +169,35 @@ def test_duplicate_run_rejected(tmp_path: Path):
     payload, _ = build_seeded_payload(ruleset, seed=44, progress=1, run_id=run_id)
     resp_1 = client.post("/api/score/submit", json=payload)
     assert resp_1.status_code == 200
-    resp_2 = client.post("/api/score/submit", json=payload)
+    tampered = clone_payload(payload)
+    tampered["playerName"] = "Someone else"
+    resp_2 = client.post("/api/score/submit", json=tampered)
     assert resp_2.status_code == 409
     assert resp_2.json()["reason"] == "already_submitted"
 
 
+def test_identical_retry_returns_original_response(tmp_path: Path):
+    limiter = RateLimiter(max_requests=1, window_seconds=60)
+    app = build_app(tmp_path, limiter=limiter)
+    client = TestClient(app)
+    ruleset = make_ruleset()
+    payload, _ = build_seeded_payload(ruleset, seed=45, progress=2)
+    body = json.dumps(payload)
+    headers = {"content-type": "application/json"}
+
+    resp_1 = client.post("/api/score/submit", content=body, headers=headers)
+    assert resp_1.status_code == 200
+    assert resp_1.json()["rank"] == 1
+    # Neither the rate limiter nor the replay guard sees the retry.
+    resp_2 = client.post("/api/score/submit", content=body, headers=headers)
+    assert resp_2.status_code == 200
+    assert resp_2.content == resp_1.content
+    assert resp_2.headers["idempotent-replayed"] == "true"
+    metrics = client.get("/api/metrics").json()
+    assert metrics["submit_total"] == 1
+    assert metrics["submit_idempotent_replays_total"] == 1
+
+
 def test_mob_overflow_rejected(tmp_path: Path):
     app = build_app(tmp_path)
     client = TestClient(app)
@@ -217,3 +241,106 @@ def test_payload_too_large_rejected(tmp_path: Path):
     resp = client.post("/api/score/submit", json=payload)
     assert resp.status_code == 400
     assert resp.json()["reason"] == "INVALID_PAYLOAD"
+
+
+def test_metrics_expose_db_queue(tmp_path: Path):
+    app = build_app(tmp_path)
+    client = TestClient(app)
+    ruleset = make_ruleset()
+    payload, _ = build_seeded_payload(ruleset, seed=12, progress=1)
+    assert client.post("/api/score/submit", json=payload).status_code == 200
+    assert client.get("/api/leaderboard").status_code == 200
+
+    metrics = client.get("/api/metrics").json()
+    assert metrics["submit_accepted_total"] == 1
+    assert metrics["db_queue_depth"] == 0
+    assert metrics["db_jobs_total"] >= 3
+    assert "log_records_dropped_total" in metrics
+
+
+def test_leaderboard_etag_only_changes_with_top_n(tmp_path: Path):
+    app = build_app(tmp_path)
+    client = TestClient(app)
+    ruleset = make_ruleset()
+
+    first = client.get("/api/leaderboard")
+    etag = first.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+    jobs_before = client.get("/api/metrics").json()["db_jobs_total"]
+    not_modified = client.get("/api/leaderboard", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert client.get("/api/metrics").json()["db_jobs_total"] == jobs_before
+
+    for seed in (1, 2, 3):
+        payload, _ = build_seeded_payload(ruleset, seed=seed, progress=2)
+        assert client.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+    changed = client.get("/api/leaderboard", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    top_etag = changed.headers["etag"]
+    assert top_etag != etag
+
+    # Accepted but ranked below the top 3: the board version must not move.
+    low, meta = build_seeded_payload(ruleset, seed=4, progress=1)
+    low["clientScore"] = expected_score(2, meta["total_kills"], 10, 10)
+    assert client.post("/api/score/submit", json=low).json()["status"] == "accepted"
+    assert client.get("/api/leaderboard", headers={"If-None-Match": top_etag}).status_code == 304
+
+
+def test_leaderboard_version_is_shared_by_workers_on_one_database(tmp_path: Path):
+    # Two apps on one file stand in for two uvicorn workers.
+    worker_a = TestClient(build_app(tmp_path))
+    app_b = create_app(db_path=tmp_path / "db.sqlite3", ruleset_dir=tmp_path / "ruleset")
+    worker_b = TestClient(app_b)
+    stale = worker_b.get("/api/leaderboard")
+    assert stale.json() == {"items": []}
+
+    payload, _ = build_seeded_payload(make_ruleset(), seed=1, progress=2)
+    assert worker_a.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+    fresh_a = worker_a.get("/api/leaderboard")
+
+    app_b.state.meta_check_interval = 0
+    fresh_b = worker_b.get("/api/leaderboard", headers={"If-None-Match": stale.headers["etag"]})
+    assert fresh_b.status_code == 200
+    assert fresh_b.json() == fresh_a.json() and len(fresh_b.json()["items"]) == 1
+    assert fresh_b.headers["etag"] == fresh_a.headers["etag"]
+    assert worker_b.get("/api/leaderboard", headers={"If-None-Match": fresh_a.headers["etag"]}).status_code == 304
+
+
+def test_leaderboard_serves_cached_bytes_until_version_changes(tmp_path: Path):
+    app = build_app(tmp_path)
+    client = TestClient(app)
+    ruleset = make_ruleset()
+    payload, meta = build_seeded_payload(ruleset, seed=5, progress=2, player_name="Ünï")
+    assert client.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+
+    first = client.get("/api/leaderboard")
+    second = client.get("/api/leaderboard")
+    assert first.content == second.content
+    assert first.headers["content-type"] == "application/json"
+    items = second.json()["items"]
+    assert items[0]["playerName"] == "Ünï"
+    assert items[0]["score"] == expected_score(2, meta["total_kills"], 10, 10)
+    assert set(items[0]) == {"playerName", "score", "progress", "createdAt"}
+    assert client.get("/api/metrics").json()["leaderboard_cache_hits_total"] == 1
+
+    payload_2, _ = build_seeded_payload(ruleset, seed=6, progress=2, hp_left=9)
+    assert client.post("/api/score/submit", json=payload_2).json()["status"] == "accepted"
+    assert len(client.get("/api/leaderboard").json()["items"]) == 2
+
+
+def test_cached_leaderboard_bytes_expire_on_another_workers_insert(tmp_path: Path):
+    worker_a = TestClient(build_app(tmp_path))
+    app_b = create_app(db_path=tmp_path / "db.sqlite3", ruleset_dir=tmp_path / "ruleset")
+    worker_b = TestClient(app_b)
+    assert worker_b.get("/api/leaderboard").json() == {"items": []}
+    assert worker_b.get("/api/leaderboard").json() == {"items": []}
+    assert worker_b.get("/api/metrics").json()["leaderboard_cache_hits_total"] == 1
+
+    payload, _ = build_seeded_payload(make_ruleset(), seed=2, progress=2, player_name="Other")
+    assert worker_a.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+    app_b.state.meta_check_interval = 0
+    items = worker_b.get("/api/leaderboard").json()["items"]
+    assert [item["playerName"] for item in items] == ["Other"]
+    # Re-encoded once under the new version, then served from the cache again.
+    assert worker_b.get("/api/leaderboard").json()["items"] == items
+    assert worker_b.get("/api/metrics").json()["leaderboard_cache_hits_total"] == 2
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from backend.benchmarks.runner import BenchCase, BenchResult, compare_results, load_baseline, run_case, save_baseline
+
+
+def make_result(name: str, median_us: float) -> BenchResult:
+    return BenchResult(name=name, iterations=10, mean_us=median_us, median_us=median_us, p95_us=median_us, min_us=median_us)
+
+
+def test_run_case_records_iterations():
+    calls = []
+    result = run_case(BenchCase("noop", lambda: lambda: calls.append(1)), iterations=5, warmup=2)
+    assert result.iterations == 5
+    assert len(calls) == 7
+    assert result.min_us <= result.median_us <= result.p95_us
+
+
+def test_compare_flags_regressions_beyond_threshold(tmp_path: Path):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, [make_result("fast", 100.0), make_result("steady", 100.0)])
+    baseline = load_baseline(path)
+
+    current = [make_result("fast", 130.0), make_result("steady", 110.0), make_result("new", 1.0)]
+    regressions = compare_results(baseline, current, threshold=0.15)
+    assert [regression.name for regression in regressions] == ["fast"]
+    assert regressions[0].ratio == 1.3
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from backend.app import create_app
+from backend.board_hub import BoardHub, HubFull
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+def item(name: str, score: int) -> dict:
+    return {"playerName": name, "score": score, "progress": 1, "createdAt": "2024-01-01"}
+
+
+def parse(message: bytes) -> tuple[str, dict]:
+    lines = message.decode("utf-8").strip().split("\n")
+    return lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))
+
+
+def test_stream_sends_snapshot_then_coalesced_diff():
+    async def scenario():
+        hub = BoardHub(coalesce_seconds=0.01)
+        hub.prime(1, [item("a", 30), item("b", 20)])
+        stream = hub.stream()
+        first = await stream.__anext__()
+        assert hub.subscriber_count == 1
+
+        hub.publish(2, [item("c", 40), item("a", 30)])
+        hub.publish(3, [item("c", 40), item("d", 35)])
+        second = await asyncio.wait_for(stream.__anext__(), 1)
+        await stream.aclose()
+        return hub, first, second
+
+    hub, first, second = asyncio.run(scenario())
+    assert parse(first) == ("snapshot", {"version": 1, "items": [item("a", 30), item("b", 20)]})
+    event, data = parse(second)
+    assert event == "diff"
+    assert data["version"] == 3
+    assert data["changes"] == [{"rank": 1, "item": item("c", 40)}, {"rank": 2, "item": item("d", 35)}]
+    assert hub.stats()["stream_publishes_coalesced_total"] == 1
+    assert hub.stats()["stream_broadcasts_total"] == 1
+    assert hub.subscriber_count == 0
+
+
+def test_unchanged_board_is_not_broadcast_and_slow_clients_get_snapshot():
+    async def scenario():
+        hub = BoardHub(coalesce_seconds=0)
+        hub.prime(1, [item("a", 30)])
+        subscriber = hub.subscribe()
+        hub.publish(2, [item("a", 30)])
+        await asyncio.sleep(0.01)
+        assert subscriber.pending is None
+
+        hub.publish(3, [item("b", 50)])
+        await asyncio.sleep(0.01)
+        hub.publish(4, [item("c", 60)])
+        await asyncio.sleep(0.01)
+        return hub, subscriber.take()
+
+    hub, message = asyncio.run(scenario())
+    assert parse(message) == ("snapshot", {"version": 4, "items": [item("c", 60)]})
+    assert hub.stats()["stream_snapshot_fallbacks_total"] == 1
+
+
+def test_subscriber_limit():
+    hub = BoardHub(max_subscribers=1)
+    hub.subscribe()
+    with pytest.raises(HubFull):
+        hub.subscribe()
+    assert hub.stats()["stream_connections_rejected_total"] == 1
+
+
+def test_stream_that_never_starts_holds_no_subscription():
+    async def scenario():
+        hub = BoardHub(max_subscribers=1)
+        hub.prime(1, [item("a", 30)])
+        # A response dropped before its first chunk: the generator is never iterated.
+        dropped = hub.stream()
+        await dropped.aclose()
+        assert hub.subscriber_count == 0
+        del dropped
+
+        stream = hub.stream()
+        await stream.__anext__()
+        # The last slot is taken: a racing stream ends without subscribing.
+        assert [chunk async for chunk in hub.stream()] == []
+        await stream.aclose()
+        return hub
+
+    hub = asyncio.run(scenario())
+    assert hub.subscriber_count == 0
+    hub.ensure_capacity()
+
+
+def test_stream_follows_inserts_made_by_another_worker(tmp_path: Path):
+    ruleset_dir = write_ruleset(tmp_path)
+    worker_a = create_app(db_path=tmp_path / "db.sqlite3", ruleset_dir=ruleset_dir)
+    worker_b = create_app(db_path=tmp_path / "db.sqlite3", ruleset_dir=ruleset_dir)
+    worker_b.state.meta_check_interval = 0
+    payload, _ = build_seeded_payload(make_ruleset(), seed=1, progress=2, player_name="Remote")
+
+    async def scenario():
+        sent: asyncio.Queue = asyncio.Queue()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/leaderboard/stream", "raw_path": b"/api/leaderboard/stream",
+            "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+            "server": ("test", 80),
+        }
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def body() -> bytes:
+            while True:
+                message = await asyncio.wait_for(sent.get(), 2)
+                if message["type"] == "http.response.body" and message["body"]:
+                    return message["body"]
+
+        # Only worker B holds the stream; worker A takes the insert.
+        stream = asyncio.create_task(worker_b(scope, receive, sent.put))
+        snapshot = await body()
+        transport = httpx.ASGITransport(app=worker_a)
+        async with httpx.AsyncClient(transport=transport, base_url="http://a") as client:
+            accepted = await client.post("/api/score/submit", json=payload)
+        diff = await body()
+        stream.cancel()
+        return snapshot, accepted.json(), diff
+
+    snapshot, accepted, diff = asyncio.run(scenario())
+    assert parse(snapshot)[1]["items"] == []
+    assert accepted["status"] == "accepted"
+    event, data = parse(diff)
+    assert event == "diff"
+    assert data["changes"][0]["item"]["playerName"] == "Remote"
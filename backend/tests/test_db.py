@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from backend.db import DatabaseBusy, DatabaseExecutor
+
+
+def test_executor_runs_jobs_on_dedicated_thread(tmp_path: Path):
+    executor = DatabaseExecutor(tmp_path / "db.sqlite3")
+    caller = threading.get_ident()
+
+    def job(conn, value):
+        conn.execute("CREATE TABLE IF NOT EXISTS t (v INTEGER)")
+        conn.execute("INSERT INTO t (v) VALUES (?)", (value,))
+        conn.commit()
+        return threading.get_ident(), conn.execute("SELECT SUM(v) AS total FROM t").fetchone()["total"]
+
+    async def drive():
+        return await asyncio.gather(*(executor.run(job, value) for value in range(10)))
+
+    results = asyncio.run(drive())
+    executor.close()
+    assert {ident for ident, _ in results} != {caller}
+    assert len({ident for ident, _ in results}) == 1
+    assert results[-1][1] == sum(range(10))
+    assert executor.stats()["db_jobs_total"] == 10
+
+
+def test_executor_rejects_when_queue_full(tmp_path: Path):
+    executor = DatabaseExecutor(tmp_path / "db.sqlite3", max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(_conn):
+        started.set()
+        release.wait(5)
+
+    first = executor.submit(blocking)
+    started.wait(5)
+    executor.submit(lambda _conn: None)
+    with pytest.raises(DatabaseBusy):
+        executor.submit(lambda _conn: None)
+    assert executor.depth == 1
+    release.set()
+    first.result(5)
+    executor.close()
+    assert executor.stats()["db_rejected_total"] == 1
+
+
+def test_executor_propagates_errors_and_rolls_back(tmp_path: Path):
+    executor = DatabaseExecutor(tmp_path / "db.sqlite3")
+    executor.call(lambda conn: conn.execute("CREATE TABLE t (v INTEGER)"))
+
+    def failing(conn):
+        conn.execute("INSERT INTO t (v) VALUES (1)")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        executor.call(failing)
+    assert executor.call(lambda conn: conn.execute("SELECT COUNT(*) AS n FROM t").fetchone()["n"]) == 0
+    executor.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import create_app, init_db
+from backend.export import (
+    EXPORT_FORMATS,
+    ExportFilter,
+    build_query,
+    encode_csv,
+    encode_ndjson,
+    iter_chunks,
+    stream_export,
+)
+from backend.tests.test_api import write_ruleset
+
+
+INSERT_RUN = (
+    "INSERT INTO score_runs (run_id, player_name, client_score, server_score, progress, created_at, ip) "
+)
+
+
+def seed_runs(db_path: Path, count: int) -> None:
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        INSERT_RUN + "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (f"run-{i}", f"p,{i}", i, i * 10, i % 5, f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00", "ip")
+            for i in range(count)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_export_streams_in_chunks_with_filters(tmp_path: Path):
+    db_path = tmp_path / "export.db"
+    seed_runs(db_path, 250)
+
+    chunks = list(stream_export(db_path, "ndjson", chunk_rows=100))
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["run_id"] for row in rows] == [f"run-{i}" for i in range(250)]
+
+    filters = ExportFilter(since="2024-01-01T00:01:00", until="2024-01-01T00:02:00Z", min_score=1000)
+    data = b"".join(stream_export(db_path, "csv", filters, chunk_rows=7)).decode()
+    records = list(csv.DictReader(io.StringIO(data)))
+    assert [int(r["server_score"]) for r in records] == [i * 10 for i in range(100, 120)]
+    assert records[0]["player_name"] == "p,100"
+
+
+def test_export_sees_a_consistent_snapshot(tmp_path: Path):
+    db_path = tmp_path / "export.db"
+    seed_runs(db_path, 10)
+    stream = stream_export(db_path, "ndjson", chunk_rows=2)
+    first = next(stream)
+    writer = sqlite3.connect(db_path)
+    writer.execute(INSERT_RUN + "VALUES ('late', 'x', 0, 0, 0, '2030-01-01T00:00:00+00:00', 'ip')")
+    writer.commit()
+    writer.close()
+    lines = (first + b"".join(stream)).splitlines()
+    assert len(lines) == 10
+
+
+def test_admin_export_requires_token(tmp_path: Path):
+    db_path = tmp_path / "db.sqlite3"
+    ruleset_dir = write_ruleset(tmp_path)
+    seed_runs(db_path, 3)
+    client = TestClient(create_app(db_path=db_path, ruleset_dir=ruleset_dir, admin_token="secret"))
+    assert client.get("/api/admin/export").status_code == 401
+    assert client.get("/api/admin/export", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    resp = client.get("/api/admin/export?format=csv&minScore=10", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert len(resp.text.splitlines()) == 3
+    bad = client.get("/api/admin/export?since=yesterday", headers={"X-Admin-Token": "secret"})
+    assert bad.status_code == 400
+
+    disabled = TestClient(create_app(db_path=db_path, ruleset_dir=ruleset_dir))
+    assert disabled.get("/api/admin/export", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+
+def wal_checkpoint_busy(db_path: Path) -> int:
+    writer = sqlite3.connect(db_path, timeout=0)
+    try:
+        writer.execute(INSERT_RUN + "VALUES (hex(randomblob(8)), 'x', 0, 0, 0, '2030-01-01', 'ip')")
+        writer.commit()
+        return writer.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize("fmt", EXPORT_FORMATS)
+def test_closing_an_abandoned_export_ends_its_read_transaction(tmp_path: Path, fmt: str):
+    db_path = tmp_path / "export.db"
+    seed_runs(db_path, 30)
+    # Something else still holds the row generator, as a suspended response iterator can:
+    # only an explicit close, not garbage collection, may end the snapshot.
+    chunks = iter_chunks(db_path, *build_query(ExportFilter()), chunk_rows=10)
+    stream = encode_ndjson(chunks) if fmt == "ndjson" else encode_csv(chunks)
+    next(stream)
+    assert wal_checkpoint_busy(db_path) == 1
+    stream.close()
+    assert wal_checkpoint_busy(db_path) == 0
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import sqlite3
 
 from backend.app import SubmitPayload
@@ -55,6 +56,35 @@ def test_authority_validation_success_and_failure():
     assert bad_result.reason == "ECONOMY_INVALID"
 
 
+def test_authority_enforces_wave_damage_budget_and_spike():
+    ruleset = make_ruleset()
+    rules = build_authority_rules(ruleset)
+    payload_dict, _ = build_seeded_payload(ruleset, seed=7, progress=2)
+    payload = SubmitPayload(**payload_dict)
+    wave_damage = [sum(mob["damageTaken"] for mob in wave["mobs"]) for wave in payload_dict["waves"]]
+
+    tight = dataclasses.replace(
+        rules, max_damage_per_wave=[wave_damage[0] - 1] * rules.wave_count, damage_overflow_max=0
+    )
+    result = validate_authority(payload, tight)
+    assert result.reason == "DAMAGE_INVALID"
+    assert result.detail == {"wave": 1, "damage": wave_damage[0], "cap": wave_damage[0] - 1}
+
+    spiky = dataclasses.replace(
+        rules,
+        max_damage_per_wave=[sum(wave_damage)] * rules.wave_count,
+        damage_overflow_max=0,
+        max_spike_ratio=wave_damage[1] / wave_damage[0] / 2,
+    )
+    result = validate_authority(payload, spiky)
+    assert result.reason == "DAMAGE_INVALID"
+    assert result.detail["wave"] == 2
+    assert result.detail["previous"] == wave_damage[0]
+
+    relaxed = dataclasses.replace(spiky, max_spike_ratio=wave_damage[1] / wave_damage[0])
+    assert validate_authority(payload, relaxed).ok is True
+
+
 def test_precheck_rejects_invalid_progress():
     ruleset = make_ruleset()
     rules = build_authority_rules(ruleset)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import create_app
+from backend.heavy_hitters import HeavyHitters, SubmitterTracker
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+def test_heavy_hitters_find_hammering_keys_in_bounded_memory():
+    tracker = HeavyHitters(k=10, width=512)
+    rng = random.Random(5)
+    truth = {f"203.0.113.{i}": 300 - i * 20 for i in range(5)}
+    stream = [key for key, count in truth.items() for _ in range(count)]
+    stream += [f"10.0.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(20_000)]
+    rng.shuffle(stream)
+    for key in stream:
+        tracker.add(key, now=0.0)
+    top = tracker.top(5, now=0.0)
+    assert [item["key"] for item in top] == list(truth)
+    # Count-min only ever overcounts.
+    assert all(item["count"] >= truth[item["key"]] for item in top)
+    assert len(tracker._top) <= 10
+
+
+def test_counts_slide_out_of_the_window():
+    tracker = HeavyHitters(k=4, window_seconds=60.0, slices=6)
+    for _ in range(5):
+        tracker.add("early", now=0.0)
+    for _ in range(3):
+        tracker.add("late", now=35.0)
+    assert tracker.top(4, now=59.0) == [{"key": "early", "count": 5}, {"key": "late", "count": 3}]
+    assert tracker.top(4, now=65.0) == [{"key": "late", "count": 3}]
+    assert tracker.top(4, now=600.0) == []
+
+
+def test_admin_heavy_hitters_lists_submitters_and_rejections(tmp_path: Path):
+    now = [0.0]
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admin_token="secret",
+        heavy_hitters=SubmitterTracker(time_fn=lambda: now[0]),
+    )
+    client = TestClient(app)
+    payload, _ = build_seeded_payload(make_ruleset(), seed=8, progress=2, player_name="Hammer")
+    headers = {"X-Forwarded-For": "198.51.100.7"}
+    assert client.post("/api/score/submit", json=payload, headers=headers).json()["status"] == "accepted"
+    for _ in range(2):
+        assert client.post("/api/score/submit", json={**payload, "hpMax": 0}, headers=headers).status_code == 400
+    # Same run, different bytes: not an idempotent replay but a duplicate run.
+    replay = {**payload, "clientScore": payload["clientScore"] - 1}
+    assert client.post("/api/score/submit", json=replay, headers=headers).status_code == 409
+
+    assert client.get("/api/admin/heavy-hitters").status_code == 401
+    report = client.get("/api/admin/heavy-hitters", headers={"X-Admin-Token": "secret"}).json()
+    assert report["ip"] == [{"key": "198.51.100.7", "count": 4}]
+    assert report["player"] == [{"key": "Hammer", "count": 2}]
+    assert report["reason"] == [
+        {"key": "INVALID_PAYLOAD", "count": 2},
+        {"key": "already_submitted", "count": 1},
+    ]
+    assert report["rejected_player"] == [{"key": "Hammer", "count": 1}]
+
+    now[0] = 3600.0
+    report = client.get("/api/admin/heavy-hitters", headers={"X-Admin-Token": "secret"}).json()
+    assert report["ip"] == [] and report["reason"] == []
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from backend.idempotency import ResponseCache, body_digest
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_expires_and_evicts_lru():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl_seconds=10, time_fn=clock)
+    a, b, c = body_digest(b"a"), body_digest(b"b"), body_digest(b"c")
+    cache.store("run-a", a, 200, b"A")
+    cache.store("run-b", b, 200, b"B")
+    assert cache.lookup(a).body == b"A"
+    cache.store("run-c", c, 200, b"C")
+    assert cache.lookup(b) is None
+    assert cache.lookup(a) is not None
+    assert len(cache) == 2
+
+    clock.now = 11
+    assert cache.lookup(a) is None
+    assert cache.lookup(c) is None
+
+
+def test_restoring_a_run_replaces_its_digest():
+    cache = ResponseCache()
+    first, second = body_digest(b"first"), body_digest(b"second")
+    cache.store("run-1", first, 200, b"1")
+    cache.store("run-1", second, 200, b"2")
+    assert cache.lookup(first) is None
+    assert cache.lookup(second).body == b"2"
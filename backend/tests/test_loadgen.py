@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from backend.app import SubmitPayload
+from backend.benchmarks.cases import load_shared_ruleset
+from backend.guards.authority import build_authority_rules, validate_authority
+from backend.loadgen import LoadReport, TrafficMix, build_in_process_client, parse_mix, run_load
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+def test_parse_mix_rejects_unknown_kinds():
+    assert parse_mix("fresh=1,leaderboard=2") == {"fresh": 1.0, "leaderboard": 2.0}
+    with pytest.raises(argparse.ArgumentTypeError, match="bogus"):
+        parse_mix("bogus=1")
+    with pytest.raises(argparse.ArgumentTypeError, match="sum"):
+        parse_mix("fresh=0")
+
+
+def test_fresh_templates_pass_authority():
+    ruleset = load_shared_ruleset()
+    rules = build_authority_rules(ruleset)
+    mix = TrafficMix(ruleset, parse_mix("fresh=1"), seed=5)
+    for template in mix.fresh_templates + mix.loser_templates:
+        result = validate_authority(SubmitPayload(**json.loads(template)), rules)
+        assert result.ok, result.reason
+
+
+def test_open_loop_run_in_process(tmp_path: Path):
+    ruleset_dir = write_ruleset(tmp_path)
+    mix = TrafficMix(make_ruleset(), parse_mix("fresh=1,replay=1,loser=1,invalid=1,leaderboard=1"), seed=3)
+    report = LoadReport(target="asgi", rps=200, duration=0.25)
+
+    async def drive():
+        async with build_in_process_client(ruleset_dir, tmp_path / "load.db") as client:
+            return await run_load(client, mix, rps=200, duration=0.25, report=report)
+
+    asyncio.run(drive())
+    summary = report.as_dict()
+    assert report.sent >= 40
+    assert report.errors == 0
+    assert report.completed == report.sent
+    assert summary["outcomes"].get("200 leaderboard", 0) > 0
+    assert summary["latencyMs"]["p50"] <= summary["latencyMs"]["p99"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+
+from backend.log_pipeline import build_log_pipeline, log_event
+
+
+def make_logger(name: str, pipeline) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def test_pipeline_emits_compact_json_lines():
+    stream = io.StringIO()
+    pipeline = build_log_pipeline(stream=stream)
+    logger = make_logger("test.pipeline.json", pipeline)
+    pipeline.start()
+    log_event(logger, logging.INFO, "submission_rejected", run="run-1", reason="MOB_INVALID", wave=2)
+    logger.info("plain %s", "message")
+    pipeline.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first["event"] == "submission_rejected"
+    assert first["run"] == "run-1"
+    assert first["wave"] == 2
+    assert " " not in lines[0].replace("submission_rejected", "")
+    assert json.loads(lines[1])["msg"] == "plain message"
+
+
+def test_pipeline_samples_high_volume_events():
+    stream = io.StringIO()
+    pipeline = build_log_pipeline(stream=stream, sample_rates={"leaderboard_request": 10})
+    logger = make_logger("test.pipeline.sampling", pipeline)
+    pipeline.start()
+    for _ in range(25):
+        log_event(logger, logging.INFO, "leaderboard_request", limit=3)
+    log_event(logger, logging.INFO, "run_accepted", run="run-2")
+    pipeline.stop()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    sampled = [entry for entry in entries if entry["event"] == "leaderboard_request"]
+    assert len(sampled) == 3
+    assert all(entry["sample"] == 10 for entry in sampled)
+    assert [entry["event"] for entry in entries].count("run_accepted") == 1
+
+
+def test_pipeline_counts_dropped_records_when_queue_full():
+    stream = io.StringIO()
+    pipeline = build_log_pipeline(stream=stream, queue_size=2)
+    logger = make_logger("test.pipeline.backpressure", pipeline)
+    for index in range(5):
+        log_event(logger, logging.INFO, "run_accepted", run=index)
+
+    assert pipeline.dropped == 3
+    assert pipeline.queue_depth == 2
+    pipeline.start()
+    pipeline.stop()
+    assert len(stream.getvalue().splitlines()) == 2
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import create_app, init_db
+from backend.partitions import PartitionCache, PartitionEntry
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import build_app, make_ruleset
+
+
+def submit(client: TestClient, ruleset: dict, seed: int, progress: int, board_seed: int, hp_left: int = 10) -> dict:
+    payload, _ = build_seeded_payload(ruleset, seed=seed, progress=progress, hp_left=hp_left)
+    payload["seed"] = board_seed
+    return client.post("/api/score/submit", json=payload).json()
+
+
+def scores(response) -> list[int]:
+    return [item["score"] for item in response.json()["items"]]
+
+
+def test_seeded_runs_rank_and_gate_on_their_partition(tmp_path: Path):
+    client = TestClient(build_app(tmp_path))
+    ruleset = make_ruleset()
+    high = submit(client, ruleset, seed=61, progress=2, board_seed=7)
+    # Below the global top N, but first on an empty partition: the partition gate lets it in.
+    low = submit(client, ruleset, seed=62, progress=1, board_seed=8, hp_left=2)
+    assert (high["status"], high["rank"], high["seedRank"]) == ("accepted", 1, 1)
+    assert (low["status"], low["rank"], low["seedRank"]) == ("accepted", 2, 1)
+
+    assert scores(client.get("/api/leaderboard?seed=7")) == [high["serverScore"]]
+    board = client.get("/api/leaderboard?seed=8&ruleset=v1")
+    assert scores(board) == [low["serverScore"]]
+    assert scores(client.get("/api/leaderboard")) == [high["serverScore"], low["serverScore"]]
+
+    etag = board.headers["etag"]
+    assert client.get("/api/leaderboard?seed=8", headers={"If-None-Match": etag}).status_code == 304
+    better = submit(client, ruleset, seed=63, progress=1, board_seed=8)
+    assert better["seedRank"] == 1
+    refreshed = client.get("/api/leaderboard?seed=8", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert scores(refreshed) == [better["serverScore"], low["serverScore"]]
+    assert client.get("/api/metrics").json()["partition_cache_hits_total"] >= 2
+
+
+def test_partition_cache_follows_inserts_made_by_another_worker(tmp_path: Path):
+    worker_a = TestClient(build_app(tmp_path))
+    app_b = create_app(db_path=tmp_path / "db.sqlite3", ruleset_dir=tmp_path / "ruleset")
+    worker_b = TestClient(app_b)
+    stale = worker_b.get("/api/leaderboard?seed=8")
+    assert scores(stale) == []
+
+    run = submit(worker_a, make_ruleset(), seed=62, progress=1, board_seed=8)
+    fresh_a = worker_a.get("/api/leaderboard?seed=8")
+    app_b.state.meta_check_interval = 0
+    fresh_b = worker_b.get("/api/leaderboard?seed=8", headers={"If-None-Match": stale.headers["etag"]})
+    assert fresh_b.status_code == 200
+    assert scores(fresh_b) == scores(fresh_a) == [run["serverScore"]]
+    assert fresh_b.headers["etag"] == fresh_a.headers["etag"]
+    assert worker_b.get("/api/leaderboard?seed=8", headers={"If-None-Match": fresh_a.headers["etag"]}).status_code == 304
+
+
+def test_sparse_partition_does_not_gate_a_run_out_of_the_global_board(tmp_path: Path):
+    client = TestClient(build_app(tmp_path))
+    ruleset = make_ruleset()
+    for seed, hp_left in ((66, 2), (60, 5)):
+        payload, _ = build_seeded_payload(ruleset, seed=seed, progress=1, hp_left=hp_left)
+        assert client.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+    assert submit(client, ruleset, seed=71, progress=2, board_seed=7)["serverScore"] == 2140
+    # Far below the cached seed-7 minimum, but that partition holds one run, not a top N.
+    late = submit(client, ruleset, seed=66, progress=1, board_seed=7)
+    assert (late["status"], late["serverScore"], late["rank"], late["seedRank"]) == ("accepted", 1110, 2, 2)
+    assert scores(client.get("/api/leaderboard")) == [2140, 1110, 1070]
+    assert scores(client.get("/api/leaderboard?seed=7")) == [2140, 1110]
+
+
+def test_legacy_rows_migrate_and_partitions_use_the_index(tmp_path: Path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE score_runs (
+            run_id TEXT PRIMARY KEY, player_name TEXT NOT NULL, client_score INTEGER NOT NULL,
+            server_score INTEGER NOT NULL, progress INTEGER NOT NULL, created_at TEXT NOT NULL, ip TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("INSERT INTO score_runs VALUES ('r1', 'amy', 0, 50, 3, '2024-01-01T00:00:03', 'ip')")
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT seed, ruleset_version FROM score_runs").fetchone() == (None, "v1")
+    plan = conn.execute(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT server_score FROM score_runs
+        WHERE ruleset_version = ? AND seed = ?
+        ORDER BY server_score DESC, created_at ASC LIMIT 3
+        """,
+        ("v1", 8),
+    ).fetchall()
+    conn.close()
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_score_runs_board" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_partition_cache_evicts_least_recently_used():
+    cache = PartitionCache(max_entries=2)
+    for seed in range(3):
+        if seed == 2:
+            assert cache.get(("v1", 0)) is not None
+        cache.put(("v1", seed), PartitionEntry(seed, [{"score": 10 - seed}]))
+    assert cache.get(("v1", 1)) is None
+    assert cache.get(("v1", 0)).min_score(3) == 10
+    assert cache.stats()["partition_cache_evictions_total"] == 1
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, ValidationError
+
+from backend.app import SubmitPayload, parse_submit_payload, validate_submit_payload
+from backend.payload_compiler import compile_validator, dump_view
+from backend.tests.factories import build_seeded_payload, clone_payload
+from backend.tests.test_api import build_app, make_ruleset
+
+
+# Values that pydantic coerces (numeric strings, floats, 0/1 for bools), rejects, or that sit
+# right on a bound, swapped in at every position of a valid payload.
+PROBES = (
+    None, True, False, 0, 1, -1, 2, 2**32, 2**32 - 1, 2**70, 1.0, 1.5, float("nan"),
+    "", "x", "1", "-1", "true", "a" * 32, "a" * 33, [], [{}], {}, {"wave": 1}, b"x",
+)
+
+
+def pydantic_outcome(data) -> Optional[str]:
+    try:
+        return json.dumps(SubmitPayload.model_validate(data).model_dump(), sort_keys=True)
+    except ValidationError:
+        return None
+
+
+def compiled_outcome(data) -> Optional[str]:
+    view = validate_submit_payload(data)
+    return None if view is None else json.dumps(dump_view(view), sort_keys=True)
+
+
+def body_outcome(body: bytes) -> Optional[str]:
+    try:
+        return json.dumps(dump_view(parse_submit_payload(body)), sort_keys=True)
+    except ValueError:
+        return None
+
+
+def paths(node, prefix=()):
+    yield prefix
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from paths(value, prefix + (key,))
+    elif isinstance(node, list):
+        for index, value in enumerate(node[:2]):
+            yield from paths(value, prefix + (index,))
+
+
+def replaced(payload: dict, path: tuple, value) -> dict:
+    copy = clone_payload(payload)
+    parent = copy
+    for key in path[:-1]:
+        parent = parent[key]
+    if value is KeyError:
+        del parent[path[-1]]
+    else:
+        parent[path[-1]] = value
+    return copy
+
+
+def mutations(payload: dict):
+    yield payload
+    yield {**payload, "extra": 1, "seed": None}
+    yield {key: value for key, value in payload.items() if key not in ("playerName", "seed")}
+    for path in list(paths(payload))[1:]:
+        if isinstance(path[-1], str):
+            yield replaced(payload, path, KeyError)
+        for probe in PROBES:
+            yield replaced(payload, path, probe)
+
+
+def test_compiled_validator_matches_pydantic():
+    ruleset = make_ruleset()
+    rng = random.Random(7)
+    checked = fast = 0
+    for seed in range(3):
+        payload, _ = build_seeded_payload(ruleset, seed=seed, progress=2)
+        payload["seed"] = rng.randrange(2**32)
+        assert validate_submit_payload(payload) is not None
+        for data in mutations(payload):
+            expected = pydantic_outcome(data)
+            got = compiled_outcome(data)
+            # The compiled pass may decline a valid payload (pydantic then coerces it), but it
+            # never accepts one pydantic rejects, and what it accepts dumps identically.
+            if got is not None:
+                assert got == expected, data
+                fast += 1
+            checked += 1
+            # End to end from the request body, including the orjson-to-stdlib retry.
+            try:
+                body = json.dumps(data).encode("utf-8")
+            except TypeError:
+                continue
+            assert body_outcome(body) == pydantic_outcome(json.loads(body)), data
+    assert checked > 1000 and fast > 100
+
+
+def test_compiler_refuses_unsupported_fields():
+    class Scored(BaseModel):
+        score: float
+
+    with pytest.raises(TypeError):
+        compile_validator(Scored)
+
+
+def test_submit_falls_back_to_model_for_coercible_payload(tmp_path: Path):
+    client = TestClient(build_app(tmp_path))
+    payload, _ = build_seeded_payload(make_ruleset(), seed=3, progress=2)
+    payload["hpLeft"] = str(payload["hpLeft"])
+    assert validate_submit_payload(payload) is None
+    resp = client.post("/api/score/submit", json=payload)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "accepted"
+
+    payload["hpLeft"] = "ten"
+    resp = client.post("/api/score/submit", json=payload)
+    assert resp.status_code == 400
+    assert resp.json()["reason"] == "INVALID_PAYLOAD"
+    resp = client.post("/api/score/submit", content=b"{not json", headers={"content-type": "application/json"})
+    assert resp.status_code == 400
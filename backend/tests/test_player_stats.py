@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import init_db
+from backend.player_stats import fetch_player, fetch_top_players
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import build_app, make_ruleset
+
+
+def test_player_stats_follow_accepted_runs(tmp_path: Path):
+    client = TestClient(build_app(tmp_path))
+    # Ascending scores, so none of the runs is skipped by the cheap gate.
+    ruleset = make_ruleset()
+    first, _ = build_seeded_payload(ruleset, seed=51, progress=1)
+    other, _ = build_seeded_payload(ruleset, seed=52, progress=1, hp_left=9)
+    other["playerName"] = "Other"
+    best, _ = build_seeded_payload(ruleset, seed=53, progress=2)
+    responses = [client.post("/api/score/submit", json=p).json() for p in (first, other, best)]
+    assert [r["status"] for r in responses] == ["accepted"] * 3
+
+    stats = client.get("/api/players/Tester").json()
+    assert stats["runs"] == 2
+    assert stats["bestScore"] == responses[2]["serverScore"]
+    assert stats["avgProgress"] == 1.5
+
+    top = client.get("/api/players?limit=5").json()["items"]
+    assert [item["playerName"] for item in top] == ["Tester", "Other"]
+    assert client.get("/api/players/Nobody").status_code == 404
+
+
+def test_existing_runs_are_backfilled(tmp_path: Path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE score_runs (
+            run_id TEXT PRIMARY KEY, player_name TEXT NOT NULL, client_score INTEGER NOT NULL,
+            server_score INTEGER NOT NULL, progress INTEGER NOT NULL, created_at TEXT NOT NULL, ip TEXT NOT NULL
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO score_runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("r1", "amy", 0, 50, 3, "2024-01-01T00:00:03", "ip"),
+            ("r2", "amy", 0, 90, 5, "2024-01-01T00:00:02", "ip"),
+            ("r3", "amy", 0, 90, 4, "2024-01-01T00:00:01", "ip"),
+            ("r4", "bob", 0, 90, 2, "2024-01-01T00:00:04", "ip"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    amy = fetch_player(conn, "amy")
+    assert (amy["runs"], amy["best_score"], amy["progress_sum"]) == (3, 90, 12)
+    assert amy["best_created_at"] == "2024-01-01T00:00:01"
+    assert amy["last_played_at"] == "2024-01-01T00:00:03"
+    assert [row["player_name"] for row in fetch_top_players(conn, 5)] == ["amy", "bob"]
+    conn.close()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.revalidate import main, revalidate
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import CAPS, ECONOMY, MOBS, SCORING, build_app, make_ruleset
+
+
+def write_target_ruleset(tmp_path: Path) -> Path:
+    # Kills are worth twice as much, and a wave may hold one mob at most.
+    target = tmp_path / "target"
+    target.mkdir()
+    parts = {
+        "scoring": {**SCORING, "KILL_UNIT": SCORING["KILL_UNIT"] * 2},
+        "economy": ECONOMY,
+        "mobs": MOBS,
+        "caps": {**CAPS, "maxMobsPerWave": {"base": 1, "growthRate": 0.0, "round": "ceil"}, "mobOverflowMax": 0},
+    }
+    for part, data in parts.items():
+        (target / f"{part}.v1.json").write_text(json.dumps(data), encoding="utf-8")
+    return target
+
+
+def test_revalidate_reports_and_applies_new_scores(tmp_path: Path):
+    app = build_app(tmp_path)
+    client = TestClient(app)
+    ruleset = make_ruleset()
+    payloads = [build_seeded_payload(ruleset, seed=seed, progress=1)[0] for seed in range(40)]
+    single = next(p for p in payloads if len(p["waves"][0]["mobs"]) == 1)
+    crowded = next(p for p in payloads if len(p["waves"][0]["mobs"]) > 1)
+    # Ascending scores, so neither run is skipped by the cheap gate.
+    submitted = sorted([single, crowded], key=lambda p: p["clientScore"])
+    scores = {p["runId"]: client.post("/api/score/submit", json=p).json()["serverScore"] for p in submitted}
+    etag = client.get("/api/leaderboard").headers["etag"]
+
+    db_path = tmp_path / "db.sqlite3"
+    conn = sqlite3.connect(db_path)
+    # Stored before telemetry existed: counted, never re-validated.
+    conn.execute(
+        "INSERT INTO score_runs (run_id, player_name, client_score, server_score, progress, created_at, ip) "
+        "VALUES ('legacy', 'old', 1, 1, 1, '2024-01-01T00:00:00', 'ip')"
+    )
+    conn.commit()
+    conn.close()
+    report_path = tmp_path / "report.ndjson"
+    summary = revalidate(db_path, write_target_ruleset(tmp_path), report_path, source_dir=tmp_path / "ruleset")
+    assert (summary.runs, summary.statuses["rescored"], summary.statuses["rejected"]) == (2, 1, 1)
+    assert summary.reasons == {"MOB_INVALID": 1}
+    assert summary.skipped_no_telemetry == 1
+    rows = {row["runId"]: row for row in map(json.loads, report_path.read_text().splitlines())}
+    assert rows[crowded["runId"]]["status"] == "rejected"
+    rescored = rows[single["runId"]]
+    assert rescored["newScore"] == scores[single["runId"]] + SCORING["KILL_UNIT"]
+
+    exit_code = main(
+        [
+            "--db", str(db_path),
+            "--ruleset-dir", str(tmp_path / "target"),
+            "--source-ruleset-dir", str(tmp_path / "ruleset"),
+            "--report", str(report_path),
+            "--workers", "2",
+            "--apply",
+        ]
+    )
+    assert exit_code == 0
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute("SELECT server_score FROM score_runs WHERE run_id = ?", (single["runId"],)).fetchone()
+    best = conn.execute("SELECT MAX(best_score) FROM player_stats").fetchone()
+    conn.close()
+    assert stored[0] == rescored["newScore"]
+    # Rejected runs are reported, not removed; player stats follow the applied scores.
+    assert best[0] == max(rescored["newScore"], scores[crowded["runId"]])
+
+    # The running server notices the rewrite through the shared counters and drops its caches.
+    app.state.meta_check_interval = 0
+    app.state.admission.threshold = 10**9
+    refreshed = client.get("/api/leaderboard", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert rescored["newScore"] in [item["score"] for item in refreshed.json()["items"]]
+    assert app.state.admission.threshold is None
+    assert client.get("/api/metrics").json()["scores_epoch_reloads_total"] == 1
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend.app import create_app
+from backend.guards.authority import build_authority_rules
+from backend.ruleset_snapshot import load_rules, read_snapshot, snapshot_path, write_snapshot
+from backend.tests.test_api import CAPS, make_ruleset, write_ruleset
+
+
+def test_snapshot_round_trips_authority_rules(tmp_path: Path):
+    ruleset_dir = write_ruleset(tmp_path)
+    path = write_snapshot(ruleset_dir)
+    assert path == snapshot_path(ruleset_dir)
+
+    ruleset, rules = read_snapshot(path, ruleset_dir)
+    assert ruleset == make_ruleset()
+    assert rules == build_authority_rules(make_ruleset())
+
+
+def test_stale_snapshot_is_ignored(tmp_path: Path):
+    ruleset_dir = write_ruleset(tmp_path)
+    write_snapshot(ruleset_dir)
+    caps = dict(CAPS, mobOverflowMax=1)
+    (ruleset_dir / "caps.v1.json").write_text(json.dumps(caps), encoding="utf-8")
+
+    assert read_snapshot(snapshot_path(ruleset_dir), ruleset_dir) is None
+    _, rules = load_rules(ruleset_dir)
+    assert rules.mob_overflow_max == 1
+
+
+def test_app_initializes_lazily_on_first_request(tmp_path: Path):
+    ruleset_dir = write_ruleset(tmp_path)
+    db_path = tmp_path / "lazy.sqlite3"
+    app = create_app(db_path=db_path, ruleset_dir=ruleset_dir)
+    assert app.state.authority_rules is None
+    assert not db_path.exists()
+
+    resp = TestClient(app).get("/api/leaderboard")
+    assert resp.status_code == 200
+    assert resp.json() == {"items": []}
+    assert app.state.authority_rules == build_authority_rules(make_ruleset())
+    assert db_path.exists()
+
+
+def test_first_request_loads_rules_off_the_event_loop(tmp_path: Path, monkeypatch):
+    app = create_app(db_path=tmp_path / "lazy.sqlite3", ruleset_dir=write_ruleset(tmp_path))
+    release = threading.Event()
+    loads = []
+
+    def slow_load_rules(ruleset_dir: Path):
+        # Only released by a coroutine on the event loop: a load that blocked the loop
+        # would time out here instead.
+        loads.append(release.wait(5))
+        return load_rules(ruleset_dir)
+
+    monkeypatch.setattr("backend.app.load_rules", slow_load_rules)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [asyncio.create_task(client.get("/api/leaderboard")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return [await request for request in requests]
+
+    responses = asyncio.run(scenario())
+    assert [response.status_code for response in responses] == [200, 200]
+    assert loads == [True]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import create_app, init_db
+from backend.snapshots import list_snapshots, take_snapshot
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import make_ruleset, write_ruleset
+
+
+INSERT_RUN = (
+    "INSERT INTO score_runs (run_id, player_name, client_score, server_score, progress, created_at, ip) "
+)
+
+
+def test_snapshot_completes_under_writes_and_rotates(tmp_path: Path):
+    db_path = tmp_path / "live.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        INSERT_RUN + "VALUES (?, 'p', 0, ?, 1, '2024-01-01T00:00:00+00:00', 'ip')",
+        [(f"seed-{i}", i) for i in range(5000)],
+    )
+    conn.commit()
+    conn.close()
+
+    stop = threading.Event()
+    writes = []
+
+    def writer() -> None:
+        conn = sqlite3.connect(db_path, timeout=10)
+        while not stop.is_set():
+            conn.execute(
+                INSERT_RUN + "VALUES (?, 'w', 0, 0, 1, '2024-01-02T00:00:00+00:00', 'ip')",
+                (f"live-{len(writes)}",),
+            )
+            conn.commit()
+            writes.append(1)
+            time.sleep(0.0005)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        reports = [take_snapshot(db_path, tmp_path / "snaps", keep=2, pages_per_step=4, step_sleep=0.001) for _ in range(3)]
+    finally:
+        stop.set()
+        thread.join()
+
+    assert writes
+    assert all(report.integrity == "ok" for report in reports)
+    assert reports[0].steps > 1
+    assert reports[-1].rotated == 1
+    assert [str(path) for path in list_snapshots(tmp_path / "snaps")] == [r.path for r in reports[1:]]
+    snapshot = sqlite3.connect(reports[-1].path)
+    assert snapshot.execute("SELECT COUNT(*) FROM score_runs WHERE run_id LIKE 'seed-%'").fetchone()[0] == 5000
+    assert snapshot.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    snapshot.close()
+
+
+def test_admin_snapshot_reports_executor_impact(tmp_path: Path):
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admin_token="secret",
+        snapshot_dir=tmp_path / "snaps",
+        snapshot_interval=3600,
+    )
+    payload, _ = build_seeded_payload(make_ruleset(), seed=81, progress=1)
+    with TestClient(app) as client:
+        client.post("/api/score/submit", json=payload)
+        report = client.post("/api/admin/snapshots", headers={"X-Admin-Token": "secret"}).json()
+        assert report["ok"] is True
+        assert report["integrity"] == "ok"
+        assert report["db_mean_job_ms_before"] is not None
+        assert client.get("/api/metrics").json()["snapshots_total"] == 1
+    assert len(list_snapshots(tmp_path / "snaps")) == 1
+
+
+def test_admin_snapshot_failure_is_reported(tmp_path: Path):
+    snapshot_dir = tmp_path / "snaps"
+    snapshot_dir.write_text("not a directory", encoding="utf-8")
+    app = create_app(
+        db_path=tmp_path / "db.sqlite3",
+        ruleset_dir=write_ruleset(tmp_path),
+        admin_token="secret",
+        snapshot_dir=snapshot_dir,
+        snapshot_interval=3600,
+    )
+    with TestClient(app) as client:
+        response = client.post("/api/admin/snapshots", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 500
+        assert response.json()["ok"] is False
+        assert response.json()["reason"] == "snapshot_failed"
+        assert client.get("/api/metrics").json()["snapshot_failures_total"] == 1
+
+
+def test_failed_snapshot_leaves_no_partial_file(tmp_path: Path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    out_dir = tmp_path / "snapshots"
+    calls = []
+
+    def failing_stats() -> dict:
+        # Fails once the copy is written, as a disk or I/O error late in the run would.
+        calls.append(1)
+        if len(calls) > 1:
+            raise OSError("disk full")
+        return {"db_jobs_total": 0, "db_busy_seconds_total": 0.0}
+
+    with pytest.raises(OSError):
+        take_snapshot(db_path, out_dir, stats_fn=failing_stats)
+    assert len(calls) == 2
+    assert list(out_dir.iterdir()) == []
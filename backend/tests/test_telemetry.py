@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import SubmitPayload
+from backend.benchmarks.cases import build_max_payload, load_shared_ruleset
+from backend.telemetry import decode_run, encode_run, iter_telemetry, mob_types
+from backend.tests.factories import build_seeded_payload
+from backend.tests.test_api import build_app, make_ruleset
+
+
+STORED_FIELDS = ("progress", "clientScore", "hpLeft", "hpMax", "economy", "waves")
+
+
+def test_round_trip_is_a_fraction_of_json():
+    ruleset = load_shared_ruleset()
+    types = mob_types(ruleset)
+    raw = build_max_payload(ruleset, seed=7)
+    blob = encode_run(SubmitPayload(**raw), types)
+    assert decode_run(blob, types) == {field: raw[field] for field in STORED_FIELDS}
+    assert len(blob) * 4 < len(json.dumps(raw["waves"], separators=(",", ":")))
+
+
+def test_decoding_with_a_different_mob_order_is_refused():
+    ruleset = load_shared_ruleset()
+    types = mob_types(ruleset)
+    blob = encode_run(SubmitPayload(**build_max_payload(ruleset, seed=7)), types)
+    with pytest.raises(ValueError, match="mob order"):
+        decode_run(blob, tuple(reversed(types)))
+
+
+def test_accepted_runs_are_stored_and_streamed(tmp_path: Path):
+    client = TestClient(build_app(tmp_path))
+    ruleset = make_ruleset()
+    payloads = [build_seeded_payload(ruleset, seed=seed, progress=2, hp_left=10 - i)[0] for i, seed in enumerate((61, 62))]
+    for payload in payloads:
+        assert client.post("/api/score/submit", json=payload).json()["status"] == "accepted"
+
+    decoded = list(iter_telemetry(tmp_path / "db.sqlite3", {"v1": mob_types(ruleset)}, chunk_rows=1))
+    assert [run_id for run_id, _ in decoded] == [p["runId"] for p in payloads]
+    assert decoded[1][1] == {field: payloads[1][field] for field in STORED_FIELDS}
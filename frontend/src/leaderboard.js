@@ -41,7 +41,7 @@ export function buildSubmissionPayload({ summary, playerName, runId }) {
   if (!summary.economy || !summary.waves) {
     throw new Error("invalid_summary");
   }
-  return {
+  const payload = {
     runId,
     playerName: (playerName ?? "").trim(),
     progress,
@@ -52,4 +52,42 @@ export function buildSubmissionPayload({ summary, playerName, runId }) {
     waves: summary.waves,
     rulesetVersion: RULESET_VERSION,
   };
+  // Seeded runs also rank on the board for their (rulesetVersion, seed) pair.
+  const seed = summary.seed;
+  if (Number.isInteger(seed) && seed >= 0 && seed <= 0xffffffff) {
+    payload.seed = seed;
+  }
+  return payload;
+}
+
+export function applyLeaderboardEvent(items, type, data) {
+  if (!data) return items;
+  if (type === "snapshot") {
+    return Array.isArray(data.items) ? data.items.slice() : [];
+  }
+  if (type !== "diff") return items;
+  const next = (items ?? []).slice(0, data.size ?? items.length);
+  for (const change of data.changes ?? []) {
+    next[change.rank - 1] = change.item;
+  }
+  return next.filter(Boolean);
+}
+
+export function subscribeLeaderboard(apiBase, onItems, EventSourceImpl = globalThis.EventSource) {
+  if (typeof EventSourceImpl !== "function") return null;
+  const source = new EventSourceImpl(`${apiBase}/api/leaderboard/stream`);
+  let items = [];
+  const handle = (type) => (event) => {
+    let data = null;
+    try {
+      data = JSON.parse(event.data);
+    } catch {
+      return;
+    }
+    items = applyLeaderboardEvent(items, type, data);
+    onItems(items);
+  };
+  source.addEventListener("snapshot", handle("snapshot"));
+  source.addEventListener("diff", handle("diff"));
+  return () => source.close();
 }
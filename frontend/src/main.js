@@ -5,6 +5,7 @@ import { computeScore } from "./game/scoring.js";
 import {
   buildSubmissionPayload,
   formatProgressLabel,
+  subscribeLeaderboard,
 } from "./leaderboard.js";
 
 const canvas = document.getElementById("gameCanvas");
@@ -58,6 +59,7 @@ let animationFrame = null;
 let lastTime = null;
 let messageTimeout = null;
 let currentSeed = "";
+let closeLeaderboardStream = null;
 let runState = null;
 
 const game = createGame({
@@ -114,6 +116,20 @@ function setModalOpen(modal, open) {
   if (!modal) return;
   modal.classList.toggle("show", open);
   modal.setAttribute("aria-hidden", open ? "false" : "true");
+  if (modal === leaderboardModal) {
+    setLeaderboardStreaming(open);
+  }
+}
+
+function setLeaderboardStreaming(enabled) {
+  if (!enabled) {
+    closeLeaderboardStream?.();
+    closeLeaderboardStream = null;
+    return;
+  }
+  if (closeLeaderboardStream) return;
+  // The server only pushes when the top N changes, so an open board stays live without polling.
+  closeLeaderboardStream = subscribeLeaderboard(API_BASE, (items) => renderLeaderboard(items));
 }
 
 function resetSubmitUi() {
@@ -408,7 +424,8 @@ async function submitScore() {
   try {
     const response = await fetch(`${API_BASE}/api/score/submit`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      // The score hint lets an overloaded server triage the run before parsing it.
+      headers: { "Content-Type": "application/json", "X-Client-Score": String(payload.clientScore) },
       body: JSON.stringify(payload),
     });
     const data = await response.json().catch(() => ({}));
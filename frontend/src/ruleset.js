@@ -133,8 +133,8 @@ export const CAP_RULES = {
     "round": "ceil"
   },
   "maxDamagePerWave": {
-    "base": 560,
-    "growthRate": 0.13,
+    "base": 1380,
+    "growthRate": 0.11,
     "round": "ceil"
   },
   "maxSpikeRatio": 3,
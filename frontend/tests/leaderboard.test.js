@@ -4,6 +4,7 @@ import {
   parseProgress,
   formatProgressLabel,
   buildSubmissionPayload,
+  applyLeaderboardEvent,
 } from "../src/leaderboard.js";
 
 test("parseProgress handles valid and invalid formats", () => {
@@ -44,3 +45,38 @@ test("buildSubmissionPayload normalizes summary payload", () => {
     rulesetVersion: "v1",
   });
 });
+
+test("buildSubmissionPayload sends the hashed seed", () => {
+  const summary = {
+    progress: 1,
+    score: 10,
+    hpLeft: 1,
+    hpMax: 1,
+    economy: { goldSpentTotal: 0, goldEnd: 0 },
+    waves: [],
+  };
+  const seeded = buildSubmissionPayload({ summary: { ...summary, seed: 4294967295 }, runId: "r" });
+  assert.equal(seeded.seed, 4294967295);
+  const invalid = buildSubmissionPayload({ summary: { ...summary, seed: -1 }, runId: "r" });
+  assert.equal("seed" in invalid, false);
+});
+
+test("applyLeaderboardEvent replaces on snapshot and patches on diff", () => {
+  const a = { playerName: "a", score: 30 };
+  const b = { playerName: "b", score: 20 };
+  const c = { playerName: "c", score: 40 };
+  let items = applyLeaderboardEvent([], "snapshot", { version: 1, items: [a, b] });
+  assert.deepEqual(items, [a, b]);
+  items = applyLeaderboardEvent(items, "diff", {
+    version: 2,
+    size: 3,
+    changes: [
+      { rank: 1, item: c },
+      { rank: 2, item: a },
+      { rank: 3, item: b },
+    ],
+  });
+  assert.deepEqual(items, [c, a, b]);
+  items = applyLeaderboardEvent(items, "diff", { version: 3, size: 2, changes: [] });
+  assert.deepEqual(items, [c, a]);
+});